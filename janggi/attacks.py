@@ -0,0 +1,219 @@
+# Description:  Attack detection on the compact Position.
+#                   is_attacked() answers "can a color capture on this square?" by looking
+#               outward from the square only: reverse rays for Chariots and Cannons (with their
+#               screens), reverse horse and elephant legs, and the few squares a Soldier, Guard
+#               or General could step from. Its cost depends on the pieces that could reach the
+#               square, not on a full move generation for the enemy.
+#                   AttackMap keeps a bitset of attacked squares for each color and updates it
+#               incrementally, recomputing only the pieces whose attacks can be affected by the
+#               squares that changed.
+
+from janggi.position import (NUM_SQUARES, BLUE, RED, COLOR_SHIFT, KIND_MASK, GENERAL, GUARD, ELEPHANT,
+                             HORSE, CHARIOT, CANNON, SOLDIER, make_code)
+from janggi.tables import SLIDING_RAYS, HORSE_MOVES, ELEPHANT_MOVES, PALACE_STEPS, SOLDIER_STEPS
+
+
+def _build_horse_attackers():
+    """(horse square, leg) pairs from which a Horse attacks each square"""
+    attackers = [[] for _ in range(NUM_SQUARES)]
+    for square in range(NUM_SQUARES):
+        for leg, target in HORSE_MOVES[square]:
+            attackers[target].append((square, leg))
+    return tuple(tuple(pairs) for pairs in attackers)
+
+
+def _build_elephant_attackers():
+    """(elephant square, first leg, second leg) triples from which an Elephant attacks each square"""
+    attackers = [[] for _ in range(NUM_SQUARES)]
+    for square in range(NUM_SQUARES):
+        for leg1, leg2, target in ELEPHANT_MOVES[square]:
+            attackers[target].append((square, leg1, leg2))
+    return tuple(tuple(triples) for triples in attackers)
+
+
+def _build_soldier_attackers(color):
+    """squares from which a Soldier of a color index attacks each square"""
+    attackers = [[] for _ in range(NUM_SQUARES)]
+    for square in range(NUM_SQUARES):
+        for target in SOLDIER_STEPS[color][square]:
+            attackers[target].append(square)
+    return tuple(tuple(squares) for squares in attackers)
+
+
+def _build_influence():
+    """
+    bitmask per piece kind and square of the squares whose occupancy can change what a piece
+    of that kind on that square attacks (empty for pieces that only take single steps)
+    """
+    influence = [[0] * NUM_SQUARES for _ in range(SOLDIER + 1)]
+    for square in range(NUM_SQUARES):
+        ray_mask = 0
+        for ray in SLIDING_RAYS[square]:
+            for target in ray:
+                ray_mask |= 1 << target
+        influence[CHARIOT][square] = ray_mask
+        influence[CANNON][square] = ray_mask
+        for leg, target in HORSE_MOVES[square]:
+            influence[HORSE][square] |= 1 << leg
+        for leg1, leg2, target in ELEPHANT_MOVES[square]:
+            influence[ELEPHANT][square] |= (1 << leg1) | (1 << leg2)
+    return tuple(tuple(masks) for masks in influence)
+
+
+HORSE_ATTACKERS = _build_horse_attackers()
+ELEPHANT_ATTACKERS = _build_elephant_attackers()
+SOLDIER_ATTACKERS = (_build_soldier_attackers(BLUE), _build_soldier_attackers(RED))
+INFLUENCE = _build_influence()
+
+
+def is_attacked(squares, square, by_color):
+    """
+    returns True if a piece of by_color could capture on square, assuming square holds
+    an enemy piece that is not a cannon (ie a General)
+    :param squares: the Position's bytearray of piece codes
+    :param square: the square index in question
+    :param by_color: the attacking color index
+    """
+    chariot = make_code(by_color, CHARIOT)
+    cannon = make_code(by_color, CANNON)
+    # walk outward along every ray: the first piece may be a chariot, the second a cannon
+    for ray in SLIDING_RAYS[square]:
+        screened = False
+        for target in ray:
+            code = squares[target]
+            if not code:
+                continue
+            if screened:
+                if code == cannon:
+                    return True
+                break
+            if code == chariot:
+                return True
+            if code & KIND_MASK == CANNON:
+                break                   # a cannon can't be a screen
+            screened = True
+
+    horse = make_code(by_color, HORSE)
+    for origin, leg in HORSE_ATTACKERS[square]:
+        if squares[origin] == horse and not squares[leg]:
+            return True
+
+    elephant = make_code(by_color, ELEPHANT)
+    for origin, leg1, leg2 in ELEPHANT_ATTACKERS[square]:
+        if squares[origin] == elephant and not squares[leg1] and not squares[leg2]:
+            return True
+
+    soldier = make_code(by_color, SOLDIER)
+    for origin in SOLDIER_ATTACKERS[by_color][square]:
+        if squares[origin] == soldier:
+            return True
+
+    general = make_code(by_color, GENERAL)
+    guard = make_code(by_color, GUARD)
+    for origin in PALACE_STEPS[square]:
+        code = squares[origin]
+        if code == general or code == guard:
+            return True
+    return False
+
+
+def attack_mask(squares, square):
+    """
+    returns the bitmask of squares attacked by the piece on square: the squares it could
+    capture on if they held an enemy piece (squares held by friendly pieces are included)
+    """
+    code = squares[square]
+    kind = code & KIND_MASK
+    mask = 0
+    if kind == CHARIOT:
+        for ray in SLIDING_RAYS[square]:
+            for target in ray:
+                mask |= 1 << target
+                if squares[target]:
+                    break
+    elif kind == CANNON:
+        for ray in SLIDING_RAYS[square]:
+            screened = False
+            for target in ray:
+                occupant = squares[target]
+                if not screened:
+                    if occupant:
+                        if occupant & KIND_MASK == CANNON:
+                            break
+                        screened = True
+                else:
+                    mask |= 1 << target
+                    if occupant:
+                        break
+    elif kind == HORSE:
+        for leg, target in HORSE_MOVES[square]:
+            if not squares[leg]:
+                mask |= 1 << target
+    elif kind == ELEPHANT:
+        for leg1, leg2, target in ELEPHANT_MOVES[square]:
+            if not squares[leg1] and not squares[leg2]:
+                mask |= 1 << target
+    elif kind == SOLDIER:
+        for target in SOLDIER_STEPS[code >> COLOR_SHIFT][square]:
+            mask |= 1 << target
+    elif kind == GENERAL or kind == GUARD:
+        for target in PALACE_STEPS[square]:
+            mask |= 1 << target
+    return mask
+
+
+class AttackMap:
+    """Represents the attacked-square bitsets of both colors for a Position"""
+    def __init__(self, position):
+        """
+        Initializes private data members for:
+            position, attack mask of the piece on every square, attacked squares per color
+        """
+        self._position = position
+        self._masks = [0] * NUM_SQUARES
+        self._attacked = [0, 0]
+        self.rebuild()
+
+    def rebuild(self):
+        """recomputes every attack mask from scratch"""
+        squares = self._position.get_squares()
+        masks = self._masks
+        for square in range(NUM_SQUARES):
+            masks[square] = attack_mask(squares, square) if squares[square] else 0
+        self._combine()
+
+    def _combine(self):
+        """helper function ORs the per-piece masks into one bitset per color"""
+        masks = self._masks
+        for color in (BLUE, RED):
+            attacked = 0
+            for square in self._position.pieces(color):
+                attacked |= masks[square]
+            self._attacked[color] = attacked
+
+    def update(self, changed):
+        """
+        Updates the attack masks after the contents of some squares changed
+        (ie the start and end squares of a move), recomputing only the pieces on
+        those squares and the pieces whose rays or legs pass through them
+        :param changed: iterable of square indexes whose contents changed
+        """
+        squares = self._position.get_squares()
+        masks = self._masks
+        changed_mask = 0
+        for square in changed:
+            changed_mask |= 1 << square
+            masks[square] = 0
+        for color in (BLUE, RED):
+            for square in self._position.pieces(color):
+                if (changed_mask >> square) & 1 or INFLUENCE[squares[square] & KIND_MASK][square] & changed_mask:
+                    masks[square] = attack_mask(squares, square)
+        self._combine()
+
+    def attacked(self, color):
+        """returns the bitset (int) of squares attacked by a color index"""
+        return self._attacked[color]
+
+    def is_attacked(self, square, by_color):
+        """returns True if square is in the attacked bitset of by_color"""
+        return bool((self._attacked[by_color] >> square) & 1)
@@ -0,0 +1,97 @@
+# Description:  Command line benchmarks for the Janggi engine, run with python -m janggi.bench.
+#                   perft counts the leaf nodes of the legal move tree of a position to a fixed
+#               depth and reports the nodes searched per second. Without --fen it runs every
+#               reference position below and checks its count, so it doubles as a correctness
+#               suite for move generation; with --divide it prints the count below each root move.
+#                   The reference counts follow this engine's rules: pass moves are legal moves
+#               (except when in check) and the game doesn't end when the Generals face each other.
+#               They were cross-checked against a plain pseudo-legal generate / make / test-check
+#               / unmake counter.
+
+import argparse
+import sys
+import time
+
+from janggi.movegen import perft, divide
+from janggi.position import Position, STARTING_FEN
+from janggi.utils import SQUARE_NAMES
+
+# (name, FEN-style position, perft node counts for depths 1, 2, 3, ...)
+REFERENCE_POSITIONS = (
+    ('start', STARTING_FEN,
+     (32, 1024, 33506, 1095844)),
+    ('opening', "1bn1a1bnr/r2ak4/1c5c1/2pp2pp1/p8/9/P1P1BPP1P/1C1N3C1/R3K4/1B1A1A1NR b",
+     (49, 1881, 86431, 3428264)),
+    ('midgame', "1b7/1c1a5/4k4/2p1p4/9/4P4/RNP5P/1C2K4/9/1B1A1AB2 b",
+     (38, 679, 26370, 443711)),
+    ('palace', "4k4/4a4/9/9/9/9/9/9/3RA4/4K4 r",
+     (9, 186, 1190, 26551)),
+    ('check', "3k5/4a4/9/9/4c4/9/9/9/4A4/3RK4 r",
+     (3, 18, 119, 1647)),
+)
+
+DEFAULT_PERFT_DEPTH = 3
+
+
+def run_perft(fen, depth, divide_moves=False, out=None):
+    """
+    Runs perft on a position and prints its node count, time and nodes per second.
+    :param divide_moves: also print the node count below each root move
+    :param out: file to print to (default sys.stdout)
+    :return: the node count
+    """
+    out = out or sys.stdout
+    position = Position.from_fen(fen)
+    started = time.perf_counter()
+    if divide_moves:
+        counts = divide(position, depth)
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(position, depth)
+    elapsed = time.perf_counter() - started
+    if divide_moves:
+        for (start, end), count in sorted(counts.items()):
+            print('{}{}: {}'.format(SQUARE_NAMES[start], SQUARE_NAMES[end], count), file=out)
+    print('depth {} nodes {} time {:.3f}s nps {:.0f}'.format(
+        depth, nodes, elapsed, nodes / elapsed if elapsed else 0.0), file=out)
+    return nodes
+
+
+def perft_command(args, out=None):
+    """
+    runs perft on the --fen position, or on every reference position and checks the counts
+    :return: exit status, 1 if a reference count didn't match
+    """
+    out = out or sys.stdout
+    if args.fen is not None:
+        run_perft(args.fen, args.depth, args.divide, out)
+        return 0
+    status = 0
+    for name, fen, counts in REFERENCE_POSITIONS:
+        depth = min(args.depth, len(counts))
+        print('{}: {}'.format(name, fen), file=out)
+        nodes = run_perft(fen, depth, args.divide, out)
+        if nodes != counts[depth - 1]:
+            print('MISMATCH: expected {}'.format(counts[depth - 1]), file=out)
+            status = 1
+    return status
+
+
+def main(argv=None):
+    """parses the command line and runs the chosen benchmark, returns the exit status"""
+    parser = argparse.ArgumentParser(prog='python -m janggi.bench', description='Janggi engine benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+    perft_parser = commands.add_parser('perft', help='count the legal move tree and report nodes per second')
+    perft_parser.add_argument('--depth', '-d', type=int, default=DEFAULT_PERFT_DEPTH,
+                              help='number of plies to count (reference positions are capped at their deepest count)')
+    perft_parser.add_argument('--fen', help='FEN-style position to count instead of the reference positions')
+    perft_parser.add_argument('--divide', action='store_true', help='print the count below each root move')
+    perft_parser.set_defaults(run=perft_command)
+    args = parser.parse_args(argv)
+    if args.command == 'perft' and args.depth < 1:
+        parser.error('--depth must be at least 1')
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
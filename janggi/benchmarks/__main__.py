@@ -0,0 +1,73 @@
+# Description:  Command line for the micro-benchmarks, run from the repository root with
+#               python -m janggi.benchmarks. Results can be saved as JSON and are compared
+#               against the stored baseline (janggi/benchmarks/baseline.json); the exit status
+#               is 1 if any benchmark regressed by more than the threshold. The baseline holds
+#               absolute timings of the machine it was saved on, so regenerate it with
+#               --save-baseline on a new machine before comparing.
+
+import argparse
+import os
+import sys
+
+from janggi.benchmarks.harness import run, save, load, compare, DEFAULT_ROUNDS, DEFAULT_THRESHOLD, BASELINE_PATH
+
+
+def format_time(seconds):
+    """helper function formats a time in seconds with a readable unit"""
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '{:.3f} {}'.format(seconds / scale, unit)
+    return '{:.1f} ns'.format(seconds / 1e-9)
+
+
+def print_result(stats):
+    """helper function prints one benchmark's statistics as it finishes"""
+    extra = ' '.join('{}={}'.format(key, value) for key, value in stats['extra_info'].items())
+    print('{:<45} min {:>12}  mean {:>12}  rounds {:>2} x {:<7} {}'.format(
+        stats['name'], format_time(stats['min']), format_time(stats['mean']), stats['rounds'], stats['loops'], extra))
+
+
+def main(argv=None):
+    """runs the benchmarks, saves and compares the results, returns the exit status"""
+    parser = argparse.ArgumentParser(prog='python -m janggi.benchmarks', description='Janggi micro-benchmarks')
+    parser.add_argument('-k', dest='pattern', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help='rounds per benchmark')
+    parser.add_argument('--json', dest='json_path', help='save the results to this JSON file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fraction a benchmark may be slower than the baseline (default %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    document = run(args.pattern, args.rounds, report=print_result)
+    if args.json_path:
+        save(document, args.json_path)
+    if args.save_baseline:
+        save(document, args.baseline)
+        print('saved baseline to {}'.format(args.baseline))
+        return 0
+    if not os.path.exists(args.baseline):
+        print('no baseline at {}, nothing to compare'.format(args.baseline))
+        return 0
+
+    baseline = load(args.baseline)
+    if baseline.get('machine') != document['machine']:
+        print('\nwarning: the baseline was recorded on another machine ({}), '
+              'regenerate it with --save-baseline'.format(baseline.get('machine')))
+    regressions = 0
+    print('\ncompared with {} (threshold {:+.0%}):'.format(args.baseline, args.threshold))
+    for name, minimum, previous, change, regressed in compare(document, baseline, args.threshold):
+        if previous is None:
+            print('{:<45} {:>12}  (new)'.format(name, format_time(minimum)))
+            continue
+        print('{:<45} {:>12}  baseline {:>12}  {:+7.1%}{}'.format(
+            name, format_time(minimum), format_time(previous), change, '  REGRESSION' if regressed else ''))
+        regressions += regressed
+    if regressions:
+        print('{} benchmark(s) regressed'.format(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+# Description:  Benchmarks of the Board adapter's hot paths: construction, move generation
+#               for every piece and check detection.
+
+from janggi.board import Board
+
+# blue chariot checks the red General along the d file
+CHECK_FEN = "3k5/4a4/9/9/4c4/9/9/9/4A4/3RK4 r"
+
+
+def bench_board_construction(benchmark):
+    benchmark(Board)
+
+
+def bench_all_player_moves(benchmark):
+    board = Board()
+    benchmark(board.all_player_moves, 'b')
+
+
+def bench_is_in_check(benchmark):
+    board = Board()
+    benchmark(board.is_in_check, 'b')
+
+
+def bench_is_in_check_checked(benchmark):
+    board = Board.from_fen(CHECK_FEN)
+    assert board.is_in_check('r')
+    benchmark(board.is_in_check, 'r')
@@ -0,0 +1,65 @@
+# Description:  Benchmarks of the Game's move making, the non-search AI levels and the search.
+#                   Moves are timed on a fresh Game each round (created untimed), so every
+#               round measures the same move from the starting position. The search levels of
+#               the AI stop at a time budget, so timing them would only measure the budget:
+#               instead the search is timed to a fixed depth with no time limit, and the nodes
+#               searched are recorded alongside the times.
+
+from janggi.board import Board
+from janggi.game import Game
+from janggi.search import search
+from janggi.ttable import TranspositionTable
+
+# rounds for the deepest searches, each of which can take a fraction of a second
+SEARCH_ROUNDS = 3
+# memory of the transposition table each search starts with (the AI's default size)
+SEARCH_TABLE_SIZE_MB = 16
+
+
+def new_game():
+    """helper function returns a new Game with its transposition table already allocated"""
+    game = Game()
+    game.get_transposition_table()
+    return game
+
+
+def bench_make_move(benchmark):
+    benchmark.pedantic(lambda game: game.make_move('c7', 'c6'), setup=lambda: (new_game(),))
+
+
+def bench_hypothetical_move(benchmark):
+    game = Game()
+    benchmark(game.hypothetical_move, 'c7', 'c6')
+
+
+def _bench_ai(benchmark, level):
+    """helper function times make_ai_move at a level on a fresh game per round"""
+    benchmark.pedantic(Game.make_ai_move, setup=lambda: (new_game(), level))
+
+
+def bench_make_ai_move_level_0(benchmark):
+    _bench_ai(benchmark, 0)
+
+
+def bench_make_ai_move_level_10(benchmark):
+    _bench_ai(benchmark, 10)
+
+
+def _bench_search(benchmark, depth):
+    """helper function times a search of the starting position to a fixed depth with an empty table per round"""
+    result = benchmark.pedantic(lambda board, ttable: search(board, max_depth=depth, ttable=ttable),
+                                setup=lambda: (Board(), TranspositionTable(SEARCH_TABLE_SIZE_MB)),
+                                rounds=SEARCH_ROUNDS)
+    benchmark.extra_info.update(depth=result.depth, nodes=result.nodes)
+
+
+def bench_search_depth_2(benchmark):
+    _bench_search(benchmark, 2)
+
+
+def bench_search_depth_3(benchmark):
+    _bench_search(benchmark, 3)
+
+
+def bench_search_depth_4(benchmark):
+    _bench_search(benchmark, 4)
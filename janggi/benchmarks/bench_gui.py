@@ -0,0 +1,30 @@
+# Description:  Benchmark of a full board redraw, run headless with SDL's dummy video driver.
+#               Piece images are loaded from the assets directory, so run the benchmarks from
+#               the repository root (like gui.sh).
+
+import os
+
+import pygame
+
+from janggi import gui, sprites
+from janggi.game import Game
+
+
+def bench_blit_current_board(benchmark):
+    # the video driver must be chosen before pygame's display is initialized
+    video_driver = os.environ.get('SDL_VIDEODRIVER')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    try:
+        screen = pygame.display.set_mode((684, 760))
+        sprites.clear()
+        gui.background = None
+        sprites.preload()
+        benchmark(gui.blit_current_board, Game(), screen)
+    finally:
+        # the cached surfaces were converted for this display
+        sprites.clear()
+        gui.background = None
+        pygame.display.quit()
+        if video_driver is None:
+            del os.environ['SDL_VIDEODRIVER']
@@ -0,0 +1,50 @@
+# Description:  Scaling benchmarks of the multi-process search (janggi.parallel.SearchPool).
+#                   Each benchmark searches every perft reference position (see janggi.bench) to
+#               the same fixed depth with no time limit, on a pool of 1, 2, 4 or 8 workers, so the
+#               time per round falls as the workers help: the speed-up over the 1 worker benchmark
+#               is the search's scaling on this machine (near-linear needs at least as many cores
+#               as workers). The nodes searched by all workers and the nodes per second are
+#               recorded alongside the times. Each pool is started, and its table cleared, untimed.
+
+from janggi.bench import REFERENCE_POSITIONS
+from janggi.parallel import SearchPool
+from janggi.position import Position
+
+# depth every reference position is searched to
+SCALING_DEPTH = 4
+# rounds per worker count, each round searches all the reference positions
+SCALING_ROUNDS = 2
+# memory of the shared transposition table (the AI's default size)
+SCALING_TABLE_SIZE_MB = 16
+
+
+def _bench_workers(benchmark, workers):
+    """helper function times searches of the reference positions on a pool of workers processes"""
+    positions = [Position.from_fen(fen) for name, fen, counts in REFERENCE_POSITIONS]
+    with SearchPool(workers, SCALING_TABLE_SIZE_MB) as pool:
+        def search_all():
+            results = [pool.search(position, max_depth=SCALING_DEPTH) for position in positions]
+            return sum(result.nodes for result in results), sum(result.elapsed_ms for result in results)
+
+        def setup():
+            pool.get_transposition_table().clear()
+
+        nodes, elapsed_ms = benchmark.pedantic(search_all, setup=setup, rounds=SCALING_ROUNDS)
+    benchmark.extra_info.update(workers=workers, depth=SCALING_DEPTH, nodes=nodes,
+                                nodes_per_s=round(nodes * 1000 / max(elapsed_ms, 1)))
+
+
+def bench_search_pool_workers_1(benchmark):
+    _bench_workers(benchmark, 1)
+
+
+def bench_search_pool_workers_2(benchmark):
+    _bench_workers(benchmark, 2)
+
+
+def bench_search_pool_workers_4(benchmark):
+    _bench_workers(benchmark, 4)
+
+
+def bench_search_pool_workers_8(benchmark):
+    _bench_workers(benchmark, 8)
@@ -0,0 +1,183 @@
+# Description:  Minimal pytest-benchmark style harness for the engine's micro-benchmarks.
+#                   Every bench_*.py module in this package holds bench_* functions that take a
+#               Benchmark and call it with the code to time, ie benchmark(board.is_in_check, 'b'),
+#               or benchmark.pedantic(func, setup=...) when every call needs fresh state
+#               (setup runs untimed before each call). Each benchmark runs a few rounds and
+#               keeps per-call statistics; the minimum is the figure compared between runs.
+#                   Results are saved as JSON and compared against a stored baseline: a benchmark
+#               whose minimum is slower than the baseline's by more than the threshold fraction
+#               is reported as a regression. The timings are absolute, so the stored baseline is
+#               only meaningful on the machine that recorded it: regenerate it with
+#               python -m janggi.benchmarks --save-baseline on each machine before comparing.
+#                   Benchmark modules are only imported when one of their functions is selected,
+#               so a run filtered to the board benchmarks never imports pygame.
+
+import ast
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import time
+
+DEFAULT_ROUNDS = 5
+# each round of a fast benchmark repeats the call until it takes at least this long
+MIN_ROUND_TIME = 0.05
+DEFAULT_THRESHOLD = 0.25
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+class Benchmark:
+    """Represents the timing of one benchmark function, in the style of pytest-benchmark's fixture"""
+    def __init__(self, name, rounds=DEFAULT_ROUNDS, min_round_time=MIN_ROUND_TIME):
+        """
+        Initializes private data members for:
+            benchmark name, number of rounds, minimum round time, per-call times of each round,
+            calls per round, extra information recorded by the benchmark
+        """
+        self._name = name
+        self._rounds = rounds
+        self._min_round_time = min_round_time
+        self._times = []
+        self._loops = 0
+        self.extra_info = dict()
+
+    def get_name(self):
+        """getter for the benchmark's name (module.function)"""
+        return self._name
+
+    def __call__(self, func, *args, **kwargs):
+        """
+        times func(*args, **kwargs), repeating it within each round so fast calls are measurable
+        :return: the function's last return value
+        """
+        loops = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(loops):
+                result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - started
+            if elapsed >= self._min_round_time or loops >= 1 << 20:
+                break
+            loops *= 10 if elapsed < self._min_round_time / 10 else 2
+        self._loops = loops
+        self._times = [elapsed / loops]
+        for _ in range(self._rounds - 1):
+            started = time.perf_counter()
+            for _ in range(loops):
+                result = func(*args, **kwargs)
+            self._times.append((time.perf_counter() - started) / loops)
+        return result
+
+    def pedantic(self, func, setup=None, rounds=None):
+        """
+        times one call of func per round, calling setup() untimed before each call;
+        setup returns the tuple of arguments for func (or None for no arguments)
+        :param rounds: number of rounds (default: the harness's rounds), for slow calls
+        :return: the function's last return value
+        """
+        self._loops = 1
+        self._times = []
+        result = None
+        for _ in range(rounds or self._rounds):
+            args = setup() if setup is not None else None
+            started = time.perf_counter()
+            result = func(*(args or ()))
+            self._times.append(time.perf_counter() - started)
+        return result
+
+    def stats(self):
+        """returns the per-call statistics of the timed rounds (in seconds) as a dict"""
+        times = self._times
+        return {
+            'name': self._name,
+            'min': min(times),
+            'max': max(times),
+            'mean': statistics.mean(times),
+            'stddev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'rounds': len(times),
+            'loops': self._loops,
+            'extra_info': self.extra_info,
+        }
+
+
+def collect(pattern=None):
+    """
+    generator yields (name, function) for every bench_* function of the bench_*.py modules
+    in this package, in module order
+    :param pattern: optional substring, only benchmarks whose name contains it are yielded
+    """
+    package = __name__.rsplit('.', 1)[0]
+    directory = os.path.dirname(__file__)
+    for module_info in sorted(pkgutil.iter_modules([directory]), key=lambda info: info.name):
+        if not module_info.name.startswith('bench_'):
+            continue
+        # select the functions from the module's source, so unselected modules are never imported
+        with open(os.path.join(directory, module_info.name + '.py')) as file:
+            tree = ast.parse(file.read())
+        attributes = [node.name for node in tree.body
+                      if isinstance(node, ast.FunctionDef) and node.name.startswith('bench_')
+                      and (pattern is None or pattern in module_info.name + '.' + node.name)]
+        if not attributes:
+            continue
+        module = importlib.import_module(package + '.' + module_info.name)
+        for attribute in attributes:
+            yield module_info.name + '.' + attribute, getattr(module, attribute)
+
+
+def run(pattern=None, rounds=DEFAULT_ROUNDS, report=None):
+    """
+    runs the benchmarks and returns the results document (machine information and the
+    statistics of every benchmark)
+    :param report: optional function called with each benchmark's statistics as it finishes
+    """
+    results = []
+    for name, func in collect(pattern):
+        benchmark = Benchmark(name, rounds)
+        func(benchmark)
+        results.append(benchmark.stats())
+        if report is not None:
+            report(results[-1])
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'system': platform.system(),
+            'processor': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': results,
+    }
+
+
+def save(document, path):
+    """writes a results document as JSON"""
+    with open(path, 'w') as file:
+        json.dump(document, file, indent=2)
+        file.write('\n')
+
+
+def load(path):
+    """reads a results document saved with save()"""
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(document, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    compares the minimum per-call time of every benchmark with the baseline's
+    :param threshold: fraction a benchmark may be slower than its baseline before it's a regression
+    :return: list of (name, minimum, baseline minimum or None, change as a fraction or None, is regression)
+    """
+    baseline_min = {entry['name']: entry['min'] for entry in baseline['benchmarks']}
+    rows = []
+    for entry in document['benchmarks']:
+        previous = baseline_min.get(entry['name'])
+        if previous is None:
+            rows.append((entry['name'], entry['min'], None, None, False))
+            continue
+        change = entry['min'] / previous - 1 if previous else 0.0
+        rows.append((entry['name'], entry['min'], previous, change, change > threshold))
+    return rows
@@ -1,7 +1,7 @@
 # Author:       Zachary Meyers
 # Date:         2021-03-10
 # Description:  Portfolio Project for playing a game of Janggi (Korean Chess).
-#                   The Game class sets up a board for play (list of lists) with all
+#                   The Game class sets up a board for play (a compact Position) with all
 #               appropriate Pieces, and has methods for making moves, determining check, etc.
 #               and numerous helper methods for converting coordinates, displaying and
 #               changing the game board, etc.
@@ -19,8 +19,33 @@
 #               moved as part of its validation, so it is important that each child of the Piece class
 #               has a get_valid_moves() method that is specific to that Piece's move set.
 
-from janggi.piece import *
-from janggi.utils import algebraic_to_numeric, numeric_to_algebraic, swap_color
+import logging
+
+from janggi.piece import Piece, General, Guard, Elephant, Horse, Chariot, Cannon, Soldier
+from janggi.position import (Position, NUM_ROWS, NUM_COLS, NUM_SQUARES, BLUE, COLORS, COLOR_INDEX, EMPTY,
+                             GENERAL, GUARD, ELEPHANT, HORSE, CHARIOT, CANNON, SOLDIER,
+                             KIND_BY_ABBREVIATION, code_kind, code_color, code_from_name)
+from janggi.attacks import AttackMap, is_attacked
+from janggi.movegen import piece_targets, legal_moves, is_legal, has_legal_move, perft, divide
+from janggi.tables import SQUARE_COORDS, PALACE_SQUARES, PALACE_CORNERS, PALACE_CENTER
+from janggi.utils import Square, SQUARE_NAMES, algebraic_to_square, swap_color
+
+# blue fortress (palace) coordinates, built once from the move tables and never modified,
+# the Pieces walk the tables directly and don't need the red fortress coordinates
+BLUE_FORTRESS = frozenset(SQUARE_COORDS[square] for square in PALACE_SQUARES[BLUE])
+BLUE_FORTRESS_CORNERS = frozenset(SQUARE_COORDS[square] for square in PALACE_CORNERS[BLUE])
+BLUE_FORTRESS_CENTER = frozenset((SQUARE_COORDS[PALACE_CENTER[BLUE]],))
+
+# Piece subclass used by the Board adapter for each piece kind
+PIECE_CLASSES = {
+    GENERAL: General,
+    GUARD: Guard,
+    ELEPHANT: Elephant,
+    HORSE: Horse,
+    CHARIOT: Chariot,
+    CANNON: Cannon,
+    SOLDIER: Soldier,
+}
 
 
 class Board:
@@ -28,40 +53,60 @@ class Board:
     def __init__(self):
         """
         Initializes private data members for:
-            fortress coordinates, game board
+            compact position, Piece objects by square
         Sets up the positions for every Piece.
         """
-        # initialize blue fortress coordinates for use in each Piece subclass,
-        # can be converted to red fortress coordinates with use of helper method invert_coordinates()
-        self._b_fortress = [(7, 3), (8, 3), (9, 3), (7, 4), (8, 4), (9, 4), (7, 5), (8, 5), (9, 5)]
-        self._b_fort_corners = [(7, 3), (7, 5), (9, 3), (9, 5)]
-        self._b_fort_center = [(8, 4)]
-        self._grid = [
-            [Chariot(self, "r"), Elephant(self, "r"), Horse(self, "r"), Guard(self, "r"), None,
-             Guard(self, "r"), Elephant(self, "r"), Horse(self, "r"), Chariot(self, "r")],
-            [None, None, None, None, General(self, "r"), None, None, None, None],
-            [None, Cannon(self, "r"), None, None, None, None, None, Cannon(self, "r"), None],
-            [Soldier(self, "r"), None, Soldier(self, "r"), None, Soldier(self, "r"), None,
-             Soldier(self, "r"), None, Soldier(self, "r")],
-            [None, None, None, None, None, None, None, None, None],
-            [None, None, None, None, None, None, None, None, None],
-            [Soldier(self, "b"), None, Soldier(self, "b"), None, Soldier(self, "b"), None,
-             Soldier(self, "b"), None, Soldier(self, "b")],
-            [None, Cannon(self, "b"), None, None, None, None, None, Cannon(self, "b"), None],
-            [None, None, None, None, General(self, "b"), None, None, None, None],
-            [Chariot(self, "b"), Elephant(self, "b"), Horse(self, "b"), Guard(self, "b"), None,
-             Guard(self, "b"), Elephant(self, "b"), Horse(self, "b"), Chariot(self, "b")],
-        ]
+        # the compact position (flat array of piece codes) is the source of truth for the engine,
+        # _pieces mirrors it with one Piece object (or None) per square for the object-oriented API
+        self._position = Position.starting()
+        self._pieces = [None] * NUM_SQUARES
+        # optional incrementally maintained attacked-square bitsets, see enable_attack_map()
+        self._attack_map = None
+        # captured Piece objects (or None) for each move on the position's undo stack
+        self._captured = []
         # set starting positions for game pieces
         self._init_piece_positions()
 
+    def copy(self):
+        """
+        returns an independent Board with a copy of this board's position and side to move
+        (new Piece objects, empty undo stack, no attack map)
+        """
+        return Board._from_position(self._position.copy())
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        returns a new Board set up from a FEN-style string (see Position.to_fen())
+        :raises ValueError: if the string isn't a valid position
+        """
+        return cls._from_position(Position.from_fen(fen))
+
+    @classmethod
+    def _from_position(cls, position):
+        """helper function returns a new Board backed by a Position, with new Piece objects and no attack map"""
+        other = cls.__new__(cls)
+        other._position = position
+        other._pieces = [None] * NUM_SQUARES
+        other._attack_map = None
+        other._captured = []
+        other._init_piece_positions()
+        return other
+
+    def to_fen(self):
+        """returns the current position and side to move as a FEN-style string"""
+        return self._position.to_fen()
+
     def _init_piece_positions(self):
-        """helper function gives an algebraic position to every Piece on the board"""
-        # set starting positions for game pieces
-        for (row_index, col_index, piece_obj) in self.indexed_piece_objects():
-            num_coord = (row_index, col_index)                  # create coordinate
-            alg_coord = numeric_to_algebraic(num_coord)    # convert to algebraic
-            piece_obj.set_position(alg_coord)                   # set the position
+        """helper function creates a Piece for every occupied square and gives it an algebraic position"""
+        position = self._position
+        for square in range(NUM_SQUARES):
+            code = position.get(square)
+            if code == EMPTY:
+                continue
+            piece_obj = PIECE_CLASSES[code_kind(code)](self, COLORS[code_color(code)])
+            self._pieces[square] = piece_obj
+            piece_obj.set_square(square)
 
     # GENERATORS
 
@@ -70,23 +115,35 @@ class Board:
         generator yields all the piece objects from the game board along
         with associated row/column indexes
         """
-        for r_index, row in enumerate(self._grid):
-            for c_index, piece_obj in enumerate(row):
-                if piece_obj is not None:
-                    yield r_index, c_index, piece_obj
+        for square, piece_obj in enumerate(self._pieces):
+            if piece_obj is not None:
+                r_index, c_index = divmod(square, NUM_COLS)
+                yield r_index, c_index, piece_obj
 
     def all_pieces(self):
-        for (row, col, piece) in self.indexed_piece_objects():
-            yield piece
+        for piece_obj in self._pieces:
+            if piece_obj is not None:
+                yield piece_obj
 
     def pieces_by_color(self, color):
         """
         generator extends all_pieces to yield all piece objects from the
         game board of a specified color ('b' or 'r')
         """
-        for piece_obj in self.all_pieces():
-            if piece_obj.get_color() == color:
-                yield piece_obj
+        pieces = self._pieces
+        # copy the square list, callers may move pieces while iterating
+        for square in list(self._position.pieces(COLOR_INDEX[color])):
+            yield pieces[square]
+
+    def pieces_by_type(self, color, abbreviation):
+        """
+        generator yields the piece objects of a specified color ('b' or 'r') and type,
+        given by its abbreviation (ie 'Ch' for the Chariots), from the position's per-type index
+        """
+        pieces = self._pieces
+        # copy the square list, callers may move pieces while iterating
+        for square in list(self._position.pieces_of(COLOR_INDEX[color], KIND_BY_ABBREVIATION[abbreviation])):
+            yield pieces[square]
 
     def all_player_moves(self, color):
         """
@@ -95,36 +152,108 @@ class Board:
         key = piece's position
         val = list of valid moves
         """
+        position = self._position
+        squares = position.get_squares()
         all_valid_moves = dict()
-        # iterate through the player's pieces
-        for piece_obj in self.pieces_by_color(color):
-            all_valid_moves[piece_obj.get_numeric_position()] = piece_obj.get_valid_moves()
+        # iterate through the player's pieces, walking the precomputed move tables
+        for square in position.pieces(COLOR_INDEX[color]):
+            piece_moves = [SQUARE_COORDS[target] for target in piece_targets(squares, square)]
+            piece_moves.append(SQUARE_COORDS[square])   # pass move
+            all_valid_moves[SQUARE_COORDS[square]] = piece_moves
         return all_valid_moves
 
+    def legal_moves(self, color, start=None):
+        """
+        generator yields every fully legal (start, end) move for a player (color), as flat
+        square indexes. Unlike all_player_moves, moves that would put or leave the player's
+        General in check are never included, and there is a single pass move
+        (General square, General square) that is only included when not in check.
+        :param start: optional square index, only yield moves for the piece on it
+        """
+        return legal_moves(self._position, COLOR_INDEX[color], start)
+
+    def is_legal(self, move):
+        """
+        returns True if a (start, end) move of flat square indexes is fully legal for the piece
+        on the start square (start == end is a pass move)
+        """
+        return is_legal(self._position, move)
+
+    def has_legal_move(self, color, allow_pass=True):
+        """
+        returns True if a player (color) has at least one legal move, stopping at the first one found
+        :param allow_pass: whether a pass move counts as a legal move
+        """
+        return has_legal_move(self._position, COLOR_INDEX[color], allow_pass)
+
+    def perft(self, depth, divide_moves=False):
+        """
+        counts the leaf nodes of the legal move tree to depth plies for the side to move
+        (pass moves included), working on a copy of the position so the board is untouched
+        :param divide_moves: if True, returns a dict of node counts keyed by algebraic root move
+                             (ie ('a7', 'a6')) instead of the total
+        """
+        position = self._position.copy()
+        if not divide_moves:
+            return perft(position, depth)
+        return {(SQUARE_NAMES[start], SQUARE_NAMES[end]): nodes
+                for (start, end), nodes in divide(position, depth).items()}
+
     # GETTERS & SETTERS
 
+    def get_position(self):
+        """getter for the compact Position backing this board"""
+        return self._position
+
+    def hash(self):
+        """
+        returns the 64-bit Zobrist key of the current position (pieces on squares and the
+        side to move), maintained incrementally as moves are made and squares are changed
+        """
+        return self._position.hash()
+
+    def get_turn(self):
+        """getter for the side to move ('b' or 'r')"""
+        return COLORS[self._position.get_turn()]
+
+    def set_turn(self, color):
+        """setter for the side to move, where color is 'b' or 'r'"""
+        self._position.set_turn(COLOR_INDEX[color])
+
+    def get_attack_map(self):
+        """getter for the attack map (None unless enable_attack_map() was called)"""
+        return self._attack_map
+
+    def enable_attack_map(self):
+        """
+        Starts maintaining attacked-square bitsets for both colors, updated incrementally
+        whenever a square changes. is_in_check() then becomes a single bit test.
+        """
+        if self._attack_map is None:
+            self._attack_map = AttackMap(self._position)
+        return self._attack_map
+
     def get_blue_fortress(self):
-        """getter for blue fortress coordinates"""
-        return self._b_fortress
+        """getter for blue fortress coordinates (an immutable frozenset of (row, col) tuples)"""
+        return BLUE_FORTRESS
 
     def get_blue_fortress_corners(self):
-        """getter for blue fortress corners"""
-        return self._b_fort_corners
+        """getter for blue fortress corners (an immutable frozenset of (row, col) tuples)"""
+        return BLUE_FORTRESS_CORNERS
 
     def get_blue_fortress_center(self):
-        """getter for blue fortress center"""
-        return self._b_fort_center
+        """getter for blue fortress center (an immutable frozenset holding one (row, col) tuple)"""
+        return BLUE_FORTRESS_CENTER
 
     def get_general(self, color):
         """
         helper function returns the General object found on the board
-        with a specified color
+        with a specified color, looked up in the position's General index (None if there is none)
         """
-        general_name = color + "Gn"
-        # iterate through all pieces on the game board
-        for piece_obj in self.all_pieces():
-            if general_name in piece_obj.get_name():
-                return piece_obj
+        square = self._position.general_square(COLOR_INDEX[color])
+        if square is None:
+            return None
+        return self._pieces[square]
 
     def get_contents_numeric(self, tup_coord):
         """
@@ -134,7 +263,14 @@ class Board:
         :return: the object in the square (or None)
         """
         row, col = tup_coord
-        return self._grid[row][col]
+        return self._pieces[row * NUM_COLS + col]
+
+    def get_contents_square(self, square: Square):
+        """
+        Returns whatever is found at the given flat square index (row * 9 + col)
+        (either a Piece or None)
+        """
+        return self._pieces[square]
 
     def get_contents_algebraic(self, alg_coord):
         """
@@ -143,17 +279,64 @@ class Board:
         :param alg_coord: in string format ie 'b1'
         :return: the object in the square (or None)
         """
-        row_index, col_index = algebraic_to_numeric(alg_coord)
-        board = self._grid
-        return board[row_index][col_index]
+        return self._pieces[algebraic_to_square(alg_coord)]
 
     def set_square_contents(self, alg_coord, piece_obj):
         """
         For debugging/testing, overrides a square on the board with a given Piece
+        (or None), keeping the compact position in sync
         """
-        row_index, col_index = algebraic_to_numeric(alg_coord)
-        board = self._grid
-        board[row_index][col_index] = piece_obj
+        square = algebraic_to_square(alg_coord)
+        self._pieces[square] = piece_obj
+        if piece_obj is None:
+            self._position.put(square, EMPTY)
+        else:
+            self._position.put(square, code_from_name(piece_obj.get_name()))
+            piece_obj.set_square(square)
+        if self._attack_map is not None:
+            self._attack_map.update((square,))
+
+    # MAKE / UNMAKE
+
+    def make(self, move: (Square, Square)):
+        """
+        Plays a move for the side to move and pushes an undo record, so it can be taken back
+        with unmake(). Works on square indexes only, no coordinate strings are involved.
+        Does not check the move's validity.
+        :param move: (start, end) tuple of flat square indexes, start == end is a pass move
+        :return: the captured Piece object (or None)
+        """
+        start, end = move
+        pieces = self._pieces
+        captured_obj = None
+        if start != end:
+            captured_obj = pieces[end]
+            piece_obj = pieces[start]
+            pieces[end] = piece_obj
+            pieces[start] = None
+            piece_obj.set_square(end)
+        self._position.make(start, end)
+        self._captured.append(captured_obj)
+        if self._attack_map is not None:
+            self._attack_map.update(move)
+        return captured_obj
+
+    def unmake(self):
+        """
+        Takes back the last move played with make(), restoring any captured Piece and the turn
+        :return: the (start, end) move that was taken back
+        """
+        start, end = self._position.unmake()
+        captured_obj = self._captured.pop()
+        if start != end:
+            pieces = self._pieces
+            piece_obj = pieces[end]
+            pieces[start] = piece_obj
+            pieces[end] = captured_obj
+            piece_obj.set_square(start)
+        if self._attack_map is not None:
+            self._attack_map.update((start, end))
+        return start, end
 
     # FILTERS
 
@@ -163,12 +346,9 @@ class Board:
 
         Returns: a list of moves that are only on the game board
         """
-        grid = self._grid
-        num_rows = len(grid)
-        num_cols = len(grid[0])
         valid_moves = []
         for row, col in moves_list:
-            if 0 <= row < num_rows and 0 <= col < num_cols:  # if column is in [A...I] and row is in [0...9]
+            if 0 <= row < NUM_ROWS and 0 <= col < NUM_COLS:  # if column is in [A...I] and row is in [0...9]
                 valid_moves.append((row, col))                    # add to valid moves
         return valid_moves
 
@@ -182,7 +362,7 @@ class Board:
         valid_moves = []
         for coord in tup_list:
             row_index, col_index = coord
-            piece_obj = self._grid[row_index][col_index]
+            piece_obj = self._pieces[row_index * NUM_COLS + col_index]
             if piece_obj is None:
                 valid_moves.append(coord)           # valid if empty
             elif piece_obj.get_color() != color:
@@ -196,11 +376,8 @@ class Board:
         helper function takes a tuple coordinate and
         returns true if it's on the game board, false otherwise
         """
-        row_len = len(self._grid[0])
-        col_len = len(self._grid)
-
         row, col = tup_coord
-        if 0 <= col < row_len and 0 <= row < col_len:
+        if 0 <= col < NUM_COLS and 0 <= row < NUM_ROWS:
             return True
         else:
             return False
@@ -213,7 +390,8 @@ class Board:
         """
         header = ["A", "B", "C", "D", "E", "F", "G", "H", "I"]
         print("   ", list_format(header))                          # print header
-        for num, row in enumerate(self._grid):               # print each row of the board
+        for num in range(NUM_ROWS):                          # print each row of the board
+            row = self._pieces[num * NUM_COLS:(num + 1) * NUM_COLS]
             if num+1 != 10:
                 print(num+1, " ", list_format(row), " ", num+1)    # add extra space for single digit rows
             else:
@@ -223,31 +401,25 @@ class Board:
     def is_in_check(self, color):
         """
         Takes a color for the player in question.
-        Use all_player_moves to create a large list of all of the enemy's possible next moves.
-        If the friendly General's position is in this list of enemy_valid_moves (able to be captured),
-        they are in check, return True.
+        Looks outward from the friendly General's square for enemy pieces that can reach it
+        (reverse rays, cannon screens, horse and elephant legs, soldier and palace steps),
+        or tests the attack map's bitset when one is enabled.
+        If the General can be captured on the enemy's next move, they are in check, return True.
         Otherwise, return False.
         """
-        # initialize enemy color
-        enemy_color = swap_color(color)
-
-        # get all the enemy's valid moves
-        enemy_valid_moves = []
-        for move_list in self.all_player_moves(enemy_color).values():
-            enemy_valid_moves.extend(move_list)
+        color_index = COLOR_INDEX[color]
+        enemy_index = COLOR_INDEX[swap_color(color)]
+        # get the friendly general's square
+        general_square = self._position.general_square(color_index)
 
-        # get the friendly general
-        general_obj = self.get_general(color)
-        # get the general's position
-        general_pos = general_obj.get_numeric_position()
+        if self._attack_map is not None:
+            in_check = self._attack_map.is_attacked(general_square, enemy_index)
+        else:
+            in_check = is_attacked(self._position.get_squares(), general_square, enemy_index)
 
-        # if the general's position can be captured by the opposite player
-        # on the next turn, they are in check
-        if general_pos in enemy_valid_moves:
+        if in_check:
             logging.debug(f'{color} in check!')
-            return True
-        else:
-            return False
+        return in_check
 
 
 def list_format(a_list):
@@ -0,0 +1,170 @@
+# Description:  Opening book built from game records.
+#                   The book file is the 4-byte magic FILE_MAGIC and an entry count, followed by
+#               12-byte entries sorted by position: the Zobrist key of a position, one move
+#               played from it (start and end square indexes) and the move's weight. Each move
+#               of a position is weighted by how often it was played and how it did for the
+#               side that played it: 2 per win, 1 per draw (or unfinished game), 0 per loss.
+#                   OpeningBook maps the file read-only with mmap (see janggi.mmapfile) and finds a
+#               position's moves by binary search on the sorted keys, so a probe reads a handful of
+#               entries and the book is never loaded into memory. The AI probes the book before searching and
+#               plays a book move instantly, picked at random in proportion to the weights so
+#               its openings vary.
+#                   build() creates the book from an iterable of janggi.record.GameRecords
+#               (python -m janggi.book build out.jbk games.jgr ...), keeping the first
+#               max_plies moves of each game.
+
+import collections
+import random
+import struct
+import sys
+
+from janggi.mmapfile import MappedFile, build_parser, probe_position
+from janggi.position import Position, BLUE
+from janggi.record import read_record_files, record_moves
+from janggi.utils import square_to_algebraic
+
+FILE_MAGIC = b'JBK1'
+# magic, number of entries
+_FILE_HEADER = struct.Struct('<4sQ')
+# Zobrist key, move start, move end, weight
+_ENTRY = struct.Struct('<QBBH')
+_KEY = struct.Struct('<Q')
+MAX_WEIGHT = 0xFFFF
+
+DEFAULT_MAX_PLIES = 20
+# moves played fewer times than this are left out of the book
+DEFAULT_MIN_GAMES = 2
+
+BookMove = collections.namedtuple('BookMove', ['move', 'weight'])
+
+
+def _move_weight(result, color):
+    """helper function returns the weight a game result adds to a move played by a color index"""
+    if result == "BLUE_WON":
+        return 2 if color == BLUE else 0
+    if result == "RED_WON":
+        return 0 if color == BLUE else 2
+    return 1
+
+
+def build(path, records, max_plies=DEFAULT_MAX_PLIES, min_games=DEFAULT_MIN_GAMES):
+    """
+    Builds a book file from game records, replacing any existing file.
+    :param records: iterable of janggi.record.GameRecord (ie from read_records())
+    :param max_plies: number of plies from the start of each game to add to the book
+    :param min_games: moves played in fewer games than this are left out
+    :return: the number of entries (position and move pairs) in the book
+    """
+    # (zobrist key, move) -> [games, weight]
+    stats = dict()
+    for record in records:
+        position = Position.starting()
+        for ply, move in enumerate(record_moves(record)):
+            if ply >= max_plies:
+                break
+            move_stats = stats.setdefault((position.hash(), move), [0, 0])
+            move_stats[0] += 1
+            move_stats[1] += _move_weight(record.result, position.get_turn())
+            position.make(*move)
+
+    entries = sorted((key, move, weight) for (key, move), (games, weight) in stats.items()
+                     if games >= min_games and weight > 0)
+    # scale the weights down to 16 bits if needed, keeping every entry playable
+    heaviest = max((weight for key, move, weight in entries), default=0)
+    scale = MAX_WEIGHT / heaviest if heaviest > MAX_WEIGHT else 1
+    with open(path, 'wb') as file:
+        file.write(_FILE_HEADER.pack(FILE_MAGIC, len(entries)))
+        for key, (start, end), weight in entries:
+            file.write(_ENTRY.pack(key, start, end, max(1, int(weight * scale))))
+    return len(entries)
+
+
+class OpeningBook(MappedFile):
+    """Represents a read-only, memory-mapped opening book file"""
+    description = "opening book"
+
+    def __init__(self, path):
+        """
+        Initializes private data members for:
+            open file and its memory map (see MappedFile), number of entries
+        :raises ValueError: if the file isn't an opening book
+        """
+        super().__init__(path)
+        magic, count = _FILE_HEADER.unpack_from(self._map, 0) if len(self._map) >= _FILE_HEADER.size else (None, 0)
+        if magic != FILE_MAGIC or len(self._map) != _FILE_HEADER.size + count * _ENTRY.size:
+            self.invalid()
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def _key_at(self, index):
+        """helper function returns the Zobrist key of the entry at an index"""
+        return _KEY.unpack_from(self._map, _FILE_HEADER.size + index * _ENTRY.size)[0]
+
+    def probe(self, position):
+        """
+        Looks up a Position by binary search.
+        :return: list of BookMove (move as (start, end) square indexes, weight), heaviest first,
+                 empty if the position isn't in the book
+        """
+        key = position.hash()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        offset = _FILE_HEADER.size + low * _ENTRY.size
+        for _ in range(low, self._count):
+            entry_key, start, end, weight = _ENTRY.unpack_from(self._map, offset)
+            if entry_key != key:
+                break
+            moves.append(BookMove((start, end), weight))
+            offset += _ENTRY.size
+        moves.sort(key=lambda book_move: book_move.weight, reverse=True)
+        return moves
+
+    def choose(self, position, legal_moves=None, rng=random):
+        """
+        returns a book move for a Position picked at random in proportion to the weights,
+        or None if the position isn't in the book
+        :param legal_moves: optional collection of moves, book moves not in it are never picked
+                            (guards against Zobrist key collisions)
+        :param rng: random.Random-like object to pick with
+        """
+        moves = self.probe(position)
+        if legal_moves is not None:
+            moves = [book_move for book_move in moves if book_move.move in legal_moves]
+        if not moves:
+            return None
+        return rng.choices([book_move.move for book_move in moves], [book_move.weight for book_move in moves])[0]
+
+    def __repr__(self):
+        return 'OpeningBook({!r}, {} entries)'.format(self._path, self._count)
+
+
+def main(argv=None):
+    """command line to build a book from record files or probe a position, returns the exit status"""
+    parser, build_command = build_parser('python -m janggi.book', 'Janggi opening book', 'book')
+    build_command.add_argument('--max-plies', type=int, default=DEFAULT_MAX_PLIES,
+                               help='plies from the start of each game to add (default %(default)s)')
+    build_command.add_argument('--min-games', type=int, default=DEFAULT_MIN_GAMES,
+                               help='leave out moves played in fewer games (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = build(args.book, read_record_files(args.records), args.max_plies, args.min_games)
+        print('stored {} book moves in {}'.format(count, args.book))
+        return 0
+
+    with OpeningBook(args.book) as book:
+        for (start, end), weight in book.probe(probe_position(args)):
+            print('{} -> {}: {}'.format(square_to_algebraic(start), square_to_algebraic(end), weight))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
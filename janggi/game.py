@@ -4,7 +4,37 @@ import random
 import logging
 
 from janggi.board import Board
-from janggi.utils import algebraic_to_numeric, numeric_to_algebraic, swap_color
+from janggi.parallel import SearchPool
+from janggi.position import BLUE, RED
+from janggi.search import search
+from janggi.ttable import TranspositionTable
+from janggi.utils import algebraic_to_square, square_to_algebraic, swap_color
+
+
+# AI levels from AI_SEARCH_LEVEL up use the alpha-beta search engine: each level adds 10 ms
+# to the time budget, and every 10 levels add a ply to the depth limit (see ai_search_budget).
+# Levels above AI_MAX_LEVEL are clamped to it: the GUI's 'duel' mode (level 1337) is the
+# 'impossible' AI (level 99) playing both sides, searching up to 990 ms and 9 plies a move.
+AI_SEARCH_LEVEL = 20
+AI_MAX_LEVEL = 99
+# memory budget of the search AI's transposition table, allocated on its first search
+AI_TABLE_SIZE_MB = 16
+
+# a position reached this many times (same side to move) ends the game in a draw
+REPETITION_LIMIT = 3
+
+# the AI (levels 10 and up) plays a position database's best move for positions reached at
+# least this many times in its games
+POSITION_DB_MIN_VISITS = 2
+# the search levels only play it instead of searching for positions reached this many times,
+# below that they search it first
+POSITION_DB_SEARCH_MIN_VISITS = 100
+
+
+def ai_search_budget(level):
+    """returns the (max_time_ms, max_depth) a search level AI searches with, levels above AI_MAX_LEVEL are clamped"""
+    search_level = min(level, AI_MAX_LEVEL)
+    return search_level * 10, search_level // 10
 
 
 class Game:
@@ -12,17 +42,34 @@ class Game:
     def __init__(self):
         """
         Initializes private data members for:
-            game state, current turn
+            game state, board (which also tracks the current turn, blue starts the game)
         Sets up the positions for every Piece.
         """
         self._game_state = "UNFINISHED"
-        self._turn = "b"        # blue starts the game
         self._board = Board()
+        # result of the AI's last search (None until a search level AI has moved)
+        self._last_search = None
+        self._ttable = None
+        self._search_pool = None
+        # optional janggi.positiondb.PositionDB consulted on every turn
+        self._position_db = None
+        # optional janggi.book.OpeningBook probed before the AI searches
+        self._opening_book = None
+        # optional janggi.tablebase.Tablebases probed once few enough pieces are left
+        self._tablebase = None
+        # number of times each position (Zobrist key) has been reached
+        self._position_counts = {self._board.hash(): 1}
 
     # ATTRIBUTE GETTERS & SETTERS
 
     def get_game_state(self):
-        """getter for game state"""
+        """
+        getter for game state, one of:
+            "UNFINISHED"
+            "BLUE_WON", "RED_WON":  the other player is checkmated
+            "STALEMATE":            the player to move is not in check, but passing is their only legal move
+            "REPETITION":           the same position was reached REPETITION_LIMIT times
+        """
         return self._game_state
 
     def set_game_state(self, game_state):
@@ -31,94 +78,228 @@ class Game:
 
     def get_turn(self):
         """getter for turn"""
-        return self._turn
+        return self._board.get_turn()
 
     def get_turn_long(self):
-        return {'b': 'blue', 'r': 'red'}[self._turn]
+        return {'b': 'blue', 'r': 'red'}[self.get_turn()]
 
     def set_turn(self, color):
         """setter for turn"""
-        self._turn = color
+        self._board.set_turn(color)
 
     def get_next_turn(self):
-        return swap_color(self._turn)
+        return swap_color(self.get_turn())
 
     def update_turn(self):
         """helper function updates the turn from 'r' to 'b' with the use of swap_color"""
-        self.set_turn(swap_color(self._turn))
+        self.set_turn(swap_color(self.get_turn()))
 
     def get_board(self):
         return self._board
 
+    def get_last_search(self):
+        """getter for the SearchResult of the AI's last search (best move, score, principal variation)"""
+        return self._last_search
+
+    def snapshot(self, workers=1):
+        """
+        returns an independent copy of the game (board, game state, repetition counts) for the
+        AI to think on while this game stays in use. The copy shares this game's transposition
+        table and search pool, so only one of the two may search at a time.
+        :param workers: number of processes the copy will search with, a search pool is
+                        started on this game first if needed so it outlives the copy
+        """
+        if workers > 1:
+            self.get_search_pool(workers)
+        other = Game.__new__(Game)
+        other._game_state = self._game_state
+        other._board = self._board.copy()
+        other._last_search = None
+        other._ttable = self.get_transposition_table()
+        other._search_pool = self._search_pool
+        other._position_db = self._position_db
+        other._opening_book = self._opening_book
+        other._tablebase = self._tablebase
+        other._position_counts = dict(self._position_counts)
+        return other
+
+    def get_position_db(self):
+        """getter for the position database consulted by the AI (None if there is none)"""
+        return self._position_db
+
+    def set_position_db(self, position_db):
+        """setter for the janggi.positiondb.PositionDB (or None) consulted by the AI on every turn"""
+        self._position_db = position_db
+
+    def get_opening_book(self):
+        """getter for the opening book probed by the AI (None if there is none)"""
+        return self._opening_book
+
+    def set_opening_book(self, opening_book):
+        """setter for the janggi.book.OpeningBook (or None) the AI plays from while the position is in it"""
+        self._opening_book = opening_book
+
+    def get_tablebase(self):
+        """getter for the endgame tablebases probed by the AI (None if there are none)"""
+        return self._tablebase
+
+    def set_tablebase(self, tablebase):
+        """setter for the janggi.tablebase.Tablebases (or None) the AI plays perfectly from in the endgame"""
+        self._tablebase = tablebase
+
+    def lookup_position(self):
+        """returns the position database's PositionEntry for the current position (None if not found or no database)"""
+        if self._position_db is None:
+            return None
+        return self._position_db.get(self._board.get_position())
+
+    def get_transposition_table(self):
+        """getter for the search AI's TranspositionTable, allocated on first use and kept for the whole game"""
+        if self._ttable is None:
+            self._ttable = TranspositionTable(AI_TABLE_SIZE_MB)
+        return self._ttable
+
+    def get_search_pool(self, workers):
+        """
+        getter for the multi-process SearchPool used by the search AI with workers processes,
+        started on first use and restarted if the number of workers changes
+        """
+        if self._search_pool is not None and self._search_pool.get_workers() != workers:
+            self._search_pool.close()
+            self._search_pool = None
+        if self._search_pool is None:
+            self._search_pool = SearchPool(workers, AI_TABLE_SIZE_MB)
+        return self._search_pool
+
+    def close(self):
+        """stops the search AI's helper processes, if any were started"""
+        if self._search_pool is not None:
+            self._search_pool.close()
+            self._search_pool = None
+
     def is_in_check(self, color):
         return self._board.is_in_check(color)
 
     # ACTIONS
 
-    def make_ai_move(self, level):
+    def make_ai_move(self, level, workers=1):
+        """
+        Picks a move for the current player with choose_ai_move() and plays it.
+        :return: the (start, end) algebraic coordinates of the move made
+        """
+        start, end = self.choose_ai_move(level, workers)
+        made = self.make_move(start, end)
+        assert made, 'legal move {} -> {} was rejected'.format(start, end)
+        return start, end
+
+    def choose_ai_move(self, level, workers=1, stop=None):
+        """
+        Picks a move for the current player from the board's legal moves, without playing it.
+            level 0:    random legal move (passing included)
+            level > 0:  avoids pass moves unless passing is the only legal move
+            level >= 10: plays the tablebase's best move once the position is in an endgame table,
+                        otherwise a move from the opening book if the position is in it, otherwise
+                        plays the position database's best move if the position was reached
+                        at least POSITION_DB_MIN_VISITS times, otherwise
+                        prefers the capture with the highest worth
+            level >= AI_SEARCH_LEVEL: alpha-beta search of the same non-pass moves, the level maps to
+                        a time budget and depth (see ai_search_budget), levels above AI_MAX_LEVEL
+                        search like AI_MAX_LEVEL; the position database's move is only played
+                        without searching if the position was reached at least
+                        POSITION_DB_SEARCH_MIN_VISITS times, otherwise it is searched first
+        Every candidate is already legal, so the chosen move is played on the first try.
+        :param workers: number of processes searching in parallel (search levels only),
+                        helper processes are kept until close() is called
+        :param stop: optional threading.Event-like object, setting it cuts a search short
+                     (the best move found so far is returned)
+        :return: the (start, end) algebraic coordinates of the chosen move
+        """
         assert (self.get_game_state() == "UNFINISHED")
 
-        moves = self._board.all_player_moves(self.get_turn())
-        invalid_moves = set()
-
-        while True:
-            start_num = None
-            end_num = None
-
-            # Find move that causes check
-            # if level >= 20:
-            #    for s,ends in moves.items():
-            #        for e in ends:
-            #            p = self._board.get_square_contents(e)
-            #            if p is not None:
-            #                pass
-
-            # Find move with highest capture value
-            if start_num is None and level >= 10:
-                max_capture = 0
-                for s, ends in moves.items():
-                    for e in ends:
-                        if (s, e) in invalid_moves:
-                            continue  # skip previously tried invalid moves
-                        if s == e:
-                            continue  # skip pass moves
-                        p = self._board.get_contents_algebraic(numeric_to_algebraic(e))
-                        if p is not None:
-                            if p.get_worth() > max_capture:
-                                (start_num, end_num) = (s, e)
-                                max_capture = p.get_worth()
-                if start_num is not None:
-                    logging.debug('AI found max-capture={} with {} -> {}'.format(
-                        max_capture, numeric_to_algebraic(start_num),
-                        numeric_to_algebraic(end_num)))
+        board = self._board
+        moves = list(board.legal_moves(self.get_turn()))
+        # make_move ends the game as soon as the player to move has no legal move
+        assert moves, 'no legal moves in an unfinished game'
+
+        all_moves = moves
+        if level > 0:
+            # disallow pass moves for anything other than "easy" AI
+            non_pass_moves = [(s, e) for (s, e) in moves if s != e]
+            if non_pass_moves:
+                moves = non_pass_moves
+
+        move = None
+        # Play the tablebase's best move (the fastest win or the slowest loss, passing included)
+        # once the pieces left are covered by an endgame table
+        if level >= 10 and self._tablebase is not None:
+            position = board.get_position()
+            if len(position.pieces(BLUE)) + len(position.pieces(RED)) <= self._tablebase.get_max_pieces():
+                best, score = self._tablebase.best_move(position)
+                if best in all_moves:
+                    move = best
+                    logging.debug('AI playing tablebase move {} -> {} (score {})'.format(
+                        square_to_algebraic(move[0]), square_to_algebraic(move[1]), score))
+
+        # Play an opening book move instantly, weighted by how often and how well it was played
+        if move is None and level >= 10 and self._opening_book is not None:
+            move = self._opening_book.choose(board.get_position(), moves)
+            if move is not None:
+                logging.debug('AI playing book move {} -> {}'.format(
+                    square_to_algebraic(move[0]), square_to_algebraic(move[1])))
+
+        # Play the best move of the recorded games, if this position was seen often enough
+        if move is None and level >= 10:
+            entry = self.lookup_position()
+            if entry is not None and entry.visits >= POSITION_DB_MIN_VISITS and entry.move in moves:
+                if level < AI_SEARCH_LEVEL or entry.visits >= POSITION_DB_SEARCH_MIN_VISITS:
+                    move = entry.move
+                    logging.debug('AI playing position database move {} -> {} (seen {} times, w/d/l {}/{}/{})'.format(
+                        square_to_algebraic(move[0]), square_to_algebraic(move[1]),
+                        entry.visits, entry.wins, entry.draws, entry.losses))
                 else:
-                    logging.debug('AI failed to find max-capture')
-
-            # Find random move
-            if start_num is None:
-                assert (end_num is None)
-                start_num = random.choice(list(moves.keys()))
-                end_num = random.choice(moves[start_num])
-                logging.debug('AI trying random move {} -> {}'.format(
-                    numeric_to_algebraic(start_num),
-                    numeric_to_algebraic(end_num)))
-
-            if level > 0:
-                # disallow pass moves for anything other than "easy" AI
-                if len(moves[start_num]) > 1:
-                    while start_num == end_num:
-                        end_num = random.choice(moves[start_num])
-                    logging.debug('AI avoiding pass move, new move {} -> {}'.format(
-                        numeric_to_algebraic(start_num),
-                        numeric_to_algebraic(end_num)))
-
-            start = numeric_to_algebraic(start_num)
-            end = numeric_to_algebraic(end_num)
-            if self.make_move(start, end):
-                break
+                    # the search tries the first root move first, so it keeps it on equal scores
+                    moves = [entry.move] + [other for other in moves if other != entry.move]
+
+        # Search for the best move within the level's time budget
+        if move is None and level >= AI_SEARCH_LEVEL:
+            max_time_ms, max_depth = ai_search_budget(level)
+            if workers > 1:
+                pool = self.get_search_pool(workers)
+                ttable = pool.get_transposition_table()
+                self._last_search = pool.search(board.get_position(), max_time_ms=max_time_ms, max_depth=max_depth,
+                                                stop=stop, root_moves=moves)
+            else:
+                ttable = self.get_transposition_table()
+                self._last_search = search(board, max_time_ms=max_time_ms, max_depth=max_depth, stop=stop,
+                                           ttable=ttable, root_moves=moves)
+            move = self._last_search.move
+            logging.debug('AI searched depth={} score={} pv={} table hit rate={:.1%}'.format(
+                self._last_search.depth, self._last_search.score, self._last_search.pv, ttable.hit_rate()))
+
+        # Find move with highest capture value
+        if move is None and level >= 10:
+            max_capture = 0
+            for s, e in moves:
+                p = board.get_contents_square(e)
+                if s != e and p is not None and p.get_worth() > max_capture:
+                    move = (s, e)
+                    max_capture = p.get_worth()
+            if move is not None:
+                logging.debug('AI found max-capture={} with {} -> {}'.format(
+                    max_capture, square_to_algebraic(move[0]),
+                    square_to_algebraic(move[1])))
             else:
-                invalid_moves.add((start_num, end_num))
+                logging.debug('AI failed to find max-capture')
 
+        # Find random move
+        if move is None:
+            move = random.choice(moves)
+            logging.debug('AI playing random move {} -> {}'.format(
+                square_to_algebraic(move[0]),
+                square_to_algebraic(move[1])))
+
+        start = square_to_algebraic(move[0])
+        end = square_to_algebraic(move[1])
         return start, end
 
     def hypothetical_move(self, start, end):
@@ -128,43 +309,33 @@ class Game:
         checkmate on all of a General's valid moves at the end of make_move.
             Takes a Piece's current position and a hypothetical end position,
         (assumes start and end position have already been validated in make_move).
-        temporarily sets the game board to this scenario.
+        plays the move on the board with make() and takes it back with unmake().
             If the move would cause the player to be in check, returns False,
         otherwise return True.
         """
-        # get Piece from start position
-        piece_obj = self._board.get_contents_algebraic(start)
-        # get object from end position (either a Piece or None)
-        end_obj = self._board.get_contents_algebraic(end)
-        # clear start position
-        self._board.set_square_contents(start, None)
-        # set General to end position
-        self._board.set_square_contents(end, piece_obj)
-        piece_obj.set_position(end)
-
-        # run is_in_check on the current player,
-        # if in check, set valid_move to FALSE
-        # else set valid_move to TRUE
-        if self.is_in_check(piece_obj.get_color()):
-            valid_move = False
-        else:
-            valid_move = True
-
-        # set end position back to end_obj
-        self._board.set_square_contents(end, end_obj)
-        if end_obj is not None:
-            end_obj.set_position(end)
-        # set Piece back to start position
-        self._board.set_square_contents(start, piece_obj)
-        piece_obj.set_position(start)
+        start_square = algebraic_to_square(start)
+        end_square = algebraic_to_square(end)
+        return self.hypothetical_square_move(start_square, end_square)
 
+    def hypothetical_square_move(self, start_square, end_square):
+        """
+        hypothetical_move() for flat square indexes: plays start_square -> end_square,
+        tests whether the mover's General is in check, then takes the move back
+        """
+        board = self._board
+        color = board.get_contents_square(start_square).get_color()
+        board.make((start_square, end_square))
+        # run is_in_check on the moving player,
+        # if in check, the move is invalid
+        valid_move = not board.is_in_check(color)
+        board.unmake()
         # return whether or not this hypothetical move caused the player to be in check
         return valid_move
 
     def make_move(self, start, end):
         """
-        Checks the validity of a move, uses get_valid_moves() from the Piece class instance
-        found at the start square.
+        Checks the validity of a move with the board's legal move check, which uses the
+        move set of the Piece found at the start square.
             Note:       each piece has a valid pass move in its set of valid moves.
                         it is treated like any other move, but won't remove the piece.
             Invalid if: start square is empty (None), not the starting square's turn,
@@ -175,8 +346,9 @@ class Game:
             If valid:   move Piece object from start square to end square
                         (removes opposing piece or fills empty square),
                         update moved Piece object's position, clear start square
-            Win check:  Look for checkmate on opposite player's General, if True
-                        update game_state accordingly to reflect current player won.
+            Game over:  Look for checkmate on opposite player's General (any legal reply
+                        by any piece counts), stalemate or repetition, and update
+                        game_state accordingly.
             End:        update turn for next player, return True
         :param start: algebraic coordinate for the start square
         :param end: algebraic coordinate for the end square
@@ -194,59 +366,55 @@ class Game:
             return False
         if self.get_game_state() != "UNFINISHED":  # invalid move if game is finished
             return False
-        end_tup = algebraic_to_numeric(end)
-        if end_tup not in piece_obj.get_valid_moves():  # invalid if end position is not valid for this piece
+        start_square = piece_obj.get_square()
+        end_square = algebraic_to_square(end)
+        # invalid if end position is not valid for this piece,
+        # or if this move ends with the current player's general in check
+        if not self._board.is_legal((start_square, end_square)):
             return False
 
-        # initialize colors for the current and next player
+        # initialize color for the current player
         current_color = self.get_turn()
-        next_color = self.get_next_turn()
 
-        # At this point, the current player's move is in their valid move set, but...
-        #   If this move ends with the current player's general in check, invalid move
-        if self.hypothetical_move(start, end) is False:
-            return False
-
-        #  If the valid move is a pass move (and it hasn't put or left the player in check),
-        #  simply update turn and return True
-        if start == end:
+        # VALID MOVE
+        # move Piece object to new square (removes opposing piece or fills empty square),
+        # this also updates the turn. A pass move (that hasn't put or left the player in check)
+        # leaves the board unchanged.
+        self._board.make((start_square, end_square))
+        if start_square == end_square:
             logging.info(f'{current_color} moved: pass')
-            self.update_turn()
-            return True
-
-        # otherwise, VALID MOVE
-
-        # move Piece object to new square
-        # (removes opposing piece or fills empty square)
-        self._board.set_square_contents(end, piece_obj)
-        piece_obj.set_position(end)  # store new position (algebraic coordinate)
-        self._board.set_square_contents(start, None)
-
-        # if the next player is in check...
-        # try to determine checkmate: make use of hypothetical_move() helper
-        checkmate = None
-        if self._board.is_in_check(next_color):
-            # initialize checkmate to True
-            checkmate = True
-            enemy_general = self._board.get_general(next_color)
-            enemy_general_pos = enemy_general.get_position()
-            for move in enemy_general.get_valid_moves():
-                # try a hypothetical move
-                potential_move_pos = numeric_to_algebraic(move)
-                if self.hypothetical_move(enemy_general_pos, potential_move_pos):
-                    checkmate = False  # if a general can hypothetically move, not in checkmate
-
-        if checkmate:
-            if self.get_turn() == "b":
-                self.set_game_state("BLUE_WON")
-            elif self.get_turn() == "r":
-                self.set_game_state("RED_WON")
-
-        # update turn
-        logging.info(f'{current_color} moved: {start} -> {end}')
-        self.update_turn()
+        else:
+            logging.info(f'{current_color} moved: {start} -> {end}')
+
+        # look for checkmate, stalemate or repetition
+        self.update_game_state(current_color)
         return True
 
+    def update_game_state(self, mover_color):
+        """
+        Helper function determines whether the game is over after mover_color moved,
+        runs after every move (pass moves included):
+            Checkmate:  the next player is in check and has no legal move, mover_color won.
+            Stalemate:  the next player is not in check but can only pass.
+            Repetition: the current position has now been reached REPETITION_LIMIT times.
+        Legal moves are generated lazily, so the search stops at the first legal reply.
+        """
+        board = self._board
+        next_color = swap_color(mover_color)
+
+        if not board.has_legal_move(next_color, allow_pass=False):
+            if board.is_in_check(next_color):
+                self.set_game_state("BLUE_WON" if mover_color == "b" else "RED_WON")
+            else:
+                self.set_game_state("STALEMATE")
+            return
+
+        key = board.hash()
+        count = self._position_counts.get(key, 0) + 1
+        self._position_counts[key] = count
+        if count >= REPETITION_LIMIT:
+            self.set_game_state("REPETITION")
+
 
 # test move sequences below
 def main():
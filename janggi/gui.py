@@ -5,13 +5,26 @@
 # Description:  This module creates a simple GUI with pygame for playing a game of Janggi,
 #               and makes use of the logic from the Game module.
 #               All images used in the assets directory are public domain.
-#               Each child instance of the Piece class in Game has a data member
-#               pointing to a corresponding piece image in assets.
+#               Piece images in assets are looked up by piece name (ie 'bCh') in the
+#               process-wide sprite cache of janggi.sprites, the Pieces themselves hold no image.
 #               There are various helper functions that...:
 #                   --determine where to blit game pieces
 #                   --set boundaries (rectangles) for valid mouse clicks
 #                   --create images for desired text to display
 #                   --blit the current state of the game board
+#               After the first full draw, a BoardRenderer repaints only what changed (the squares
+#               a move touched, move highlights and the status strip along the bottom) and pushes
+#               just those rectangles to the display with pygame.display.update().
+#               The AI thinks on a background thread (AIWorker) using a snapshot of the Game,
+#               and posts its move back to the event loop as an AI_MOVE_EVENT, so the window keeps
+#               handling events while it searches. Quitting or resetting (R key) cancels it.
+#               The loop is capped at FPS frames per second and sleeps in pygame.event.wait()
+#               while nothing is animating, so an idle window uses no CPU. In debug mode a
+#               frame-time overlay is drawn in the status strip, and refreshed every frame.
+#               With a position database (--db) the status strip also shows how often the current
+#               position was reached in the recorded games and the results from it. With an
+#               opening book (--book) the AI plays book moves without searching, and with endgame
+#               tablebases (--tablebase) it plays the endgames they cover perfectly.
 #               The main function has a while loop that...:
 #                   --displays/refreshes the game board
 #                   --makes moves (if valid)
@@ -21,12 +34,17 @@
 
 import argparse
 import logging
-import os
 import pygame
 import random
+import threading
 import time
 
+from janggi import sprites
+from janggi.book import OpeningBook
 from janggi.game import Game
+from janggi.positiondb import PositionDB
+from janggi.tablebase import Tablebases
+from janggi.utils import square_to_algebraic
 
 AI_NAMES = [
     'Gye Bon-Hwa',  # (Glorious One)',
@@ -40,6 +58,13 @@ AI_NAMES = [
 ]
 
 
+# posted by the AIWorker thread with the start and end of the move it chose
+AI_MOVE_EVENT = pygame.event.custom_type()
+
+# frame rate cap of the main loop
+FPS = 60
+
+
 def get_pixel_coordinates():
     """
     helper function returns a dictionary with key = algebraic position
@@ -60,6 +85,10 @@ def get_pixel_coordinates():
     return pixel_dict
 
 
+# pixel coordinate of each algebraic position, computed once
+PIXEL_COORDINATES = get_pixel_coordinates()
+
+
 def get_board_rectangles():
     """
     helper function returns a dictionary with key = algebraic coordinate,
@@ -82,8 +111,7 @@ def get_string_images(list_of_strings: list[str]) -> list[pygame.Surface]:
     list of pygame Surface objects
     """
     image_list = list()
-    pygame.init()
-    font = pygame.font.SysFont("timesnewroman", 30)
+    font = sprites.get_font(30)
     for a_string in list_of_strings:
         black = (0, 0, 0)
         img = font.render(a_string.upper(), True, black)
@@ -104,16 +132,26 @@ def blit_images(screen, images: list[pygame.Surface], coord_x: int, coord_y: int
         coord_y += stride_y
 
 
-def blit_current_board(game, screen):
+# static board and labels, rendered once by get_background()
+background = None
+
+
+def get_background():
     """
-    helper function takes a current instance of the Game class,
-    iterates through the pieces and blits each one to the current pygame screen
+    helper function returns the static part of the window (orange fill, board image,
+    row and column labels) as one Surface, rendered on first use
     """
+    global background
+    if background is not None:
+        return background
+
+    screen = pygame.Surface((684, 760))
+    if pygame.display.get_surface() is not None:
+        screen = screen.convert()
     # fill background with orange color
     screen.fill((247, 147, 30))
-    # load a background board image (594x660), blit to screen
-    bgd_image = pygame.image.load(os.path.join("assets", "JanggiOrange.svg"))
-    screen.blit(bgd_image, (45, 50))
+    # background board image (594x660)
+    screen.blit(sprites.load_image("JanggiOrange"), (45, 50))
 
     # blit each column header here
     letters = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i']
@@ -127,32 +165,48 @@ def blit_current_board(game, screen):
     # blit each row number along right side here
     blit_images(screen, number_images, 684-25, 33+45, stride_y=66)
 
+    background = screen
+    return background
+
+
+def blit_current_board(game, screen):
+    """
+    helper function takes a current instance of the Game class,
+    blits the pre-rendered background, then each piece to the current pygame screen
+    """
+    screen.blit(get_background(), (0, 0))
+
     # blit each game piece image here!!!!
-    pixel_dict = get_pixel_coordinates()
+    pixel_dict = PIXEL_COORDINATES
 
     for piece_obj in game.get_board().all_pieces():
         # get the piece's position, image and associated rectangle
         pos = piece_obj.get_position()
-        image = piece_obj.get_image()
+        image = sprites.get_piece_image(piece_obj.get_name())
         rect = image.get_rect()
         # set rectangle center to pixel position
         rect.center = pixel_dict[pos]
         # blit image to screen using rectangle's top left coordinate
         screen.blit(image, rect.topleft)
 
-    # draw a colored circle to indicate turn
-    color = game.get_turn_long()
-    pygame.draw.circle(screen, color, (342, 731), 10)
+    blit_turn_indicator(game, screen)
 
     # refresh display
     pygame.display.flip()
 
 
+def blit_turn_indicator(game, screen):
+    """helper function draws a circle in the current player's color to indicate turn, returns its Rect"""
+    color = game.get_turn_long()
+    return pygame.draw.circle(screen, color, (342, 731), 10)
+
+
 def blit_ending_message(game, screen):
     """
     helper function takes the current instance of the Game class
     and the current pygame screen, then blits a rectangle declaring
-    the winner to the center of the screen
+    the winner (or a draw) to the center of the screen, returns the rectangle
+    (the display is not updated)
     """
     # draw a grey rectangle in the center of the screen
     cx, cy = 342, 380
@@ -160,44 +214,67 @@ def blit_ending_message(game, screen):
     my_rect.center = cx, cy
     pygame.draw.rect(screen, "grey", my_rect)
 
-    # get winning color
-    if game.get_game_state() == "BLUE_WON":
+    # get winning color, or the reason for a draw
+    game_state = game.get_game_state()
+    if game_state == "BLUE_WON":
         color = "blue"
-    else:
+        win_str = "CHECKMATE, BLUE WINS!"
+    elif game_state == "RED_WON":
         color = "red"
+        win_str = "CHECKMATE, RED WINS!"
+    else:
+        color = "black"
+        win_str = f"{game_state}, DRAW!"
 
     # create image for ending message, blit to screen
-    font = pygame.font.SysFont("timesnewroman", 30)
-    win_str = f"CHECKMATE, {color.upper()} WINS!"
+    font = sprites.get_font(30)
     win_img = font.render(win_str, True, pygame.Color(color))
     rect = win_img.get_rect()
     rect.center = cx, cy
     screen.blit(win_img, rect.topleft)
-
-    # refresh display
-    pygame.display.flip()
+    return my_rect
 
 
 def blit_message(screen, msg):
     """
     helper function takes the current pygame screen object and blits
-    a message to the bottom corner
+    a message to the bottom corner (in the status strip), returns its Rect
+    (the display is not updated)
     """
     # create image for ending message, blit to screen
-    font = pygame.font.SysFont("timesnewroman", 20)
+    font = sprites.get_font(20)
     black = 0, 0, 0
     img = font.render(msg, True, black)
     rect = img.get_rect()
     rect.center = 145, 731
     screen.blit(img, rect.topleft)
-    # refresh display
-    pygame.display.flip()
+    return rect
 
 
 ai_blue = None
 ai_red = None
 
 
+def blit_position_stats(game, screen):
+    """
+    helper function blits the position database's statistics for the current position
+    (times reached and wins/draws/losses of the side to move) in the status strip,
+    returns the Rect of the area it drew over (the display is not updated)
+    """
+    rect = pygame.Rect(362, 716, 118, 30)
+    screen.blit(get_background(), rect.topleft, rect)
+    entry = game.lookup_position()
+    if entry is None:
+        text = "position not seen"
+    else:
+        text = f"seen {entry.visits}  {entry.wins}/{entry.draws}/{entry.losses}"
+    img = sprites.get_font(14).render(text, True, (0, 0, 0))
+    img_rect = img.get_rect()
+    img_rect.center = rect.center
+    screen.blit(img, img_rect.topleft)
+    return rect
+
+
 def blit_ai_move(screen, start, end, color):
     global ai_blue
     global ai_red
@@ -212,11 +289,11 @@ def blit_ai_move(screen, start, end, color):
             ai_red = random.choice(AI_NAMES)
         name = ai_red
 
-    blit_message(screen, f"{name} Moved: {start} -> {end}")
+    return blit_message(screen, f"{name} Moved: {start} -> {end}")
 
 
 def blit_invalid_move(screen):
-    blit_message(screen, "Invalid move, try again!")
+    return blit_message(screen, "Invalid move, try again!")
 
 
 def blit_in_check(screen, color):
@@ -224,7 +301,194 @@ def blit_in_check(screen, color):
         color = 'Blue'
     elif 'r' == color:
         color = 'Red'
-    blit_message(screen, f"{color} is in check!")
+    return blit_message(screen, f"{color} is in check!")
+
+
+class BoardRenderer:
+    """
+    Represents the game window drawn incrementally: after one full draw, only the squares
+    whose piece changed, the move highlights and the status strip are repainted, and only
+    those rectangles are pushed to the display
+    """
+    # strip along the bottom of the window holding the turn indicator and messages
+    STATUS_RECT = pygame.Rect(0, 711, 684, 49)
+    # pieces are drawn 75x75 on a 66 pixel grid, so neighboring pieces overlap a little
+    PIECE_SIZE = 75
+
+    def __init__(self, screen):
+        """
+        Initializes private data members for:
+            screen, piece name drawn on each algebraic square, highlighted squares,
+            rectangles waiting for the next present(), overlapping neighbors of each square
+        """
+        self._screen = screen
+        self._drawn = dict()
+        self._highlights = list()
+        self._dirty = list()
+        self._neighbors = dict()
+        for alg_coord in PIXEL_COORDINATES:
+            rect = self.square_rect(alg_coord)
+            self._neighbors[alg_coord] = [other for other in PIXEL_COORDINATES
+                                          if rect.colliderect(self.square_rect(other))]
+
+    def square_rect(self, alg_coord):
+        """returns the Rect covered by a piece drawn on an algebraic square"""
+        rect = pygame.Rect(0, 0, self.PIECE_SIZE, self.PIECE_SIZE)
+        rect.center = PIXEL_COORDINATES[alg_coord]
+        return rect
+
+    def draw_all(self, game):
+        """draws the whole window (background, pieces, turn indicator) and flips the display"""
+        blit_current_board(game, self._screen)
+        self._drawn = self.piece_names(game)
+        self._highlights = list()
+        self._dirty = list()
+
+    def piece_names(self, game):
+        """helper function returns a dictionary with key = algebraic position, val = piece name"""
+        return {piece_obj.get_position(): piece_obj.get_name() for piece_obj in game.get_board().all_pieces()}
+
+    def sync(self, game):
+        """
+        repaints the squares whose piece changed since the last draw (ie the start and end
+        squares of a move) and clears the move highlights
+        """
+        current = self.piece_names(game)
+        changed = set(self._highlights)
+        for alg_coord in set(current) | set(self._drawn):
+            if current.get(alg_coord) != self._drawn.get(alg_coord):
+                changed.add(alg_coord)
+        for alg_coord in changed:
+            self.repaint_square(alg_coord, current)
+        self._drawn = current
+        self._highlights = list()
+
+    def repaint_square(self, alg_coord, pieces):
+        """
+        helper function repaints the area of one square from the background, then the
+        pieces overlapping it (clipped to the area), and marks the area dirty
+        """
+        screen = self._screen
+        rect = self.square_rect(alg_coord)
+        screen.set_clip(rect)
+        screen.blit(get_background(), rect.topleft, rect)
+        for neighbor in self._neighbors[alg_coord]:
+            name = pieces.get(neighbor)
+            if name is not None:
+                image = sprites.get_piece_image(name)
+                image_rect = image.get_rect()
+                image_rect.center = PIXEL_COORDINATES[neighbor]
+                screen.blit(image, image_rect.topleft)
+        screen.set_clip(None)
+        self._dirty.append(rect)
+
+    def highlight(self, alg_coords, color):
+        """draws a small circle in a color on each algebraic square, cleared by the next sync()"""
+        for alg_coord in alg_coords:
+            self._dirty.append(pygame.draw.circle(self._screen, color, PIXEL_COORDINATES[alg_coord], 5))
+            self._highlights.append(alg_coord)
+
+    def begin_status(self, game):
+        """
+        repaints the status strip with the turn indicator and no message, messages can then be
+        blitted on top of it with blit_message()
+        """
+        self._screen.blit(get_background(), self.STATUS_RECT.topleft, self.STATUS_RECT)
+        blit_turn_indicator(game, self._screen)
+        if game.get_position_db() is not None:
+            blit_position_stats(game, self._screen)
+        self._dirty.append(self.STATUS_RECT)
+
+    def draw_frame_time(self, clock, work_ms):
+        """
+        draws the debug overlay in the right end of the status strip: the time the last frame
+        spent working (not sleeping) and the frame rate measured by clock
+        """
+        rect = pygame.Rect(480, 716, 200, 30)
+        self._screen.blit(get_background(), rect.topleft, rect)
+        img = sprites.get_font(16).render(f"frame {work_ms:.1f} ms  {clock.get_fps():.0f} fps", True, (0, 0, 0))
+        img_rect = img.get_rect()
+        img_rect.center = rect.center
+        self._screen.blit(img, img_rect.topleft)
+        self._dirty.append(rect)
+
+    def show_ending(self, game):
+        """draws the ending message over the board"""
+        self._dirty.append(blit_ending_message(game, self._screen))
+
+    def present(self):
+        """pushes every dirty rectangle to the display at once"""
+        if self._dirty:
+            pygame.display.update(self._dirty)
+            self._dirty = list()
+
+
+class AIWorker:
+    """
+    Represents the AI thinking on a background thread: it chooses a move on a snapshot of the
+    Game and posts it as an AI_MOVE_EVENT, which the event loop plays with accept()
+    """
+    def __init__(self):
+        """
+        Initializes private data members for:
+            thread, its stop event, id of the latest request, whether a move is pending
+        """
+        self._thread = None
+        self._stop = None
+        self._request = 0
+        self._pending = False
+
+    def is_busy(self):
+        """returns True from start() until its move is accepted or cancelled"""
+        return self._pending
+
+    def start(self, game, level, workers=1, delay=0.0):
+        """
+        starts choosing a move for the current player on a snapshot of game
+        :param delay: seconds to wait before thinking, so a human can follow the AI's moves
+        """
+        self.cancel()
+        self._request += 1
+        self._stop = threading.Event()
+        self._pending = True
+        self._thread = threading.Thread(target=self._run, name='janggi-ai', daemon=True,
+                                        args=(game.snapshot(workers), level, workers, delay, self._stop, self._request))
+        self._thread.start()
+
+    def _run(self, snapshot, level, workers, delay, stop, request):
+        """
+        body of the background thread, posts the chosen move unless cancelled. If choosing fails
+        (ie a search helper or a data file failed) a random legal move is posted instead, and if
+        even that fails an AI_MOVE_EVENT with no move (start and end None) ends the request.
+        """
+        if stop.wait(delay):
+            return
+        try:
+            start, end = snapshot.choose_ai_move(level, workers, stop)
+        except Exception:
+            logging.exception('AI failed to choose a move at level {}, playing a random move'.format(level))
+            try:
+                start, end = snapshot.choose_ai_move(0)
+            except Exception:
+                logging.exception('AI failed to choose a random move')
+                start, end = None, None
+        if not stop.is_set():
+            pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, start=start, end=end, request=request))
+
+    def accept(self, event):
+        """returns True if an AI_MOVE_EVENT answers the latest request (and isn't stale), which ends it"""
+        if not self._pending or event.request != self._request:
+            return False
+        self._pending = False
+        return True
+
+    def cancel(self):
+        """stops the current request, if any, and waits for the thread to finish"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._pending = False
 
 
 def perform_set_of_moves(game):
@@ -281,10 +545,13 @@ def perform_set_of_moves(game):
     # game.make_move('e4', 'e3')  # checkmate
 
 
-def main(ai_level):
+def main(ai_level, workers=1, show_frame_time=False, position_db=None, opening_book=None, tablebase=None):
 
-    # create a Janggi Game instance
+    # create a Janggi Game instance, consulting the position database, opening book and tablebases (if any)
     game = Game()
+    game.set_position_db(position_db)
+    game.set_opening_book(opening_book)
+    game.set_tablebase(tablebase)
 
     # if desired, perform a predetermined set of moves here
     # perform_set_of_moves(game)
@@ -295,9 +562,15 @@ def main(ai_level):
     pygame.display.set_caption("Janggi")
     # create a surface called screen that is 684 x 760
     screen = pygame.display.set_mode((684, 760))
+    # rasterize every piece image once, in the display's pixel format
+    sprites.preload()
 
-    # blit the current game pieces
-    blit_current_board(game, screen)
+    # blit the current game pieces, later redraws only repaint what changed
+    renderer = BoardRenderer(screen)
+    renderer.draw_all(game)
+    if position_db is not None:
+        renderer.begin_status(game)
+        renderer.present()
 
     # create a dictionary of coordinates/rectangles for each game square
     # blit each one to the screen for now to debug
@@ -312,26 +585,70 @@ def main(ai_level):
     # initialize start and end for click detection
     start = None
     end = None
+    # the ending message is drawn once
+    ending_shown = False
+    # the AI thinks off the event loop
+    ai_worker = AIWorker()
+    # caps the frame rate, the loop sleeps in pygame.event.wait() unless animating
+    clock = pygame.time.Clock()
+    # only the frame-time overlay needs a redraw on every frame
+    animating = show_frame_time
+    work_ms = 0.0
+    # mouse motion isn't used, don't wake up for it
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
 
     # main loop
     while running:
-        if ai_level is not None and game.get_game_state() == "UNFINISHED":
+        if ai_level is not None and game.get_game_state() == "UNFINISHED" and not ai_worker.is_busy():
             if 1337 == ai_level or game.get_turn() == 'r':
                 t = 0.5
                 if 1337 == ai_level:
                     t = 0.01
-                time.sleep(t)
-                (ai_start, ai_end) = game.make_ai_move(ai_level)
-                blit_current_board(game, screen)
-                blit_ai_move(screen, ai_start, ai_end, game.get_turn())
-                if game.is_in_check(game.get_turn()):
-                    blit_in_check(screen, game.get_turn_long())
+                ai_worker.start(game, ai_level, workers, delay=t)
 
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if not events and not animating:
+            # nothing to do until the next event (a click, a key, or the AI's move)
+            events = [pygame.event.wait()]
+        frame_start = time.perf_counter()
+
+        for event in events:
             if event.type == pygame.QUIT:
+                ai_worker.cancel()
                 running = False
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == AI_MOVE_EVENT and ai_worker.accept(event):
+                if event.start is None:
+                    # the AI can't move at all, hand its side over to the human rather than retrying
+                    logging.error('AI has no move to play, turning the AI off')
+                    ai_level = None
+                else:
+                    game.make_move(event.start, event.end)
+                    renderer.sync(game)
+                    renderer.begin_status(game)
+                    blit_ai_move(screen, event.start, event.end, game.get_turn())
+                    if game.is_in_check(game.get_turn()):
+                        blit_in_check(screen, game.get_turn_long())
+                    renderer.present()
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                # reset: drop the AI's move in progress and start a new game
+                ai_worker.cancel()
+                game.close()
+                game = Game()
+                game.set_position_db(position_db)
+                game.set_opening_book(opening_book)
+                game.set_tablebase(tablebase)
+                renderer.draw_all(game)
+                if position_db is not None:
+                    renderer.begin_status(game)
+                    renderer.present()
+                start = None
+                end = None
+                ending_shown = False
+
+            # the board ignores clicks while the AI is thinking
+            if event.type == pygame.MOUSEBUTTONDOWN and not ai_worker.is_busy():
                 if event.button == 1:   # left mouse button
                     # iterate through every board square's rectangle
                     for alg_coord, my_rect in board_rectangles.items():
@@ -346,14 +663,12 @@ def main(ai_level):
                                 start = alg_coord
                                 logging.debug(f"A starting rectangle was clicked! {start}")
 
-                                moves = p.get_valid_moves_algebraic()
+                                # highlight only fully legal moves (never pass moves)
+                                moves = [square_to_algebraic(e) for (s, e)
+                                         in game.get_board().legal_moves(game.get_turn(), p.get_square()) if s != e]
                                 logging.debug('valid moves: {}'.format(', '.join(moves)))
-                                for m in moves:
-                                    if m == start:
-                                        continue  # don't highlight pass moves
-                                    rect = board_rectangles[m]
-                                    pygame.draw.circle(screen, game.get_turn_long(), rect.center, 5)
-                                pygame.display.flip()
+                                renderer.highlight(moves, game.get_turn_long())
+                                renderer.present()
 
                             elif start is not None and end is None:     # if second collision, set end
                                 end = alg_coord
@@ -364,19 +679,32 @@ def main(ai_level):
                 # make move and assign the validity
                 valid_move = game.make_move(start, end)
                 # update display
-                blit_current_board(game, screen)
+                renderer.sync(game)
+                renderer.begin_status(game)
                 if not valid_move:
                     # display invalid move prompt
                     blit_invalid_move(screen)
                 if game.is_in_check(game.get_turn()):
                     blit_in_check(screen, game.get_turn_long())
+                renderer.present()
                 # reset start and end for next turn, continue loop
                 start = None
                 end = None
 
             # if game is finished, display winner and end
-            if game.get_game_state() != "UNFINISHED":
-                blit_ending_message(game, screen)
+            if game.get_game_state() != "UNFINISHED" and not ending_shown:
+                renderer.show_ending(game)
+                renderer.present()
+                ending_shown = True
+
+        if show_frame_time:
+            renderer.draw_frame_time(clock, work_ms)
+            renderer.present()
+        work_ms = (time.perf_counter() - frame_start) * 1000
+        clock.tick(FPS)
+
+    # stop the AI's helper search processes, if any
+    game.close()
 
 
 if __name__ == "__main__":
@@ -391,6 +719,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Play Janggi!')
     parser.add_argument('--debug', '-d', dest='debug', action='count', default=0)
     parser.add_argument('--ai', dest='ai', choices=ai_levels.keys())
+    parser.add_argument('--threads', '-t', dest='threads', type=int, default=1,
+                        help='number of processes the AI searches with')
+    parser.add_argument('--db', dest='db', help='position database file to consult on every turn (see janggi.positiondb)')
+    parser.add_argument('--book', dest='book', help='opening book file for the AI to play from (see janggi.book)')
+    parser.add_argument('--tablebase', dest='tablebase',
+                        help='directory of endgame tablebases for the AI to play from (see janggi.tablebase)')
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -398,4 +732,16 @@ if __name__ == "__main__":
             level=logging.INFO - (10 * args.debug),
             )
 
-    main(ai_levels[args.ai])
+    db = PositionDB(args.db) if args.db else None
+    book = OpeningBook(args.book) if args.book else None
+    tablebase = Tablebases(args.tablebase) if args.tablebase else None
+    try:
+        main(ai_levels[args.ai], args.threads, show_frame_time=args.debug > 0, position_db=db, opening_book=book,
+             tablebase=tablebase)
+    finally:
+        if db is not None:
+            db.close()
+        if book is not None:
+            book.close()
+        if tablebase is not None:
+            tablebase.close()
@@ -0,0 +1,77 @@
+# Description:  Shared base of the engine's read-only, memory-mapped data files (the position
+#               database, the opening book and the endgame tablebases).
+#                   MappedFile opens a file and maps it read-only with mmap, so lookups read
+#               straight from the page cache and every process that opens the same file shares
+#               its pages. Subclasses check their header after calling MappedFile.__init__ and
+#               call invalid() if it doesn't match, which closes the file and raises ValueError.
+#                   The database and the book are both built from game record files and probed
+#               by position from the command line: build_parser() sets up their common build and
+#               probe subcommands, and probe_position() reads the position to probe.
+
+import argparse
+import mmap
+
+from janggi.position import Position
+
+
+class MappedFile:
+    """Represents a read-only, memory-mapped binary file"""
+    # what the file is, used in error messages (ie "position database")
+    description = "data file"
+
+    def __init__(self, path):
+        """
+        Initializes private data members for:
+            path, open file, its memory map
+        :raises ValueError: if the file is empty
+        """
+        self._path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file can't be mapped
+            self._file.close()
+            raise ValueError(f"not a {self.description}: {path}")
+
+    def invalid(self):
+        """closes the file and raises ValueError, called by subclasses when the header doesn't match"""
+        self.close()
+        raise ValueError(f"not a {self.description}: {self._path}")
+
+    def get_path(self):
+        """getter for the file's path"""
+        return self._path
+
+    def close(self):
+        """unmaps and closes the file"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def build_parser(prog, description, file_name):
+    """
+    returns the argument parser of a file built from game records, with its build and probe
+    subcommands, and the build subcommand's parser to add options to
+    :param file_name: name of the file argument of both subcommands (ie 'book')
+    """
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help=f'build a {file_name} from binary game record files')
+    build.add_argument(file_name, help=f'{file_name} file to create')
+    build.add_argument('records', nargs='+', help='game record files (see janggi.record)')
+    probe = commands.add_parser('probe', help='look up a position')
+    probe.add_argument(file_name, help=f'{file_name} file')
+    probe.add_argument('--fen', help='FEN-style position (default: the starting position)')
+    return parser, build
+
+
+def probe_position(args):
+    """returns the Position given to the probe subcommand (the starting position if none)"""
+    return Position.from_fen(args.fen) if args.fen else Position.starting()
@@ -0,0 +1,268 @@
+# Description:  Table-driven move generation on the compact Position.
+#                   Each generator walks the precomputed tables from janggi.tables and checks
+#               occupancy in the Position's bytearray of piece codes. Moves are (start, end)
+#               pairs of flat square indexes. Generated moves are pseudo-legal: they follow
+#               each piece's move set but may leave the mover's General in check. Pass moves
+#               are not generated here.
+#                   legal_moves() filters pseudo-legal moves down to fully legal ones in one pass,
+#               using check and pin information so most moves never have to be played out.
+#                   perft() counts the leaf nodes of the legal move tree to a fixed depth, the
+#               standard correctness check (and speed benchmark) for a move generator.
+
+from janggi.attacks import is_attacked, HORSE_ATTACKERS, ELEPHANT_ATTACKERS
+from janggi.position import (COLOR_SHIFT, KIND_MASK, GENERAL, GUARD, ELEPHANT, HORSE, CHARIOT,
+                             CANNON, SOLDIER, make_code)
+from janggi.tables import SLIDING_RAYS, HORSE_MOVES, ELEPHANT_MOVES, PALACE_STEPS, SOLDIER_STEPS
+
+
+def chariot_targets(squares, square, color, rays=None):
+    """
+    returns the squares a Chariot of a color on square can move to,
+    sliding along every ray until blocked (capturing the first enemy piece)
+    :param rays: optional subset of rays to walk, all sliding rays by default
+    """
+    targets = []
+    if rays is None:
+        rays = SLIDING_RAYS[square]
+    for ray in rays:
+        for target in ray:
+            code = squares[target]
+            if not code:
+                targets.append(target)
+                continue
+            if code >> COLOR_SHIFT != color:
+                targets.append(target)
+            break
+    return targets
+
+
+def cannon_targets(squares, square, color, rays=None):
+    """
+    returns the squares a Cannon of a color on square can move to: along every ray it must
+    jump exactly one piece (the screen, which can't be a cannon) and may not capture a cannon
+    :param rays: optional subset of rays to walk, all sliding rays by default
+    """
+    targets = []
+    if rays is None:
+        rays = SLIDING_RAYS[square]
+    for ray in rays:
+        screen = False
+        for target in ray:
+            code = squares[target]
+            if not screen:
+                if code:
+                    if code & KIND_MASK == CANNON:
+                        break
+                    screen = True
+            elif not code:
+                targets.append(target)
+            else:
+                if code & KIND_MASK != CANNON and code >> COLOR_SHIFT != color:
+                    targets.append(target)
+                break
+    return targets
+
+
+def horse_targets(squares, square, color):
+    """returns the squares a Horse of a color on square can move to (the leg must be empty)"""
+    targets = []
+    for leg, target in HORSE_MOVES[square]:
+        if not squares[leg]:
+            code = squares[target]
+            if not code or code >> COLOR_SHIFT != color:
+                targets.append(target)
+    return targets
+
+
+def elephant_targets(squares, square, color):
+    """returns the squares an Elephant of a color on square can move to (both legs must be empty)"""
+    targets = []
+    for leg1, leg2, target in ELEPHANT_MOVES[square]:
+        if not squares[leg1] and not squares[leg2]:
+            code = squares[target]
+            if not code or code >> COLOR_SHIFT != color:
+                targets.append(target)
+    return targets
+
+
+def step_targets(squares, steps, color):
+    """returns the squares from a tuple of single steps that are empty or hold an enemy piece"""
+    targets = []
+    for target in steps:
+        code = squares[target]
+        if not code or code >> COLOR_SHIFT != color:
+            targets.append(target)
+    return targets
+
+
+def piece_targets(squares, square):
+    """
+    returns the list of squares the piece on square can move to (pass move not included)
+    :param squares: the Position's bytearray of piece codes
+    :param square: an occupied square index
+    """
+    code = squares[square]
+    kind = code & KIND_MASK
+    color = code >> COLOR_SHIFT
+    if kind == CHARIOT:
+        return chariot_targets(squares, square, color)
+    if kind == CANNON:
+        return cannon_targets(squares, square, color)
+    if kind == HORSE:
+        return horse_targets(squares, square, color)
+    if kind == ELEPHANT:
+        return elephant_targets(squares, square, color)
+    if kind == SOLDIER:
+        return step_targets(squares, SOLDIER_STEPS[color][square], color)
+    if kind == GENERAL or kind == GUARD:
+        return step_targets(squares, PALACE_STEPS[square], color)
+    return []
+
+
+def pseudo_moves(position, color):
+    """
+    generator yields every pseudo-legal (start, end) move for a color index,
+    pass moves not included
+    """
+    squares = position.get_squares()
+    # copy the square list so callers may make and unmake moves while iterating
+    for square in list(position.pieces(color)):
+        for target in piece_targets(squares, square):
+            yield square, target
+
+
+def pin_mask(squares, general_square, enemy):
+    """
+    returns the bitmask of squares whose occupancy can change whether general_square is attacked
+    by the enemy color index: every square on a ray from the General that holds an enemy Chariot
+    or Cannon (pins, and possible cannon screens), and the legs of enemy Horses and Elephants
+    that could jump to the General. Moves that neither leave nor enter these squares can't
+    expose the General when it isn't already in check.
+    """
+    chariot = make_code(enemy, CHARIOT)
+    cannon = make_code(enemy, CANNON)
+    mask = 0
+    for ray in SLIDING_RAYS[general_square]:
+        ray_mask = 0
+        for target in ray:
+            code = squares[target]
+            ray_mask |= 1 << target
+            if code == chariot or code == cannon:
+                mask |= ray_mask
+    horse = make_code(enemy, HORSE)
+    for origin, leg in HORSE_ATTACKERS[general_square]:
+        if squares[origin] == horse:
+            mask |= 1 << leg
+    elephant = make_code(enemy, ELEPHANT)
+    for origin, leg1, leg2 in ELEPHANT_ATTACKERS[general_square]:
+        if squares[origin] == elephant:
+            mask |= (1 << leg1) | (1 << leg2)
+    return mask
+
+
+def leaves_general_safe(position, start, end, color, general_square):
+    """
+    helper function plays start -> end on the position with make() / unmake() and returns
+    True if the General of color (on general_square before the move) is not attacked afterwards
+    """
+    if start == general_square:
+        general_square = end
+    position.make(start, end)
+    safe = not is_attacked(position.get_squares(), general_square, color ^ 1)
+    position.unmake()
+    return safe
+
+
+def legal_moves(position, color, start=None):
+    """
+    generator yields every fully legal (start, end) move for a color index, finishing with
+    a single pass move (general square, general square) when the General isn't in check.
+    When the General isn't in check, moves that don't touch the pin mask are yielded without
+    being played; the rest (General moves, pinned pieces, possible cannon screens, and every
+    move when in check) are verified with make() / unmake().
+    The position is always restored before a move is yielded, so callers may make and unmake
+    moves while iterating.
+    :param start: optional square, only generate moves for the piece on it
+    """
+    squares = position.get_squares()
+    general_square = position.general_square(color)
+    in_check = is_attacked(squares, general_square, color ^ 1)
+    danger = -1 if in_check else pin_mask(squares, general_square, color ^ 1)
+    if start is None:
+        origins = list(position.pieces(color))
+    elif squares[start] and squares[start] >> COLOR_SHIFT == color:
+        origins = [start]
+    else:
+        origins = []
+    for origin in origins:
+        checked = origin == general_square or (danger >> origin) & 1
+        for target in piece_targets(squares, origin):
+            if checked or (danger >> target) & 1:
+                if not leaves_general_safe(position, origin, target, color, general_square):
+                    continue
+            yield origin, target
+    if not in_check and (start is None or start == general_square):
+        yield general_square, general_square
+
+
+def is_legal(position, move):
+    """
+    returns True if move is fully legal for the piece on its start square:
+    the end square is in the piece's move set (or start == end for a pass move)
+    and the move doesn't put or leave its General in check
+    """
+    start, end = move
+    squares = position.get_squares()
+    code = squares[start]
+    if not code:
+        return False
+    color = code >> COLOR_SHIFT
+    general_square = position.general_square(color)
+    if start == end:
+        return not is_attacked(squares, general_square, color ^ 1)
+    if end not in piece_targets(squares, start):
+        return False
+    return leaves_general_safe(position, start, end, color, general_square)
+
+
+def has_legal_move(position, color, allow_pass=True):
+    """
+    returns True as soon as a single legal move is found for a color index
+    :param allow_pass: whether a pass move counts as a legal move
+    """
+    for start, end in legal_moves(position, color):
+        if allow_pass or start != end:
+            return True
+    return False
+
+
+def perft(position, depth):
+    """
+    returns the number of leaf nodes of the legal move tree of the position to depth plies,
+    for the side to move. Pass moves are legal moves and are counted like any other move.
+    The position is restored before returning.
+    """
+    moves = list(legal_moves(position, position.get_turn()))
+    if depth <= 1:
+        # bulk counting: the leaves of the last ply don't have to be played
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for start, end in moves:
+        position.make(start, end)
+        nodes += perft(position, depth - 1)
+        position.unmake()
+    return nodes
+
+
+def divide(position, depth):
+    """
+    returns a dict of the perft() node count below each legal root move of the position,
+    keyed by (start, end) move, to find the move whose subtree differs from a reference
+    :param depth: total depth including the root move, at least 1
+    """
+    counts = dict()
+    for start, end in list(legal_moves(position, position.get_turn())):
+        position.make(start, end)
+        counts[(start, end)] = perft(position, depth - 1)
+        position.unmake()
+    return counts
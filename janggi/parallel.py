@@ -0,0 +1,197 @@
+# Description:  Multi-process (Lazy SMP) search for the Janggi AI.
+#                   A SearchPool starts its helper processes once and keeps them for every search.
+#               All processes share one transposition table placed in shared memory. For each
+#               search the main process and every helper search the same position; the helpers
+#               start at staggered depths so they explore different parts of the tree first, and
+#               the results they store in the shared table speed up the main search. Only the
+#               main process's result is returned; the helpers are stopped as soon as it is done.
+#                   The table needs no locking because its entries are verified with key ^ data
+#               (see janggi.ttable).
+#                   A helper always reports back when a search ends, even if its search failed. If a
+#               helper dies (or doesn't stop in time) the main process's result is still returned,
+#               and every helper is restarted before the next search.
+
+import logging
+import multiprocessing
+import queue
+import time
+import weakref
+from multiprocessing import shared_memory
+
+from janggi.position import Position
+from janggi.search import Searcher, MAX_DEPTH
+from janggi.ttable import TranspositionTable, DEFAULT_SIZE_MB, table_bytes
+
+# seconds the helpers get to report back once a search is stopped, before they're restarted
+HELPER_STOP_TIMEOUT = 5.0
+# seconds between checks that the helpers are still alive while waiting for them
+_HELPER_POLL = 0.1
+
+
+def _helper_main(memory_name, size_mb, index, tasks, stop, done):
+    """
+    entry point of a helper process: attaches to the shared table, then searches every
+    (position key, max depth, generation) task until it is stopped, or until it receives None
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    ttable = TranspositionTable(size_mb, buffer=memory.buf)
+    searcher = Searcher(ttable)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            try:
+                key, max_depth, generation = task
+                position = Position(key[:-1], turn=key[-1])
+                # odd helpers skip the first iteration, so helpers work on different depths at once
+                first_depth = min(1 + index % 2, max_depth)
+                searcher.search(position, max_depth=max_depth, stop=stop, first_depth=first_depth,
+                                generation=generation)
+                nodes = searcher.get_nodes()
+            except Exception:
+                # the main process waits for every helper, so a failed search still reports back
+                logging.exception('search helper {} failed'.format(index))
+                nodes = 0
+            done.put(nodes)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ttable.release()
+        memory.close()
+
+
+def _shutdown(processes, task_queues, ttable, memory):
+    """helper function stops the helper processes and frees the shared table"""
+    ttable.release()
+    for tasks in task_queues:
+        tasks.put(None)
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    memory.close()
+    memory.unlink()
+
+
+class _AnyEvent:
+    """Represents a stop flag that is set when any of several events is set"""
+    def __init__(self, *events):
+        """Initializes private data member for the events to watch (None entries are ignored)"""
+        self._events = [event for event in events if event is not None]
+
+    def is_set(self):
+        """returns True if any of the events is set"""
+        return any(event.is_set() for event in self._events)
+
+
+class SearchPool:
+    """Represents a main search and workers - 1 helper processes sharing one transposition table"""
+    def __init__(self, workers, size_mb=DEFAULT_SIZE_MB):
+        """
+        Initializes private data members for:
+            number of workers, shared memory, shared transposition table, helper processes,
+            their task queues, stop event and done queue
+        Starts the helper processes.
+        :param workers: total number of searching processes, including the calling one
+        :param size_mb: memory budget of the shared transposition table
+        """
+        if workers < 1:
+            raise ValueError(f"a search pool needs at least one worker, got {workers}")
+        self._workers = workers
+        self._size_mb = size_mb
+        self._memory = shared_memory.SharedMemory(create=True, size=table_bytes(size_mb))
+        self._ttable = TranspositionTable(size_mb, buffer=self._memory.buf)
+        self._context = multiprocessing.get_context()
+        self._stop = self._context.Event()
+        self._done = None
+        self._task_queues = []
+        self._processes = []
+        self._start_helpers()
+        self._finalizer = weakref.finalize(self, _shutdown, self._processes, self._task_queues,
+                                           self._ttable, self._memory)
+
+    def _start_helpers(self):
+        """helper function starts the workers - 1 helper processes, with fresh task and done queues"""
+        self._done = self._context.Queue()
+        for index in range(self._workers - 1):
+            tasks = self._context.Queue()
+            process = self._context.Process(target=_helper_main, daemon=True, name=f'janggi-search-{index}',
+                                            args=(self._memory.name, self._size_mb, index, tasks, self._stop,
+                                                  self._done))
+            process.start()
+            self._task_queues.append(tasks)
+            self._processes.append(process)
+
+    def _restart_helpers(self):
+        """helper function replaces every helper process, after one died or didn't report back in time"""
+        logging.warning('restarting the search helpers')
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=5)
+        # the lists are shared with the finalizer, so they're emptied rather than replaced
+        del self._processes[:]
+        del self._task_queues[:]
+        self._start_helpers()
+
+    def _wait_for_helpers(self):
+        """
+        helper function waits for every helper to report back once the search is stopped and
+        returns the nodes they searched, restarting the helpers if one is dead or too slow
+        """
+        nodes = 0
+        pending = len(self._processes)
+        deadline = time.monotonic() + HELPER_STOP_TIMEOUT
+        while pending:
+            try:
+                nodes += self._done.get(timeout=_HELPER_POLL)
+                pending -= 1
+            except queue.Empty:
+                if time.monotonic() > deadline or not all(process.is_alive() for process in self._processes):
+                    self._restart_helpers()
+                    break
+        return nodes
+
+    def get_workers(self):
+        """getter for the total number of searching processes"""
+        return self._workers
+
+    def get_transposition_table(self):
+        """getter for the shared TranspositionTable (probe statistics are the main process's only)"""
+        return self._ttable
+
+    def search(self, position, max_time_ms=None, max_depth=MAX_DEPTH, stop=None, root_moves=None):
+        """
+        Searches a Position on every worker and returns the main process's SearchResult,
+        with the nodes searched by all workers.
+        :param stop: optional threading.Event-like object to cancel the search
+        :param root_moves: optional subset of the legal moves the main search chooses from
+                           (the helpers search every move, they only fill the shared table)
+        """
+        generation = self._ttable.get_generation() + 1
+        self._stop.clear()
+        for tasks in self._task_queues:
+            tasks.put((position.key(), max_depth, generation))
+
+        searcher = Searcher(self._ttable)
+        try:
+            result = searcher.search(position, max_depth=max_depth, max_time_ms=max_time_ms,
+                                     stop=_AnyEvent(stop, self._stop), generation=generation,
+                                     root_moves=root_moves)
+        finally:
+            # helpers must be idle before the next search changes the generation
+            self._stop.set()
+            nodes = searcher.get_nodes() + self._wait_for_helpers()
+        logging.debug('parallel search workers={} depth={} nodes={}'.format(self._workers, result.depth, nodes))
+        return result._replace(nodes=nodes)
+
+    def close(self):
+        """stops the helper processes and frees the shared table"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
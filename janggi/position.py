@@ -0,0 +1,359 @@
+# Description:  Compact position core for the Janggi engine.
+#                   A Position stores the board as a flat 90-cell bytearray of piece codes
+#               (square index = row * 9 + col) together with a list of occupied squares for
+#               each color and for each piece code (so the Generals are found in O(1)). Copying,
+#               hashing and scanning a Position costs tens of bytes and allocates no Piece
+#               objects, which makes it suitable for AI self-play and search.
+#                   The Board class keeps the object-oriented Piece API working on top of a
+#               Position: every change made through the Board is mirrored into its Position.
+#                   Positions can be written and read as FEN-style strings (see to_fen()).
+#                   Every Position carries a 64-bit Zobrist key (piece x square, plus the side to
+#               move) that is updated incrementally by put(), move(), make() and unmake().
+
+import random
+
+# color indexes, used internally instead of the 'b' / 'r' strings
+BLUE = 0
+RED = 1
+COLORS = ('b', 'r')
+COLOR_INDEX = {'b': BLUE, 'r': RED}
+
+# piece kinds, a piece code is kind | (color << COLOR_SHIFT), 0 is an empty square
+EMPTY = 0
+GENERAL = 1
+GUARD = 2
+ELEPHANT = 3
+HORSE = 4
+CHARIOT = 5
+CANNON = 6
+SOLDIER = 7
+
+KIND_MASK = 7
+COLOR_SHIFT = 3
+
+# two letter abbreviations used in Piece names, indexed by kind
+ABBREVIATIONS = ('', 'Gn', 'Gd', 'El', 'Hs', 'Ch', 'Cn', 'Sd')
+KIND_BY_ABBREVIATION = {abbr: kind for kind, abbr in enumerate(ABBREVIATIONS) if abbr}
+
+# FEN letters indexed by kind (blue pieces are upper case, red pieces lower case):
+# K general, A guard (advisor), B elephant, N horse, R chariot, C cannon, P soldier
+FEN_LETTERS = ('', 'k', 'a', 'b', 'n', 'r', 'c', 'p')
+KIND_BY_FEN_LETTER = {letter: kind for kind, letter in enumerate(FEN_LETTERS) if letter}
+STARTING_FEN = "rbna1abnr/4k4/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/4K4/RBNA1ABNR b"
+
+# piece worth (same values as the Piece classes), indexed by kind
+WORTH = (0, 99, 3, 3, 5, 13, 7, 2)
+
+# number of piece codes (both colors), the size of the per-code square lists
+_NUM_CODES = 1 << (COLOR_SHIFT + 1)
+
+NUM_ROWS = 10
+NUM_COLS = 9
+NUM_SQUARES = NUM_ROWS * NUM_COLS
+
+# Zobrist keys: one random 64-bit number per piece code and square, and one for red to move.
+# A fixed seed keeps keys identical across processes and runs, so they can be stored on disk.
+_zobrist_random = random.Random(0x4A414E474749)
+ZOBRIST_PIECES = tuple(
+    tuple(_zobrist_random.getrandbits(64) if code & KIND_MASK else 0 for _ in range(NUM_SQUARES))
+    for code in range(_NUM_CODES)
+)
+ZOBRIST_RED_TO_MOVE = _zobrist_random.getrandbits(64)
+del _zobrist_random
+
+# starting setup, one string per row: piece names or '---' for an empty square
+_START_ROWS = (
+    "rCh rEl rHs rGd --- rGd rEl rHs rCh",
+    "--- --- --- --- rGn --- --- --- ---",
+    "--- rCn --- --- --- --- --- rCn ---",
+    "rSd --- rSd --- rSd --- rSd --- rSd",
+    "--- --- --- --- --- --- --- --- ---",
+    "--- --- --- --- --- --- --- --- ---",
+    "bSd --- bSd --- bSd --- bSd --- bSd",
+    "--- bCn --- --- --- --- --- bCn ---",
+    "--- --- --- --- bGn --- --- --- ---",
+    "bCh bEl bHs bGd --- bGd bEl bHs bCh",
+)
+
+
+def make_code(color: int, kind: int) -> int:
+    """helper function returns the piece code for a color index and a piece kind"""
+    return kind | (color << COLOR_SHIFT)
+
+
+def code_kind(code: int) -> int:
+    """helper function returns the piece kind stored in a piece code"""
+    return code & KIND_MASK
+
+
+def code_color(code: int) -> int:
+    """helper function returns the color index stored in a (non-empty) piece code"""
+    return code >> COLOR_SHIFT
+
+
+def code_from_name(name: str) -> int:
+    """helper function converts a Piece name (ie 'bGn') to a piece code"""
+    return make_code(COLOR_INDEX[name[0]], KIND_BY_ABBREVIATION[name[1:]])
+
+
+def code_name(code: int) -> str:
+    """helper function converts a (non-empty) piece code to a Piece name (ie 'bGn')"""
+    return COLORS[code_color(code)] + ABBREVIATIONS[code_kind(code)]
+
+
+class Position:
+    """Represents a Janggi position as a flat array of piece codes"""
+    __slots__ = ('_squares', '_pieces', '_by_code', '_turn', '_undo', '_hash')
+
+    def __init__(self, squares=None, turn=BLUE):
+        """
+        Initializes private data members for:
+            squares (bytearray of 90 piece codes), occupied squares per color and per piece code,
+            side to move (color index), undo stack for make() / unmake(), Zobrist key
+        :param squares: optional iterable of 90 piece codes, an empty board by default
+        :param turn: color index of the side to move, blue starts the game
+        """
+        self._turn = turn
+        self._undo = []
+        if squares is None:
+            self._squares = bytearray(NUM_SQUARES)
+        else:
+            self._squares = bytearray(squares)
+            if len(self._squares) != NUM_SQUARES:
+                raise ValueError(f"a position needs {NUM_SQUARES} squares, got {len(self._squares)}")
+        self._pieces = ([], [])
+        self._by_code = tuple([] for _ in range(_NUM_CODES))
+        for square, code in enumerate(self._squares):
+            if code:
+                self._pieces[code_color(code)].append(square)
+                self._by_code[code].append(square)
+        self._hash = self.compute_hash()
+
+    def compute_hash(self):
+        """computes the Zobrist key of the position from scratch (see hash() for the maintained key)"""
+        key = ZOBRIST_RED_TO_MOVE if self._turn == RED else 0
+        for square, code in enumerate(self._squares):
+            if code:
+                key ^= ZOBRIST_PIECES[code][square]
+        return key
+
+    @classmethod
+    def starting(cls):
+        """returns a new Position with the standard starting setup"""
+        squares = bytearray()
+        for row in _START_ROWS:
+            for name in row.split():
+                squares.append(EMPTY if name == '---' else code_from_name(name))
+        return cls(squares)
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        returns a new Position read from a FEN-style string (see to_fen())
+        :raises ValueError: if the string doesn't describe 10 rows of 9 squares and a side to move
+        """
+        fields = fen.split()
+        rows = fields[0].split('/') if fields else []
+        if len(rows) != NUM_ROWS or len(fields) > 2 or (len(fields) == 2 and fields[1] not in COLOR_INDEX):
+            raise ValueError(f"invalid position string: {fen!r}")
+        squares = bytearray()
+        for row in rows:
+            start = len(squares)
+            for char in row:
+                if char.isdigit():
+                    squares.extend(bytes(int(char)))
+                elif char.lower() in KIND_BY_FEN_LETTER:
+                    squares.append(make_code(BLUE if char.isupper() else RED, KIND_BY_FEN_LETTER[char.lower()]))
+                else:
+                    raise ValueError(f"invalid piece {char!r} in position string: {fen!r}")
+            if len(squares) - start != NUM_COLS:
+                raise ValueError(f"row {row!r} doesn't have {NUM_COLS} squares in position string: {fen!r}")
+        turn = COLOR_INDEX[fields[1]] if len(fields) == 2 else BLUE
+        return cls(squares, turn)
+
+    def to_fen(self):
+        """
+        returns the position as a FEN-style string: the rows from row 0 (rank 1, red's back row)
+        to row 9 separated by '/', each row's pieces as letters (upper case blue, lower case red)
+        and runs of empty squares as digits, then the side to move ('b' or 'r')
+        """
+        rows = []
+        for row in range(NUM_ROWS):
+            text = ''
+            empty = 0
+            for code in self._squares[row * NUM_COLS:(row + 1) * NUM_COLS]:
+                if not code:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[code_kind(code)]
+                text += letter.upper() if code_color(code) == BLUE else letter
+            if empty:
+                text += str(empty)
+            rows.append(text)
+        return '/'.join(rows) + ' ' + COLORS[self._turn]
+
+    def copy(self):
+        """returns an independent copy of this Position (without its undo stack)"""
+        other = Position.__new__(Position)
+        other._squares = self._squares[:]
+        other._pieces = (self._pieces[BLUE][:], self._pieces[RED][:])
+        other._by_code = tuple(squares[:] for squares in self._by_code)
+        other._turn = self._turn
+        other._undo = []
+        other._hash = self._hash
+        return other
+
+    # GETTERS & SETTERS
+
+    def get_squares(self):
+        """getter for the underlying bytearray of piece codes (do not modify directly)"""
+        return self._squares
+
+    def get(self, square):
+        """returns the piece code found on a square (0 if empty)"""
+        return self._squares[square]
+
+    def get_turn(self):
+        """getter for the side to move (color index)"""
+        return self._turn
+
+    def set_turn(self, color):
+        """setter for the side to move (color index)"""
+        if color != self._turn:
+            self._hash ^= ZOBRIST_RED_TO_MOVE
+        self._turn = color
+
+    def pieces(self, color):
+        """returns the list of squares occupied by a color index (do not modify directly)"""
+        return self._pieces[color]
+
+    def pieces_of(self, color, kind):
+        """returns the list of squares occupied by pieces of a color index and kind (do not modify directly)"""
+        return self._by_code[kind | (color << COLOR_SHIFT)]
+
+    def general_square(self, color):
+        """returns the square of the General of a color index (None if it's not on the board)"""
+        generals = self._by_code[GENERAL | (color << COLOR_SHIFT)]
+        return generals[0] if generals else None
+
+    def put(self, square, code):
+        """
+        Overrides a square with a piece code (EMPTY clears the square),
+        keeping the per-color piece lists up to date
+        """
+        squares = self._squares
+        old = squares[square]
+        if old:
+            self._pieces[old >> COLOR_SHIFT].remove(square)
+            self._by_code[old].remove(square)
+            self._hash ^= ZOBRIST_PIECES[old][square]
+        squares[square] = code
+        if code:
+            self._pieces[code >> COLOR_SHIFT].append(square)
+            self._by_code[code].append(square)
+            self._hash ^= ZOBRIST_PIECES[code][square]
+
+    def move(self, start, end):
+        """
+        Moves the piece on start to end, capturing whatever is on end.
+        A pass move (start == end) leaves the position unchanged.
+        :return: the captured piece code (0 if nothing was captured)
+        """
+        if start == end:
+            return EMPTY
+        squares = self._squares
+        code = squares[start]
+        captured = squares[end]
+        zobrist = ZOBRIST_PIECES[code]
+        key = zobrist[start] ^ zobrist[end]
+        if captured:
+            self._pieces[captured >> COLOR_SHIFT].remove(end)
+            self._by_code[captured].remove(end)
+            key ^= ZOBRIST_PIECES[captured][end]
+        movers = self._pieces[code >> COLOR_SHIFT]
+        movers[movers.index(start)] = end
+        movers = self._by_code[code]
+        movers[movers.index(start)] = end
+        squares[end] = code
+        squares[start] = EMPTY
+        self._hash ^= key
+        return captured
+
+    # MAKE / UNMAKE
+
+    def make(self, start, end):
+        """
+        Plays the move start -> end for the side to move and pushes an undo record
+        (start, end, captured piece code, previous turn, Zobrist key delta).
+        start == end is a pass move. Does not check the move's validity.
+        :return: the captured piece code (0 if nothing was captured)
+        """
+        previous_hash = self._hash
+        captured = self.move(start, end)
+        self._hash ^= ZOBRIST_RED_TO_MOVE
+        self._undo.append((start, end, captured, self._turn, self._hash ^ previous_hash))
+        self._turn ^= 1
+        return captured
+
+    def unmake(self):
+        """
+        Takes back the last move played with make(), restoring the captured piece and the turn
+        :return: the (start, end) move that was taken back
+        """
+        start, end, captured, turn, hash_delta = self._undo.pop()
+        self._turn = turn
+        self._hash ^= hash_delta
+        if start != end:
+            squares = self._squares
+            code = squares[end]
+            movers = self._pieces[code >> COLOR_SHIFT]
+            movers[movers.index(end)] = start
+            movers = self._by_code[code]
+            movers[movers.index(end)] = start
+            squares[start] = code
+            squares[end] = captured
+            if captured:
+                self._pieces[captured >> COLOR_SHIFT].append(end)
+                self._by_code[captured].append(end)
+        return start, end
+
+    def ply_count(self):
+        """returns the number of moves on the undo stack"""
+        return len(self._undo)
+
+    def moves(self):
+        """returns the list of (start, end) moves on the undo stack, oldest first"""
+        return [(record[0], record[1]) for record in self._undo]
+
+    # HASHING & COMPARISON
+
+    def hash(self):
+        """returns the incrementally maintained 64-bit Zobrist key of the position"""
+        return self._hash
+
+    def key(self):
+        """returns the position as 91 bytes (90 squares then the side to move), suitable as a dict key"""
+        return bytes(self._squares) + bytes((self._turn,))
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self._turn == other._turn and self._squares == other._squares
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        rows = []
+        for row in range(NUM_ROWS):
+            cells = self._squares[row * NUM_COLS:(row + 1) * NUM_COLS]
+            rows.append(' '.join(code_name(code) if code else '---' for code in cells))
+        return 'Position(\n  ' + '\n  '.join(rows) + '\n)'
+
+
+def enemy_color(color: int) -> int:
+    """helper function returns the opposing color index"""
+    return color ^ 1
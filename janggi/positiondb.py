@@ -0,0 +1,198 @@
+# Description:  Memory-mapped position database built from game records.
+#                   The database file is an open-addressing hash table of fixed-width 72-byte
+#               entries, indexed by the low bits of each position's Zobrist key and probed
+#               linearly. An entry holds the full 64-bit key, the position packed into 46 bytes
+#               (one 4-bit piece code per square plus the side to move, to rule out key
+#               collisions), the number of times the position was reached, the wins, draws and
+#               losses of the side to move from it, and its best move.
+#                   PositionDB maps the file read-only with mmap (see janggi.mmapfile), so a lookup
+#               reads one or two entries straight from the page cache without loading the file;
+#               every process (or thread) that opens the same file shares the same pages.
+#                   build() creates the file from an iterable of janggi.record.GameRecords
+#               (python -m janggi.positiondb build out.jpdb games.jgr ...). The best move of a
+#               position is the move played from it with the best smoothed score for the side
+#               to move, (points + 1) / (games + 2) counting a draw as half a point, so a move
+#               played once and won doesn't outrank a move won nine times out of ten.
+#                   build() keeps the statistics of every distinct position of the records in memory
+#               (roughly 600 bytes each in CPython, plus the moves played from it) and then builds
+#               the whole table in memory before writing it, so its memory grows with the number of
+#               distinct positions: about 1 GB per million. Use max_plies to limit large record sets
+#               to their openings, where positions repeat, rather than every position of every game.
+
+import collections
+import os
+import struct
+import sys
+
+from janggi.mmapfile import MappedFile, build_parser, probe_position
+from janggi.position import Position, BLUE, NUM_SQUARES
+from janggi.record import read_record_files, record_moves
+
+FILE_MAGIC = b'JPDB'
+FILE_VERSION = 1
+# magic, version, number of slots (a power of two), number of entries
+_FILE_HEADER = struct.Struct('<4sIQQ')
+PACKED_SIZE = NUM_SQUARES // 2 + 1
+# Zobrist key, packed position, visits, wins, draws, losses, best move start + 1, end + 1 (0 if none)
+_ENTRY = struct.Struct('<Q{}sIIIIBB'.format(PACKED_SIZE))
+# offset of the visit count in an entry, a slot with no visits is empty
+_VISITS_OFFSET = 8 + PACKED_SIZE
+# the table is at most this full, so probe sequences stay short
+MAX_LOAD = 0.5
+
+PositionEntry = collections.namedtuple('PositionEntry', ['visits', 'wins', 'draws', 'losses', 'move'])
+PositionEntry.__doc__ = """
+Statistics of a position in the database:
+    visits:     number of times the position was reached in the recorded games
+    wins, draws, losses:    results of the finished games for the side to move in the position
+    move:       best (start, end) move of square indexes played from the position (None if the
+                games ended there)
+"""
+
+
+def pack_position(position):
+    """helper function returns the position as 46 bytes: two 4-bit piece codes per byte and the side to move"""
+    squares = position.get_squares()
+    # piece codes fit in 4 bits, so shifting the even squares' bytes by 4 never carries into the next byte
+    high = int.from_bytes(squares[0::2], 'big') << 4
+    low = int.from_bytes(squares[1::2], 'big')
+    return (high | low).to_bytes(NUM_SQUARES // 2, 'big') + bytes((position.get_turn(),))
+
+
+def _result_points(result, color):
+    """helper function returns the points of a color index for a game result (1 win, 0.5 draw, 0 loss), None if unfinished"""
+    if result == "UNFINISHED":
+        return None
+    if result == "BLUE_WON":
+        return 1.0 if color == BLUE else 0.0
+    if result == "RED_WON":
+        return 0.0 if color == BLUE else 1.0
+    return 0.5
+
+
+def build(path, records, max_plies=None, min_visits=1):
+    """
+    Builds a database file from game records, replacing any existing file.
+    Every distinct position is kept in memory until the file is written (see the module description).
+    :param records: iterable of janggi.record.GameRecord (ie from read_records())
+    :param max_plies: optional number of plies from the start of each game to record
+    :param min_visits: positions reached fewer times than this are left out
+    :return: the number of positions stored
+    """
+    # zobrist key -> [packed position, visits, wins, draws, losses, {move: [games, points]}]
+    stats = dict()
+    for record in records:
+        position = Position.starting()
+        moves = list(record_moves(record))
+        if max_plies is not None:
+            moves = moves[:max_plies]
+        for index in range(len(moves) + 1):
+            key = position.hash()
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = [pack_position(position), 0, 0, 0, 0, dict()]
+            entry[1] += 1
+            points = _result_points(record.result, position.get_turn())
+            if points is not None:
+                entry[2 if points == 1.0 else 3 if points == 0.5 else 4] += 1
+            if index == len(moves):
+                break
+            move = moves[index]
+            move_stats = entry[5].setdefault(move, [0, 0.0])
+            move_stats[0] += 1
+            move_stats[1] += points if points is not None else 0.5
+            position.make(*move)
+
+    entries = [(key, entry) for key, entry in stats.items() if entry[1] >= min_visits]
+    slots = 1
+    while slots * MAX_LOAD < max(len(entries), 1):
+        slots *= 2
+    mask = slots - 1
+    table = bytearray(slots * _ENTRY.size)
+    for key, (packed, visits, wins, draws, losses, move_stats) in entries:
+        best = (-1, -1)
+        move = None
+        for candidate, (games, points) in move_stats.items():
+            rank = ((points + 1) / (games + 2), games)
+            if rank > best:
+                best, move = rank, candidate
+        start, end = (move[0] + 1, move[1] + 1) if move is not None else (0, 0)
+        slot = key & mask
+        while table[slot * _ENTRY.size + _VISITS_OFFSET:slot * _ENTRY.size + _VISITS_OFFSET + 4] != bytes(4):
+            slot = (slot + 1) & mask
+        _ENTRY.pack_into(table, slot * _ENTRY.size, key, packed, visits, wins, draws, losses, start, end)
+
+    with open(path, 'wb') as file:
+        file.write(_FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, slots, len(entries)))
+        file.write(table)
+    return len(entries)
+
+
+class PositionDB(MappedFile):
+    """Represents a read-only, memory-mapped position database file"""
+    description = "position database"
+
+    def __init__(self, path):
+        """
+        Initializes private data members for:
+            open file and its memory map (see MappedFile), slot index mask, number of entries
+        :raises ValueError: if the file isn't a position database
+        """
+        super().__init__(path)
+        if len(self._map) < _FILE_HEADER.size:
+            self.invalid()
+        magic, version, slots, count = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != FILE_MAGIC or version != FILE_VERSION or len(self._map) != _FILE_HEADER.size + slots * _ENTRY.size:
+            self.invalid()
+        self._mask = slots - 1
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def get(self, position):
+        """
+        Looks up a Position.
+        :return: its PositionEntry, or None if it isn't in the database
+        """
+        data = self._map
+        key = position.hash()
+        packed = None
+        slot = key & self._mask
+        while True:
+            offset = _FILE_HEADER.size + slot * _ENTRY.size
+            entry = _ENTRY.unpack_from(data, offset)
+            if not entry[2]:
+                return None             # empty slot, end of the probe sequence
+            if entry[0] == key:
+                if packed is None:
+                    packed = pack_position(position)
+                if entry[1] == packed:
+                    start, end = entry[6], entry[7]
+                    move = (start - 1, end - 1) if start else None
+                    return PositionEntry(entry[2], entry[3], entry[4], entry[5], move)
+            slot = (slot + 1) & self._mask
+
+    def __repr__(self):
+        return 'PositionDB({!r}, {} positions)'.format(self._path, self._count)
+
+
+def main(argv=None):
+    """command line to build a database from record files or look up a position, returns the exit status"""
+    parser, build_command = build_parser('python -m janggi.positiondb', 'Janggi position database', 'database')
+    build_command.add_argument('--max-plies', type=int, help='only record this many plies of each game')
+    build_command.add_argument('--min-visits', type=int, default=1, help='leave out positions reached fewer times')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = build(args.database, read_record_files(args.records), args.max_plies, args.min_visits)
+        print('stored {} positions in {} ({} bytes)'.format(count, args.database, os.path.getsize(args.database)))
+        return 0
+
+    with PositionDB(args.database) as database:
+        print(database.get(probe_position(args)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# Description:  Compact binary game records.
+#                   A record file starts with the 4-byte magic FILE_MAGIC, followed by games one
+#               after the other. Each game is a fixed 9-byte little-endian header (result code,
+#               blue and red AI levels, number of moves, metadata length), the metadata (UTF-8
+#               JSON, usually empty), then 2 bytes per move: the start and end square indexes
+#               (row * 9 + col, start == end is a pass). Every game starts from the starting
+#               position, so a 100 move game takes 209 bytes.
+#                   RecordWriter streams games to a file as they are played, and read_records()
+#               is a generator that reads one game at a time through a buffered file, so
+#               archives of any size are replayed without loading them. Games can be replayed
+#               with full validation through Game.make_move() (replay_game) or with the much
+#               faster Position.make() (replay_positions), which trusts the recorded moves.
+
+import collections
+import json
+import struct
+
+from janggi.game import Game
+from janggi.position import Position
+from janggi.utils import algebraic_to_square, square_to_algebraic
+
+FILE_MAGIC = b'JGR1'
+
+# result codes, indexed by the Game's game state
+RESULTS = ("UNFINISHED", "BLUE_WON", "RED_WON", "STALEMATE", "REPETITION")
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+
+# result code, blue level, red level, number of moves, metadata length
+_GAME_HEADER = struct.Struct('<BHHHH')
+MAX_MOVES = 0xFFFF
+
+GameRecord = collections.namedtuple('GameRecord', ['result', 'moves', 'blue_level', 'red_level', 'metadata'])
+GameRecord.__doc__ = """
+A recorded game:
+    result:     final game state (one of RESULTS, "UNFINISHED" if the game was stopped)
+    moves:      bytes of 2 square indexes per move, iterate with record_moves()
+    blue_level: AI level of blue (0 for a human or unknown player)
+    red_level:  AI level of red
+    metadata:   dict of extra information (empty if there was none)
+"""
+
+
+def record_moves(record):
+    """generator yields the (start, end) square index moves of a GameRecord"""
+    moves = record.moves
+    for index in range(0, len(moves), 2):
+        yield moves[index], moves[index + 1]
+
+
+def pack_moves(moves):
+    """
+    helper function returns the 2-byte-per-move encoding of a list of moves, given as
+    (start, end) square indexes or (start, end) algebraic coordinates (ie ('c7', 'c6'))
+    """
+    data = bytearray()
+    for start, end in moves:
+        if isinstance(start, str):
+            start, end = algebraic_to_square(start), algebraic_to_square(end)
+        data.append(start)
+        data.append(end)
+    return bytes(data)
+
+
+class RecordWriter:
+    """Represents a stream of games being written to a binary record file"""
+    def __init__(self, file, append=False):
+        """
+        Initializes private data members for the open file, whether this writer opened it,
+        and the number of games written. Writes the file magic to a new file.
+        :param file: path of the record file, or a binary file object open for writing
+        :param append: add games to the end of an existing record file instead of replacing it
+        :raises ValueError: if appending to a non-empty file that isn't a record file
+        """
+        self._owns_file = isinstance(file, str)
+        if self._owns_file:
+            file = open(file, 'ab+' if append else 'wb')
+        self._file = file
+        self._games = 0
+        if append:
+            file.seek(0, 2)
+        if not append or file.tell() == 0:
+            file.write(FILE_MAGIC)
+        elif file.readable():
+            # check the existing file's magic (and so its format version) before adding to it
+            end = file.tell()
+            file.seek(0)
+            magic = file.read(len(FILE_MAGIC))
+            file.seek(end)
+            if magic != FILE_MAGIC:
+                if self._owns_file:
+                    file.close()
+                raise ValueError("not a game record file")
+
+    def get_games(self):
+        """getter for the number of games written by this writer"""
+        return self._games
+
+    def write(self, moves, result="UNFINISHED", blue_level=0, red_level=0, metadata=None):
+        """
+        Appends one game to the file.
+        :param moves: the game's moves, (start, end) square indexes or algebraic coordinates
+        :param result: final game state, one of RESULTS
+        :param metadata: optional JSON serializable dict stored with the game
+        """
+        data = pack_moves(moves)
+        if len(data) // 2 > MAX_MOVES:
+            raise ValueError(f"a record holds at most {MAX_MOVES} moves, got {len(data) // 2}")
+        extra = json.dumps(metadata, separators=(',', ':')).encode() if metadata else b''
+        self._file.write(_GAME_HEADER.pack(RESULT_CODES[result], blue_level, red_level, len(data) // 2, len(extra)))
+        self._file.write(extra)
+        self._file.write(data)
+        self._games += 1
+
+    def write_game(self, game, blue_level=0, red_level=0, metadata=None):
+        """appends the moves played so far on a Game (from its board's undo stack) and its game state"""
+        self.write(game.get_board().get_position().moves(), game.get_game_state(), blue_level, red_level, metadata)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        """flushes the file, and closes it if this writer opened it"""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_records(file):
+    """
+    generator yields every GameRecord of a binary record file, reading one game at a time
+    :param file: path of the record file, or a binary file object open for reading
+    :raises ValueError: if the file isn't a record file or ends in the middle of a game
+    """
+    if isinstance(file, str):
+        with open(file, 'rb') as opened:
+            yield from read_records(opened)
+        return
+    if file.read(len(FILE_MAGIC)) != FILE_MAGIC:
+        raise ValueError("not a game record file")
+    header_size = _GAME_HEADER.size
+    while True:
+        header = file.read(header_size)
+        if not header:
+            return
+        if len(header) != header_size:
+            raise ValueError("record file ends in the middle of a game header")
+        result, blue_level, red_level, count, extra_length = _GAME_HEADER.unpack(header)
+        if result >= len(RESULTS):
+            raise ValueError("bad result code")
+        extra = file.read(extra_length)
+        moves = file.read(count * 2)
+        if len(extra) != extra_length or len(moves) != count * 2:
+            raise ValueError("record file ends in the middle of a game")
+        metadata = json.loads(extra) if extra else dict()
+        yield GameRecord(RESULTS[result], moves, blue_level, red_level, metadata)
+
+
+def read_record_files(paths):
+    """generator yields every GameRecord of several binary record files, one file after the other"""
+    for path in paths:
+        yield from read_records(path)
+
+
+def replay_game(record):
+    """
+    Replays a GameRecord through Game.make_move(), which validates every move
+    :return: the Game after the last move
+    :raises ValueError: if a recorded move is rejected
+    """
+    game = Game()
+    for start, end in record_moves(record):
+        if not game.make_move(square_to_algebraic(start), square_to_algebraic(end)):
+            raise ValueError("illegal recorded move {} -> {}".format(square_to_algebraic(start),
+                                                                     square_to_algebraic(end)))
+    return game
+
+
+def replay_positions(record):
+    """
+    generator replays a GameRecord with Position.make(), without validating the moves, and
+    yields the same Position after every move (copy() it to keep one); the starting position
+    is yielded first
+    """
+    position = Position.starting()
+    yield position
+    for start, end in record_moves(record):
+        position.make(start, end)
+        yield position
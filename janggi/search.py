@@ -0,0 +1,324 @@
+# Description:  Alpha-beta search engine for the Janggi AI.
+#                   Searcher runs a negamax alpha-beta search with iterative deepening on a
+#               copy of a board's compact Position, so the Board and its Piece objects are never
+#               touched. Each iteration searches one ply deeper than the last, until the depth
+#               limit or the time budget is reached; the result of the last completed iteration
+#               is returned along with its principal variation (the expected line of play).
+#                   Leaf positions are resolved with a capture-only quiescence search and scored
+#               by material from the point of view of the side to move.
+#                   An optional TranspositionTable (janggi.ttable) lets the search reuse results
+#               for positions reached through different move orders, and across iterations.
+
+import collections
+import logging
+import time
+
+from janggi.movegen import legal_moves
+from janggi.position import KIND_MASK, CHARIOT, CANNON, HORSE, ELEPHANT, GUARD, SOLDIER
+from janggi.ttable import EXACT, LOWER, UPPER
+
+# material values used by the evaluation, indexed by piece kind (the General is never captured)
+PIECE_VALUES = [0] * (SOLDIER + 1)
+PIECE_VALUES[CHARIOT] = 1300
+PIECE_VALUES[CANNON] = 700
+PIECE_VALUES[HORSE] = 500
+PIECE_VALUES[ELEPHANT] = 300
+PIECE_VALUES[GUARD] = 300
+PIECE_VALUES[SOLDIER] = 200
+PIECE_VALUES = tuple(PIECE_VALUES)
+
+MATE_SCORE = 100000
+# scores beyond this are mates, the distance to mate is MATE_SCORE - abs(score) plies
+MATE_THRESHOLD = MATE_SCORE - 1000
+INFINITY = MATE_SCORE + 1
+MAX_DEPTH = 64
+
+# the clock is only read every this many nodes
+_TIME_CHECK_INTERVAL = 512
+
+SearchResult = collections.namedtuple('SearchResult', ['move', 'score', 'depth', 'pv', 'nodes', 'elapsed_ms'])
+SearchResult.__doc__ = """
+Result of a search:
+    move:       best (start, end) move of flat square indexes (None if there is no legal move)
+    score:      score of the position for the side to move, MATE_SCORE - n is a mate in n plies
+    depth:      depth of the last completed iteration
+    pv:         principal variation, the list of moves expected to be played starting with move
+    nodes:      number of positions searched
+    elapsed_ms: time spent searching in milliseconds
+"""
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out or the search is stopped"""
+
+
+def evaluate(position):
+    """
+    returns the static evaluation of a position for the side to move:
+    the difference in material between the side to move and its opponent
+    """
+    squares = position.get_squares()
+    score = 0
+    for color in (0, 1):
+        material = 0
+        for square in position.pieces(color):
+            material += PIECE_VALUES[squares[square] & KIND_MASK]
+        score += material if color == position.get_turn() else -material
+    return score
+
+
+def score_to_table(score, ply):
+    """helper function makes a mate score relative to the position (not the root) before it is stored"""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """helper function makes a stored mate score relative to the root again"""
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+class Searcher:
+    """Represents a negamax alpha-beta search with iterative deepening"""
+    def __init__(self, ttable=None):
+        """
+        Initializes private data members for:
+            position being searched, node count, deadline, stop flag, principal variation table,
+            transposition table, bound of the root's score
+        :param ttable: optional janggi.ttable.TranspositionTable shared by every search
+        """
+        self._ttable = ttable
+        self._position = None
+        self._nodes = 0
+        self._deadline = None
+        self._stop = None
+        self._pv_table = []
+        self._previous_pv = []
+        self._path = []
+        self._root_bound = EXACT
+
+    def get_nodes(self):
+        """getter for the number of positions searched by the last search"""
+        return self._nodes
+
+    def search(self, position, max_depth=MAX_DEPTH, max_time_ms=None, stop=None, first_depth=1, generation=None,
+               root_moves=None):
+        """
+        Searches a position with iterative deepening and returns a SearchResult.
+        :param position: the Position to search, it is copied and left untouched
+        :param max_depth: deepest iteration to search
+        :param max_time_ms: optional time budget, the last completed iteration is returned
+                            when it runs out (depth 1 is always completed)
+        :param stop: optional object with an is_set() method (ie a threading.Event),
+                     the search is cancelled as soon as it is set
+        :param first_depth: depth of the first iteration (helper searches start deeper to diversify)
+        :param generation: optional transposition table generation, so processes sharing a table agree on it
+        :param root_moves: optional subset of the position's legal moves to choose from (ie without passes),
+                           searched in the given order, every legal move by default
+        """
+        started = time.perf_counter()
+        self._position = position.copy()
+        self._nodes = 0
+        self._stop = stop
+        self._deadline = None
+        self._path = [self._position.hash()]
+        if self._ttable is not None:
+            self._ttable.new_search(generation)
+
+        legal = list(legal_moves(self._position, self._position.get_turn()))
+        # a restricted root's score is only a lower bound of the position's
+        self._root_bound = EXACT if root_moves is None else LOWER
+        root_moves = legal if root_moves is None else [move for move in root_moves if move in legal] or legal
+        if not root_moves:
+            return SearchResult(None, -MATE_SCORE, 0, [], 0, 0.0)
+
+        best = SearchResult(root_moves[0], 0, 0, [root_moves[0]], 0, 0.0)
+        for depth in range(first_depth, max_depth + 1):
+            # the first iteration always completes so there is a move to return
+            if depth > first_depth and max_time_ms is not None:
+                self._deadline = started + max_time_ms / 1000
+            self._pv_table = [[] for _ in range(depth + 1)]
+            self._previous_pv = best.pv
+            try:
+                score = self._root(depth, root_moves, best.pv)
+            except SearchTimeout:
+                break
+            pv = self._pv_table[0]
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            best = SearchResult(pv[0], score, depth, pv, self._nodes, elapsed_ms)
+            logging.debug('search depth={} score={} nodes={} time={:.0f}ms pv={}'.format(
+                depth, score, self._nodes, elapsed_ms, pv))
+            if abs(score) >= MATE_THRESHOLD or (stop is not None and stop.is_set()):
+                break
+            if max_time_ms is not None and elapsed_ms >= max_time_ms:
+                break
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return best._replace(nodes=self._nodes, elapsed_ms=elapsed_ms)
+
+    def _root(self, depth, root_moves, previous_pv):
+        """searches every root move to depth, trying the previous principal variation move first"""
+        if previous_pv and previous_pv[0] in root_moves:
+            root_moves.remove(previous_pv[0])
+            root_moves.insert(0, previous_pv[0])
+        alpha = -INFINITY
+        for move in root_moves:
+            score = -self._visit(move, depth - 1, -INFINITY, -alpha, 1)
+            if score > alpha:
+                alpha = score
+                self._pv_table[0] = [move] + self._pv_table[1]
+        if self._ttable is not None:
+            self._ttable.store(self._position.hash(), score_to_table(alpha, 0), depth, self._root_bound,
+                               self._pv_table[0][0])
+        return alpha
+
+    def _visit(self, move, depth, alpha, beta, ply):
+        """helper function makes a move, searches the resulting position and takes the move back"""
+        position = self._position
+        position.make(*move)
+        self._path.append(position.hash())
+        try:
+            if depth <= 0:
+                return self._quiesce(alpha, beta, ply)
+            return self._negamax(depth, alpha, beta, ply)
+        finally:
+            self._path.pop()
+            position.unmake()
+
+    def _tick(self):
+        """helper function counts a node and raises SearchTimeout when time is up or the search is stopped"""
+        self._nodes += 1
+        if self._nodes % _TIME_CHECK_INTERVAL == 0:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise SearchTimeout()
+            if self._stop is not None and self._stop.is_set():
+                raise SearchTimeout()
+
+    def _is_repetition(self):
+        """returns True if the current position already occurred earlier on the search path"""
+        path = self._path
+        return path[-1] in path[:-1]
+
+    def _negamax(self, depth, alpha, beta, ply):
+        """negamax alpha-beta search of the current position, returns its score for the side to move"""
+        self._tick()
+        self._pv_table[ply] = []
+        if self._is_repetition():
+            return 0
+
+        position = self._position
+        ttable = self._ttable
+        table_move = None
+        if ttable is not None:
+            entry = ttable.probe(position.hash())
+            if entry is not None:
+                score, entry_depth, bound, table_move = entry
+                if entry_depth >= depth:
+                    score = score_from_table(score, ply)
+                    if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                        return score
+
+        moves = list(legal_moves(position, position.get_turn()))
+        if not moves:
+            return -MATE_SCORE + ply          # checkmated
+        if len(moves) == 1 and moves[0][0] == moves[0][1]:
+            return 0                          # stalemate, passing is the only legal move
+
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = None
+        for move in self._order(moves, ply, table_move):
+            score = -self._visit(move, depth - 1, -beta, -alpha, ply + 1)
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if ply + 1 < len(self._pv_table):
+                        self._pv_table[ply] = [move] + self._pv_table[ply + 1]
+                    if alpha >= beta:
+                        break
+
+        if ttable is not None:
+            if best <= original_alpha:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            ttable.store(position.hash(), score_to_table(best, ply), depth, bound, best_move)
+        return best
+
+    def _quiesce(self, alpha, beta, ply):
+        """capture-only search so leaf positions aren't scored in the middle of an exchange"""
+        self._tick()
+        if ply < len(self._pv_table):
+            self._pv_table[ply] = []
+        position = self._position
+        stand_pat = evaluate(position)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        squares = position.get_squares()
+        captures = [move for move in legal_moves(position, position.get_turn()) if squares[move[1]]]
+        captures.sort(key=self._capture_order, reverse=True)
+        for move in captures:
+            score = -self._visit(move, 0, -beta, -alpha, ply + 1)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def _capture_order(self, move):
+        """most valuable victim, least valuable attacker"""
+        squares = self._position.get_squares()
+        return PIECE_VALUES[squares[move[1]] & KIND_MASK] * 16 - PIECE_VALUES[squares[move[0]] & KIND_MASK] // 100
+
+    def _order(self, moves, ply, table_move=None):
+        """
+        helper function orders moves for the search: the principal variation move from the
+        previous iteration first, then the transposition table's best move, then captures
+        (most valuable victim first), then quiet moves, and pass moves last
+        """
+        squares = self._position.get_squares()
+        pv_move = None
+        if ply < len(self._previous_pv):
+            pv_move = self._previous_pv[ply]
+
+        def key(move):
+            if move == pv_move:
+                return 1 << 30
+            if move == table_move:
+                return 1 << 29
+            if move[0] == move[1]:
+                return -1
+            if squares[move[1]]:
+                return self._capture_order(move)
+            return 0
+        return sorted(moves, key=key, reverse=True)
+
+
+def search(board, max_time_ms=None, max_depth=MAX_DEPTH, stop=None, ttable=None, root_moves=None):
+    """
+    Searches the current position of a Board (or a Position) for the side to move.
+    :param board: janggi.board.Board or janggi.position.Position, left untouched
+    :param max_time_ms: optional time budget in milliseconds
+    :param max_depth: deepest iteration to search
+    :param stop: optional threading.Event-like object to cancel the search
+    :param ttable: optional janggi.ttable.TranspositionTable, kept between calls to reuse results
+    :param root_moves: optional subset of the legal moves to choose from, every legal move by default
+    :return: SearchResult with the best move, its score and principal variation
+    """
+    position = board.get_position() if hasattr(board, 'get_position') else board
+    return Searcher(ttable).search(position, max_depth=max_depth, max_time_ms=max_time_ms, stop=stop,
+                                   root_moves=root_moves)
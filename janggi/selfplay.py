@@ -0,0 +1,192 @@
+# Description:  Headless batch self-play, run with python -m janggi.selfplay.
+#                   Plays a number of AI vs AI games, each in its own Game, spread over a
+#               ProcessPoolExecutor so games run in parallel on every core. As each game
+#               finishes its record (moves, outcome, ply count, time per move) is written as one
+#               line of JSON, so long runs can be followed and partial results are never lost.
+#               Games are seeded, so the random levels replay the same games for the same seed.
+#               With --record the games are also written to a compact binary record file
+#               (see janggi.record). With --db every game's AI consults a position database
+#               (see janggi.positiondb), and with --book it plays from an opening book
+#               (see janggi.book); both files are memory-mapped once per worker process. With
+#               --tablebase it plays the endgames covered by a directory of endgame tablebases
+#               (see janggi.tablebase), also opened once per worker process.
+#                   A summary with the outcomes and the games played per second is printed
+#               to stderr at the end.
+
+import argparse
+import collections
+import json
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from janggi.book import OpeningBook
+from janggi.game import Game
+from janggi.positiondb import PositionDB
+from janggi.record import RecordWriter
+from janggi.tablebase import Tablebases
+
+# games still unfinished after this many plies are stopped and recorded as such
+DEFAULT_MAX_PLIES = 200
+MAX_PLIES_OUTCOME = "MAX_PLIES"
+
+
+# database, opening book and tablebase files opened by this process, keyed by (class, path)
+_open_files = dict()
+
+
+def open_shared(cls, path):
+    """helper function returns this process's PositionDB, OpeningBook or Tablebases (cls) for a path, opened on first use"""
+    opened = _open_files.get((cls, path))
+    if opened is None:
+        opened = _open_files[(cls, path)] = cls(path)
+    return opened
+
+
+def play_game(index, blue_level, red_level, max_plies=DEFAULT_MAX_PLIES, seed=None, position_db_path=None,
+              book_path=None, tablebase_path=None):
+    """
+    Plays one AI vs AI game from the starting position and returns its record as a dict:
+        game, seed, blue_level, red_level:  the game's number and settings
+        moves:          list of [start, end] algebraic moves (start == end is a pass)
+        move_times_ms:  time the AI took to choose and play each move
+        outcome:        final game state (ie "BLUE_WON"), or MAX_PLIES_OUTCOME
+        plies:          number of moves played
+        elapsed_s:      time taken by the whole game
+    :param seed: seed of the random moves of the lower levels (default: the game number)
+    :param position_db_path: optional position database file for the AI to consult
+    :param book_path: optional opening book file for the AI to play from
+    :param tablebase_path: optional directory of endgame tablebases for the AI to play from
+    """
+    seed = index if seed is None else seed
+    random.seed(seed)
+    game = Game()
+    if position_db_path is not None:
+        game.set_position_db(open_shared(PositionDB, position_db_path))
+    if book_path is not None:
+        game.set_opening_book(open_shared(OpeningBook, book_path))
+    if tablebase_path is not None:
+        game.set_tablebase(open_shared(Tablebases, tablebase_path))
+    levels = {'b': blue_level, 'r': red_level}
+    moves = []
+    move_times_ms = []
+    started = time.perf_counter()
+    try:
+        while game.get_game_state() == "UNFINISHED" and len(moves) < max_plies:
+            move_started = time.perf_counter()
+            start, end = game.make_ai_move(levels[game.get_turn()])
+            move_times_ms.append(round((time.perf_counter() - move_started) * 1000, 3))
+            moves.append([start, end])
+    finally:
+        game.close()
+    outcome = game.get_game_state()
+    return {
+        'game': index,
+        'seed': seed,
+        'blue_level': blue_level,
+        'red_level': red_level,
+        'moves': moves,
+        'move_times_ms': move_times_ms,
+        'outcome': MAX_PLIES_OUTCOME if outcome == "UNFINISHED" else outcome,
+        'plies': len(moves),
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+
+
+def run(games, blue_level, red_level, out, workers=None, max_plies=DEFAULT_MAX_PLIES, seed=0, recorder=None,
+        position_db_path=None, book_path=None, tablebase_path=None):
+    """
+    Plays games AI vs AI games and writes each record to out as a line of JSON as soon
+    as the game finishes (so lines are in order of completion, not of game number).
+    :param workers: number of processes to play in (default: one per CPU), 1 plays in this process
+    :param seed: seed of the first game, game i is seeded with seed + i
+    :param recorder: optional janggi.record.RecordWriter every game is also written to
+    :param position_db_path: optional position database file for the AI to consult
+    :param book_path: optional opening book file for the AI to play from
+    :param tablebase_path: optional directory of endgame tablebases for the AI to play from
+    :return: summary dict with the number of games, outcome counts, total plies, elapsed seconds
+             and games per second
+    """
+    workers = workers or os.cpu_count() or 1
+    outcomes = collections.Counter()
+    plies = 0
+    started = time.perf_counter()
+
+    def write(record):
+        nonlocal plies
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+        if recorder is not None:
+            result = "UNFINISHED" if record['outcome'] == MAX_PLIES_OUTCOME else record['outcome']
+            recorder.write(record['moves'], result, blue_level, red_level, {'game': record['game'], 'seed': record['seed']})
+        outcomes[record['outcome']] += 1
+        plies += record['plies']
+
+    if workers == 1:
+        for index in range(games):
+            write(play_game(index, blue_level, red_level, max_plies, seed + index, position_db_path,
+                            book_path, tablebase_path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_game, index, blue_level, red_level, max_plies, seed + index,
+                                       position_db_path, book_path, tablebase_path)
+                       for index in range(games)]
+            for future in as_completed(futures):
+                write(future.result())
+
+    elapsed = time.perf_counter() - started
+    return {
+        'games': games,
+        'workers': workers,
+        'outcomes': dict(outcomes),
+        'plies': plies,
+        'elapsed_s': elapsed,
+        'games_per_s': games / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    """parses the command line, plays the games and prints the summary, returns the exit status"""
+    parser = argparse.ArgumentParser(prog='python -m janggi.selfplay', description='Headless Janggi AI self-play')
+    parser.add_argument('--games', '-n', type=int, default=10, help='number of games to play')
+    parser.add_argument('--level', '-l', type=int, default=10, help='AI level of both players')
+    parser.add_argument('--blue-level', type=int, help='AI level of blue (default: --level)')
+    parser.add_argument('--red-level', type=int, help='AI level of red (default: --level)')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='processes to play in (default: one per CPU)')
+    parser.add_argument('--max-plies', type=int, default=DEFAULT_MAX_PLIES, help='stop unfinished games after this many moves')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--output', '-o', default='-', help='JSONL file to write the games to (default: stdout)')
+    parser.add_argument('--record', '-r', help='binary record file to also write the games to (see janggi.record)')
+    parser.add_argument('--db', help='position database for the AI to consult (see janggi.positiondb)')
+    parser.add_argument('--book', help='opening book for the AI to play from (see janggi.book)')
+    parser.add_argument('--tablebase', help='directory of endgame tablebases for the AI to play from (see janggi.tablebase)')
+    parser.add_argument('--debug', '-d', action='count', default=0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+            format='%(asctime)s %(levelname)8s: %(message)s',
+            level=logging.WARNING - (10 * args.debug),
+            )
+
+    blue_level = args.level if args.blue_level is None else args.blue_level
+    red_level = args.level if args.red_level is None else args.red_level
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    recorder = RecordWriter(args.record) if args.record else None
+    try:
+        summary = run(args.games, blue_level, red_level, out, args.workers, args.max_plies, args.seed, recorder,
+                      args.db, args.book, args.tablebase)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if recorder is not None:
+            recorder.close()
+    print('played {games} games ({plies} plies) with {workers} workers in {elapsed_s:.1f}s: '
+          '{games_per_s:.2f} games/s, outcomes {outcomes}'.format(**summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# Description:  Process-wide sprite cache for the GUI.
+#                   The rules engine (Board, Piece, Position) never touches pygame: a Piece only
+#               has a name (ie 'bCh'). The GUI looks up the image for a piece by that name here.
+#               Each .svg in the assets directory is loaded the first time it is asked for and
+#               then kept for the rest of the process, so headless users of the engine never
+#               load an image and the GUI loads each one once.
+#                   Once the display is set, images are converted with convert_alpha() to the
+#               display's pixel format so blitting them needs no conversion; preload() rasterizes
+#               every piece up front. Fonts are memoized by name and size.
+
+import logging
+import os
+
+import pygame
+
+ASSETS_DIR = "assets"
+PIECE_NAMES = tuple(color + abbreviation for color in "br" for abbreviation in ("Gn", "Gd", "El", "Hs", "Ch", "Cn", "Sd"))
+FONT_NAME = "timesnewroman"
+
+# loaded images keyed by asset name (piece name or board image), debug labels keyed by piece name,
+# fonts keyed by (name, size)
+_images = dict()
+_labels = dict()
+_fonts = dict()
+
+
+def load_image(name: str) -> pygame.Surface:
+    """
+    returns the image of an asset (ie 'bCh' or 'JanggiOrange'), loading and rasterizing its .svg
+    on first use, converted to the display's pixel format if the display is set
+    """
+    image = _images.get(name)
+    if image is None:
+        image = pygame.image.load(os.path.join(ASSETS_DIR, name + ".svg"))
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        _images[name] = image
+    return image
+
+
+def preload():
+    """rasterizes every piece image up front, call once the display mode is set"""
+    for name in PIECE_NAMES:
+        load_image(name)
+
+
+def get_font(size: int, name: str = FONT_NAME) -> pygame.font.Font:
+    """returns the system font of a name and size, created on first use"""
+    font = _fonts.get((name, size))
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size)
+        _fonts[(name, size)] = font
+    return font
+
+
+def get_piece_image(name: str) -> pygame.Surface:
+    """
+    returns the image for a piece name (ie 'bCh'), loading its .svg from the assets
+    directory on first use. With debug logging enabled, returns a text label of the
+    piece's abbreviation instead, in the piece's color.
+    """
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        return get_debug_label(name)
+    return load_image(name)
+
+
+def get_debug_label(name: str) -> pygame.Surface:
+    """returns a text label of a piece's abbreviation (ie 'Ch'), red or blue, rendered on first use"""
+    label = _labels.get(name)
+    if label is None:
+        color = (0, 0, 255) if name[0] == 'b' else (255, 0, 0)
+        label = get_font(30).render(name[1:], True, color)
+        _labels[name] = label
+    return label
+
+
+def clear():
+    """empties the cache (ie after the display mode changes)"""
+    _images.clear()
+    _labels.clear()
+    _fonts.clear()
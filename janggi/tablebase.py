@@ -0,0 +1,663 @@
+# Description:  Endgame tablebases for small material sets, built by retrograde analysis.
+#                   A material set is written like "KRvKA": blue's pieces, then red's, as FEN
+#               letters (see janggi.position), each side with its General. A table holds the
+#               exact result of every placement of those pieces with either side to move: the
+#               number of plies to checkmate with best play (DTM), or a draw. Generals and
+#               Guards only ever stand in their own palace, so the table only indexes those squares
+#               for them; every other piece may stand on any of the 90 squares.
+#                   Generation works on the compact Position and the move generator that the Board
+#               is built on. Every placement's legal moves are generated once, in parallel over a
+#               ProcessPoolExecutor; captures lead into smaller tables, which are generated first
+#               and probed for the result. The results are then propagated backwards from the
+#               checkmates through the reversed move graph, shortest mates first: a position is won
+#               in n plies when a move reaches a position lost in n - 1, and lost in n when every
+#               move reaches a position won in at most n - 1. What is never reached is a draw.
+#               As in the game, a player may pass unless in check, and a player who can only pass
+#               is stalemated (a draw); repetitions are not taken into account.
+#                   The backward pass runs in this process and holds the whole move graph in memory,
+#               so generate() is limited to MAX_PIECES pieces (Generals included): a 4-piece set such
+#               as KRvKP (1.3M positions) takes a minute or two, a 5-piece set would be about 100
+#               times larger.
+#                   Each table is written as two files, <material>.dtm (2 bytes per position) and
+#               <material>.wdl (1 byte per position), cut into blocks that are zlib-compressed
+#               separately. Tablebases memory-maps the files and only decompresses the block a
+#               probe falls into (recent blocks are cached), so tables are never loaded whole.
+#                   python -m janggi.tablebase generate KRvK KRvKA ... writes the tables (and the
+#               smaller tables they depend on) to a directory.
+
+import argparse
+import itertools
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from janggi.attacks import is_attacked
+from janggi.mmapfile import MappedFile
+from janggi.movegen import legal_moves
+from janggi.position import (Position, BLUE, RED, NUM_ROWS, NUM_COLS, NUM_SQUARES, GENERAL, GUARD, COLOR_SHIFT,
+                             KIND_MASK, FEN_LETTERS, KIND_BY_FEN_LETTER, make_code)
+from janggi.tables import PALACE_SQUARES
+
+FILE_MAGIC = b'JTB1'
+# magic, material name, bytes per entry, number of entries, entries per block, number of blocks
+_FILE_HEADER = struct.Struct('<4s16sBQII')
+BLOCK_SIZE = 4096
+DEFAULT_DIRECTORY = "tablebases"
+
+# stored DTM values: 0 is a draw, n + 1 a result n plies from checkmate (n odd: the side to move
+# wins, n even: it loses, 0 when it is checkmated), INVALID a placement that can't occur
+DRAW = 0
+INVALID = 0xFFFF
+# stored WDL values
+WDL_DRAW = 0
+WDL_WIN = 1
+WDL_LOSS = 2
+WDL_INVALID = 3
+
+# score of a win in 0 plies, used to compare results: wins are WIN_SCORE - plies, losses
+# plies - WIN_SCORE and draws 0
+WIN_SCORE = 10000
+
+# positions kinds found while generating
+_NORMAL = 0
+_SKIP = 1
+_MATED = 2
+_STALEMATE = 3
+
+# largest material set generate() accepts, Generals included
+MAX_PIECES = 4
+
+# decompressed blocks kept per table
+_CACHED_BLOCKS = 64
+
+
+def dtm_score(value):
+    """helper function converts a stored DTM value to a score for the side to move (see WIN_SCORE)"""
+    if value == DRAW or value == INVALID:
+        return 0
+    plies = value - 1
+    return WIN_SCORE - plies if plies % 2 else plies - WIN_SCORE
+
+
+def parent_score(score):
+    """helper function returns the score of a position for its side to move, from the score of the position a move reaches"""
+    if score > 0:
+        return -score + 1
+    if score < 0:
+        return -score - 1
+    return 0
+
+
+def score_value(score):
+    """helper function converts a score for the side to move back to a stored DTM value"""
+    if score == 0:
+        return DRAW
+    return (WIN_SCORE - score if score > 0 else score + WIN_SCORE) + 1
+
+
+class Material:
+    """Represents a material set (ie "KRvKA") and the indexing of its placements"""
+    def __init__(self, name):
+        """
+        Initializes private data members for:
+            canonical name, (color, kind) of each piece (blue's General, blue's pieces, red's
+            General, red's pieces), squares each piece may stand on, digit of each square per
+            piece, place value of each piece's digit, number of positions
+        :raises ValueError: if the name isn't two sides separated by 'v', each with one General
+        """
+        sides = name.split('v')
+        if len(sides) != 2:
+            raise ValueError(f"invalid material set: {name!r}")
+        self._pieces = []
+        for color, side in zip((BLUE, RED), sides):
+            kinds = []
+            for letter in side:
+                if letter.lower() not in KIND_BY_FEN_LETTER:
+                    raise ValueError(f"invalid piece {letter!r} in material set: {name!r}")
+                kinds.append(KIND_BY_FEN_LETTER[letter.lower()])
+            if kinds.count(GENERAL) != 1:
+                raise ValueError(f"each side needs exactly one General: {name!r}")
+            self._pieces.extend((color, kind) for kind in sorted(kinds))
+        self._name = 'v'.join(''.join(FEN_LETTERS[kind].upper() for color, kind in self._pieces if color == side)
+                              for side in (BLUE, RED))
+        self._domains = [tuple(sorted(PALACE_SQUARES[color])) if kind in (GENERAL, GUARD) else tuple(range(NUM_SQUARES))
+                         for color, kind in self._pieces]
+        self._digits = []
+        for domain in self._domains:
+            digits = [-1] * NUM_SQUARES
+            for digit, square in enumerate(domain):
+                digits[square] = digit
+            self._digits.append(digits)
+        # the side to move is the lowest digit
+        self._place = []
+        place = 2
+        for domain in reversed(self._domains):
+            self._place.append(place)
+            place *= len(domain)
+        self._place.reverse()
+        self._size = place
+
+    def get_name(self):
+        """getter for the canonical name (ie "KRvKA")"""
+        return self._name
+
+    def get_pieces(self):
+        """getter for the (color, kind) of each piece, in index order"""
+        return self._pieces
+
+    def get_domains(self):
+        """getter for the tuple of squares each piece may stand on, in index order"""
+        return self._domains
+
+    def __len__(self):
+        """returns the number of positions (placements times sides to move) in the table"""
+        return self._size
+
+    def piece_count(self):
+        return len(self._pieces)
+
+    def index(self, squares, turn):
+        """
+        returns the table index of a placement given as the square of each piece (in index order)
+        and a side to move, or -1 if a piece stands outside of its domain
+        """
+        index = turn
+        for digits, place, square in zip(self._digits, self._place, squares):
+            digit = digits[square]
+            if digit < 0:
+                return -1
+            index += digit * place
+        return index
+
+    def decode(self, index):
+        """returns (square of each piece, side to move) for a table index"""
+        turn = index % 2
+        squares = []
+        for domain, place in zip(self._domains, self._place):
+            squares.append(domain[(index // place) % len(domain)])
+        return squares, turn
+
+    def without(self, piece):
+        """returns the Material left after the piece at an index is captured"""
+        color, kind = self._pieces[piece]
+        sides = [[k for c, k in self._pieces if c == side] for side in (BLUE, RED)]
+        sides[color].remove(kind)
+        return Material('v'.join(''.join(FEN_LETTERS[k] for k in side) for side in sides))
+
+    def mirrored(self):
+        """returns the Material with the two sides' pieces swapped"""
+        return Material('v'.join(reversed(self._name.split('v'))))
+
+    def __eq__(self, other):
+        return isinstance(other, Material) and self._name == other._name
+
+    def __hash__(self):
+        return hash(self._name)
+
+    def __repr__(self):
+        return 'Material({!r})'.format(self._name)
+
+
+def material_of(position):
+    """returns the Material of a Position and the square of each of its pieces in the Material's index order"""
+    squares = position.get_squares()
+    by_piece = dict()
+    for color in (BLUE, RED):
+        for square in position.pieces(color):
+            by_piece.setdefault((color, squares[square] & KIND_MASK), []).append(square)
+    name = 'v'.join(''.join(FEN_LETTERS[kind] * len(by_piece.get((color, kind), ())) for kind in range(1, len(FEN_LETTERS)))
+                    for color in (BLUE, RED))
+    material = Material(name)
+    groups = {piece: iter(sorted(piece_squares)) for piece, piece_squares in by_piece.items()}
+    return material, [next(groups[piece]) for piece in material.get_pieces()]
+
+
+def mirror_position(position):
+    """returns a new Position flipped top to bottom with the colors and the side to move swapped"""
+    squares = position.get_squares()
+    mirrored = bytearray(NUM_SQUARES)
+    for square, code in enumerate(squares):
+        if code:
+            row, col = divmod(square, NUM_COLS)
+            mirrored[(NUM_ROWS - 1 - row) * NUM_COLS + col] = code ^ (1 << COLOR_SHIFT)
+    return Position(mirrored, position.get_turn() ^ 1)
+
+
+class Table(MappedFile):
+    """Represents one memory-mapped, block-compressed tablebase file (.dtm or .wdl)"""
+    description = "tablebase file"
+
+    def __init__(self, path):
+        """
+        Initializes private data members for:
+            open file and its memory map (see MappedFile), material name, entry width,
+            entries per block, block offsets, cache of decompressed blocks
+        :raises ValueError: if the file isn't a tablebase file
+        """
+        super().__init__(path)
+        if len(self._map) < _FILE_HEADER.size or self._map[:4] != FILE_MAGIC:
+            self.invalid()
+        magic, name, self._width, self._count, self._block_size, blocks = _FILE_HEADER.unpack_from(self._map, 0)
+        self._name = name.rstrip(b'\0').decode()
+        self._offsets = array('Q', self._map[_FILE_HEADER.size:_FILE_HEADER.size + (blocks + 1) * 8])
+        self._cache = dict()
+
+    def get_name(self):
+        """getter for the material name of the table"""
+        return self._name
+
+    def __len__(self):
+        return self._count
+
+    def get(self, index):
+        """returns the stored value of the position at a table index"""
+        block, offset = divmod(index, self._block_size)
+        values = self._cache.get(block)
+        if values is None:
+            data = zlib.decompress(self._map[self._offsets[block]:self._offsets[block + 1]])
+            values = array('H' if self._width == 2 else 'B', data)
+            if len(self._cache) >= _CACHED_BLOCKS:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[block] = values
+        return values[offset]
+
+    def read_all(self):
+        """returns every stored value as an array (used to generate larger tables)"""
+        values = array('H' if self._width == 2 else 'B')
+        for block in range(len(self._offsets) - 1):
+            values.frombytes(zlib.decompress(self._map[self._offsets[block]:self._offsets[block + 1]]))
+        return values
+
+
+def write_table(path, name, values):
+    """helper function writes an array of values ('H' for DTM, 'B' for WDL) as a block-compressed table file"""
+    blocks = [zlib.compress(values[start:start + BLOCK_SIZE].tobytes(), 9) for start in range(0, len(values), BLOCK_SIZE)]
+    offsets = array('Q')
+    offset = _FILE_HEADER.size + (len(blocks) + 1) * 8
+    for block in blocks:
+        offsets.append(offset)
+        offset += len(block)
+    offsets.append(offset)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(_FILE_HEADER.pack(FILE_MAGIC, name.encode(), values.itemsize, len(values), BLOCK_SIZE, len(blocks)))
+        file.write(offsets.tobytes())
+        for block in blocks:
+            file.write(block)
+    os.replace(temporary, path)
+
+
+def _table_path(directory, name, extension):
+    """helper function returns the path of a material's .dtm or .wdl file"""
+    return os.path.join(directory, name + '.' + extension)
+
+
+def _generate_chunk(name, directory, start, stop):
+    """
+    generates the moves of the positions start to stop - 1 of a table (runs in a worker process),
+    returns (kinds, offsets, children, capture wins, capture losses, capture draws):
+        kinds:          _NORMAL, _SKIP (impossible placement), _MATED or _STALEMATE per position
+        offsets, children:  table indexes of the positions each move reaches without a capture
+        capture wins:   shortest win (stored value) reached by a capture, 0 if none
+        capture losses: longest loss (stored value) that every capture leads to, 0 if none
+        capture draws:  1 if a capture leads to a draw
+    """
+    material = Material(name)
+    pieces = material.get_pieces()
+    codes = [make_code(color, kind) for color, kind in pieces]
+    general_pieces = [pieces.index((color, GENERAL)) for color in (BLUE, RED)]
+    smaller = dict()
+    count = stop - start
+    kinds = bytearray(count)
+    offsets = array('I', [0])
+    children = array('I')
+    capture_wins = array('H', bytes(2 * count))
+    capture_losses = array('H', bytes(2 * count))
+    capture_draws = bytearray(count)
+    for offset, index in enumerate(range(start, stop)):
+        placement, turn = material.decode(index)
+        squares = bytearray(NUM_SQUARES)
+        for code, square in zip(codes, placement):
+            if squares[square]:
+                break
+            squares[square] = code
+        else:
+            # the side not to move can't be in check, it would have had to leave its General attacked
+            other_general = placement[general_pieces[turn ^ 1]]
+            if not is_attacked(squares, other_general, turn):
+                position = Position(squares, turn)
+                moves = list(legal_moves(position, turn))
+                if not moves:
+                    kinds[offset] = _MATED
+                elif all(move_start == move_end for move_start, move_end in moves):
+                    kinds[offset] = _STALEMATE
+                else:
+                    best_win = 0
+                    longest_loss = 0
+                    for move_start, move_end in moves:
+                        mover = placement.index(move_start)
+                        child = list(placement)
+                        child[mover] = move_end
+                        if move_start == move_end or not squares[move_end]:
+                            children.append(material.index(child, turn ^ 1))
+                            continue
+                        captured = placement.index(move_end)
+                        if captured not in smaller:
+                            sub_material = material.without(captured)
+                            smaller[captured] = (sub_material, Table(_table_path(directory, sub_material.get_name(), 'dtm')))
+                        sub_material, table = smaller[captured]
+                        del child[captured]
+                        score = parent_score(dtm_score(table.get(sub_material.index(child, turn ^ 1))))
+                        if score > 0:
+                            value = score_value(score)
+                            best_win = value if not best_win else min(best_win, value)
+                        elif score < 0:
+                            longest_loss = max(longest_loss, score_value(score))
+                        else:
+                            capture_draws[offset] = 1
+                    capture_wins[offset] = best_win
+                    capture_losses[offset] = longest_loss
+                offsets.append(len(children))
+                continue
+        kinds[offset] = _SKIP
+        offsets.append(len(children))
+    for sub_material, table in smaller.values():
+        table.close()
+    return kinds, offsets, children, capture_wins, capture_losses, capture_draws
+
+
+def generate(name, directory=DEFAULT_DIRECTORY, workers=None, log=None):
+    """
+    Generates the tables of a material set, and first the tables of every smaller material
+    set its captures lead to, skipping tables whose files already exist.
+    :param workers: number of processes generating moves (default: one per CPU), the backward
+                    pass always runs in this process
+    :param log: optional function called with a progress message
+    :return: the Material generated
+    :raises ValueError: if the material set has more than MAX_PIECES pieces
+    """
+    material = Material(name)
+    name = material.get_name()
+    if material.piece_count() > MAX_PIECES:
+        raise ValueError(f"material sets of more than {MAX_PIECES} pieces aren't supported: {name!r}")
+    if os.path.exists(_table_path(directory, name, 'dtm')) and os.path.exists(_table_path(directory, name, 'wdl')):
+        return material
+    os.makedirs(directory, exist_ok=True)
+    for piece, (color, kind) in enumerate(material.get_pieces()):
+        if kind != GENERAL:
+            generate(material.without(piece).get_name(), directory, workers, log)
+
+    started = time.perf_counter()
+    size = len(material)
+    workers = workers or os.cpu_count() or 1
+    chunk = max(BLOCK_SIZE, math.ceil(size / (workers * 8) / 2) * 2)
+    ranges = [(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+    kinds = bytearray()
+    offsets = array('I', [0])
+    children = array('I')
+    capture_wins = array('H')
+    capture_losses = array('H')
+    capture_draws = bytearray()
+    if workers == 1:
+        results = (_generate_chunk(name, directory, start, stop) for start, stop in ranges)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_generate_chunk, itertools.repeat(name), itertools.repeat(directory),
+                               [start for start, stop in ranges], [stop for start, stop in ranges])
+    try:
+        for part_kinds, part_offsets, part_children, part_wins, part_losses, part_draws in results:
+            base = len(children)
+            kinds.extend(part_kinds)
+            offsets.extend(base + offset for offset in part_offsets[1:])
+            children.extend(part_children)
+            capture_wins.extend(part_wins)
+            capture_losses.extend(part_losses)
+            capture_draws.extend(part_draws)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    values = _retrograde(kinds, offsets, children, capture_wins, capture_losses, capture_draws)
+    wdl = bytearray(size)
+    for index, value in enumerate(values):
+        if value == INVALID:
+            wdl[index] = WDL_INVALID
+        elif value != DRAW:
+            wdl[index] = WDL_WIN if (value - 1) % 2 else WDL_LOSS
+    write_table(_table_path(directory, name, 'dtm'), name, values)
+    write_table(_table_path(directory, name, 'wdl'), name, array('B', wdl))
+    if log is not None:
+        log('{}: {} positions, {} won, {} lost in {:.1f}s'.format(
+            name, size, wdl.count(WDL_WIN), wdl.count(WDL_LOSS), time.perf_counter() - started))
+    return material
+
+
+def _retrograde(kinds, offsets, children, capture_wins, capture_losses, capture_draws):
+    """
+    helper function propagates the results backwards from the checkmates, shortest mates first,
+    and returns the stored DTM value of every position
+    """
+    size = len(kinds)
+    # reverse the move graph: the positions each position is reached from
+    parent_offsets = array('I', bytes(4 * (size + 1)))
+    for child in children:
+        parent_offsets[child + 1] += 1
+    for index in range(size):
+        parent_offsets[index + 1] += parent_offsets[index]
+    fill = array('I', parent_offsets)
+    parents = array('I', bytes(4 * len(children)))
+    for index in range(size):
+        for child in children[offsets[index]:offsets[index + 1]]:
+            parents[fill[child]] = index
+            fill[child] += 1
+    del fill
+
+    values = array('H', bytes(2 * size))
+    # moves not yet known to lose, and the longest loss among the known ones
+    remaining = array('I', bytes(4 * size))
+    # the longest loss (stored value of the position reached) among the moves known to lose
+    longest = array('H', (max(value - 1, 0) for value in capture_losses))
+    # buckets[value] holds the positions whose result may be value, in order of value
+    buckets = [[]]
+
+    def push(index, value):
+        while len(buckets) <= value:
+            buckets.append([])
+        buckets[value].append(index)
+
+    for index in range(size):
+        kind = kinds[index]
+        if kind == _SKIP:
+            values[index] = INVALID
+        elif kind == _MATED:
+            push(index, 1)
+        elif kind == _NORMAL:
+            if capture_wins[index]:
+                # a winning capture: never a loss, but maybe a faster win without capturing
+                push(index, capture_wins[index])
+                continue
+            remaining[index] = offsets[index + 1] - offsets[index] + capture_draws[index]
+            if not remaining[index]:
+                # every move is a capture that loses
+                push(index, longest[index] + 1)
+
+    resolved = bytearray(size)
+    value = 0
+    while value < len(buckets):
+        for index in buckets[value]:
+            if resolved[index]:
+                continue
+            resolved[index] = 1
+            values[index] = value
+            if value % 2 == 0:
+                # the side to move wins here, so moving here loses: one more ply to the loss
+                for parent in parents[parent_offsets[index]:parent_offsets[index + 1]]:
+                    if not resolved[parent] and remaining[parent]:
+                        remaining[parent] -= 1
+                        if value > longest[parent]:
+                            longest[parent] = value
+                        if not remaining[parent]:
+                            push(parent, longest[parent] + 1)
+            else:
+                # the side to move loses here, so moving here wins
+                for parent in parents[parent_offsets[index]:parent_offsets[index + 1]]:
+                    if not resolved[parent]:
+                        push(parent, value + 1)
+        buckets[value] = None
+        value += 1
+    return values
+
+
+class Tablebases:
+    """Represents the tablebase files of a directory, probed by Position"""
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        """
+        Initializes private data members for:
+            directory, open DTM and WDL tables by material name, largest piece count
+        """
+        self._directory = directory
+        self._dtm = dict()
+        self._wdl = dict()
+        self._max_pieces = 0
+        if os.path.isdir(directory):
+            for file_name in sorted(os.listdir(directory)):
+                name, extension = os.path.splitext(file_name)
+                if extension in ('.dtm', '.wdl'):
+                    tables = self._dtm if extension == '.dtm' else self._wdl
+                    tables[name] = Table(os.path.join(directory, file_name))
+                    self._max_pieces = max(self._max_pieces, Material(name).piece_count())
+
+    def get_directory(self):
+        """getter for the directory the tables were read from"""
+        return self._directory
+
+    def get_max_pieces(self):
+        """getter for the largest number of pieces (Generals included) of any table, 0 if there are none"""
+        return self._max_pieces
+
+    def get_materials(self):
+        """returns the names of the material sets that have a DTM table"""
+        return sorted(self._dtm)
+
+    def _value(self, tables, position):
+        """helper function returns the stored value of a Position in one of the table dicts, or None"""
+        if len(position.pieces(BLUE)) + len(position.pieces(RED)) > self._max_pieces:
+            return None
+        material, placement = material_of(position)
+        table = tables.get(material.get_name())
+        if table is None:
+            if material.mirrored().get_name() not in tables:
+                return None
+            return self._value(tables, mirror_position(position))
+        index = material.index(placement, position.get_turn())
+        if index < 0:
+            # a General or a Guard out of its palace, which the tables don't cover
+            return None
+        return table.get(index)
+
+    def probe_dtm(self, position):
+        """
+        Looks up a Position's distance to mate.
+        :return: plies to checkmate with best play, positive if the side to move wins and
+                 negative if it loses, 0 for a draw (or a side to move already checkmated, see
+                 probe_wdl), or None if there is no table for its material
+        """
+        score = self.probe_score(position)
+        if score is None:
+            return None
+        return 0 if score == 0 else (WIN_SCORE - score if score > 0 else -(score + WIN_SCORE))
+
+    def probe_score(self, position):
+        """
+        Looks up a Position's result as a score for the side to move: WIN_SCORE - n for a win in
+        n plies, n - WIN_SCORE for a loss in n plies, 0 for a draw, or None if there is no table
+        """
+        value = self._value(self._dtm, position)
+        if value is None or value == INVALID:
+            return None
+        return dtm_score(value)
+
+    def probe_wdl(self, position):
+        """
+        Looks up a Position's result for the side to move from the smaller WDL table.
+        :return: 1 for a win, 0 for a draw, -1 for a loss, or None if there is no table for its material
+        """
+        value = self._value(self._wdl, position)
+        if value is None or value == WDL_INVALID:
+            return None
+        return {WDL_WIN: 1, WDL_DRAW: 0, WDL_LOSS: -1}[value]
+
+    def best_move(self, position):
+        """
+        returns a move with the best result for the side to move (the fastest win, a draw, or the
+        slowest loss) and its score, or (None, None) if the position or a position one of its
+        moves leads to has no table
+        """
+        if self.probe_score(position) is None:
+            return None, None
+        position = position.copy()
+        best = None
+        best_score = None
+        for move in list(legal_moves(position, position.get_turn())):
+            position.make(*move)
+            score = self.probe_score(position)
+            position.unmake()
+            if score is None:
+                return None, None
+            score = parent_score(score)
+            if best_score is None or score > best_score:
+                best, best_score = move, score
+        return best, best_score
+
+    def close(self):
+        """closes every table"""
+        for table in list(self._dtm.values()) + list(self._wdl.values()):
+            table.close()
+        self._dtm.clear()
+        self._wdl.clear()
+        self._max_pieces = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return 'Tablebases({!r}, {})'.format(self._directory, ', '.join(self.get_materials()))
+
+
+def main(argv=None):
+    """command line to generate tables or probe a position, returns the exit status"""
+    parser = argparse.ArgumentParser(prog='python -m janggi.tablebase', description='Janggi endgame tablebases')
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate_parser = commands.add_parser('generate', help='generate the tables of material sets (ie KRvKA)')
+    generate_parser.add_argument('materials', nargs='+',
+                                 help='material sets of up to {} pieces, blue then red, ie KRvK KCvKA'.format(MAX_PIECES))
+    generate_parser.add_argument('--dir', default=DEFAULT_DIRECTORY, help='directory of the tables (default %(default)s)')
+    generate_parser.add_argument('--workers', '-w', type=int, help='processes to generate moves with (default: one per CPU)')
+    probe_parser = commands.add_parser('probe', help='look up a position')
+    probe_parser.add_argument('fen', help='FEN-style position')
+    probe_parser.add_argument('--dir', default=DEFAULT_DIRECTORY, help='directory of the tables (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        for name in args.materials:
+            generate(name, args.dir, args.workers, log=print)
+        return 0
+
+    position = Position.from_fen(args.fen)
+    with Tablebases(args.dir) as tablebases:
+        move, score = tablebases.best_move(position)
+        print('dtm {} wdl {} best move {}'.format(tablebases.probe_dtm(position), tablebases.probe_wdl(position), move))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# Description:  Static move tables for the Janggi engine, built once at import.
+#                   Every table is indexed by flat square index (row * 9 + col) and holds
+#               tuples of square indexes, so move generation is a table walk plus occupancy
+#               checks on a Position's bytearray: no direction strings, bounds checks or
+#               fortress list membership tests are needed at run time.
+
+from janggi.position import NUM_ROWS, NUM_COLS, NUM_SQUARES, BLUE, RED
+
+# (row, col) coordinate of every square, for converting results back to numeric tuples
+SQUARE_COORDS = tuple(divmod(square, NUM_COLS) for square in range(NUM_SQUARES))
+
+# orthogonal directions in the order the Piece classes have always listed them
+RIGHT, LEFT, DOWN, UP = 0, 1, 2, 3
+DIRECTION_INDEX = {'right': RIGHT, 'left': LEFT, 'down': DOWN, 'up': UP}
+_ORTHOGONAL_STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# fortress (palace) centers as (row, col), red at the top of the board and blue at the bottom
+_PALACE_CENTERS = ((1, 4), (8, 4))
+
+
+def _on_board(row, col):
+    """helper function returns True if (row, col) is on the game board"""
+    return 0 <= row < NUM_ROWS and 0 <= col < NUM_COLS
+
+
+def _square(row, col):
+    """helper function converts (row, col) to a flat square index"""
+    return row * NUM_COLS + col
+
+
+def _palace_center(row, col):
+    """helper function returns the center of the palace containing (row, col), or None"""
+    for center_row, center_col in _PALACE_CENTERS:
+        if abs(row - center_row) <= 1 and abs(col - center_col) <= 1:
+            return center_row, center_col
+    return None
+
+
+def _palace_diagonal_neighbors(row, col):
+    """
+    helper function returns the squares reachable in one diagonal step along the
+    palace lines from (row, col): a corner connects to the center, the center to every corner
+    """
+    center = _palace_center(row, col)
+    if center is None:
+        return []
+    center_row, center_col = center
+    if (row, col) == center:
+        return [(row + dr, col + dc) for dr, dc in ((1, 1), (1, -1), (-1, 1), (-1, -1))]
+    if abs(row - center_row) == 1 and abs(col - center_col) == 1:
+        return [center]
+    return []
+
+
+def _build_palace(center):
+    """
+    (squares, corners, center square) of the palace around center: immutable frozensets
+    of square indexes, and the center's square index
+    """
+    center_row, center_col = center
+    squares = frozenset(_square(center_row + dr, center_col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+    corners = frozenset(_square(center_row + dr, center_col + dc) for dr in (-1, 1) for dc in (-1, 1))
+    return squares, corners, _square(center_row, center_col)
+
+
+def _build_orthogonal_rays():
+    """rays of squares in each orthogonal direction (right, left, down, up) for every square"""
+    rays = []
+    for row, col in SQUARE_COORDS:
+        square_rays = []
+        for dr, dc in _ORTHOGONAL_STEPS:
+            ray = []
+            r, c = row + dr, col + dc
+            while _on_board(r, c):
+                ray.append(_square(r, c))
+                r, c = r + dr, c + dc
+            square_rays.append(tuple(ray))
+        rays.append(tuple(square_rays))
+    return tuple(rays)
+
+
+def _build_palace_rays():
+    """
+    rays along the palace diagonals for every square: from a corner a single ray of the
+    center then the opposite corner, from the center one single-square ray per corner
+    """
+    rays = []
+    for row, col in SQUARE_COORDS:
+        square_rays = []
+        for n_row, n_col in _palace_diagonal_neighbors(row, col):
+            ray = [_square(n_row, n_col)]
+            beyond = (2 * n_row - row, 2 * n_col - col)
+            if _palace_center(row, col) == (n_row, n_col):
+                ray.append(_square(*beyond))
+            square_rays.append(tuple(ray))
+        rays.append(tuple(square_rays))
+    return tuple(rays)
+
+
+def _build_horse_moves():
+    """(leg, target) pairs for a Horse on every square: one orthogonal step then one diagonal step"""
+    moves = []
+    for row, col in SQUARE_COORDS:
+        square_moves = []
+        for dr, dc in ((-1, 0), (1, 0), (0, 1), (0, -1)):   # up, down, right, left
+            leg = (row + dr, col + dc)
+            if not _on_board(*leg):
+                continue
+            if dr:
+                targets = [(leg[0] + dr, leg[1] + 1), (leg[0] + dr, leg[1] - 1)]
+            else:
+                targets = [(leg[0] + 1, leg[1] + dc), (leg[0] - 1, leg[1] + dc)]
+            for target in targets:
+                if _on_board(*target):
+                    square_moves.append((_square(*leg), _square(*target)))
+        moves.append(tuple(square_moves))
+    return tuple(moves)
+
+
+def _build_elephant_moves():
+    """
+    (first leg, second leg, target) triples for an Elephant on every square:
+    one orthogonal step then two diagonal steps outward
+    """
+    moves = []
+    for row, col in SQUARE_COORDS:
+        square_moves = []
+        for dr, dc in ((-1, 0), (1, 0), (0, 1), (0, -1)):   # up, down, right, left
+            leg1 = (row + dr, col + dc)
+            if not _on_board(*leg1):
+                continue
+            if dr:
+                diagonals = ((dr, -1), (dr, 1))
+            else:
+                diagonals = ((-1, dc), (1, dc))
+            for ddr, ddc in diagonals:
+                leg2 = (leg1[0] + ddr, leg1[1] + ddc)
+                target = (leg2[0] + ddr, leg2[1] + ddc)
+                if _on_board(*leg2) and _on_board(*target):
+                    square_moves.append((_square(*leg1), _square(*leg2), _square(*target)))
+        moves.append(tuple(square_moves))
+    return tuple(moves)
+
+
+def _build_palace_steps():
+    """
+    one-step moves for a General or Guard on every square: orthogonal steps that stay in the
+    palace, then diagonal steps along the palace lines. Empty outside of a palace.
+    """
+    steps = []
+    for row, col in SQUARE_COORDS:
+        center = _palace_center(row, col)
+        square_steps = []
+        if center is not None:
+            for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):    # down, up, right, left
+                if _palace_center(row + dr, col + dc) == center:
+                    square_steps.append(_square(row + dr, col + dc))
+            for n_row, n_col in _palace_diagonal_neighbors(row, col):
+                square_steps.append(_square(n_row, n_col))
+        steps.append(tuple(square_steps))
+    return tuple(steps)
+
+
+def _build_soldier_steps(forward):
+    """
+    one-step moves for a Soldier on every square: forward, left, right, then
+    forward diagonal steps along the palace lines
+    """
+    steps = []
+    for row, col in SQUARE_COORDS:
+        square_steps = []
+        for dr, dc in ((forward, 0), (0, -1), (0, 1)):
+            if _on_board(row + dr, col + dc):
+                square_steps.append(_square(row + dr, col + dc))
+        for n_row, n_col in _palace_diagonal_neighbors(row, col):
+            if n_row == row + forward:
+                square_steps.append(_square(n_row, n_col))
+        steps.append(tuple(square_steps))
+    return tuple(steps)
+
+
+# each color's palace (fortress): its squares and corners as frozensets of square indexes,
+# its squares as a bitmask, and its center square. Built once, never modified.
+_palaces = [None, None]
+_palaces[BLUE] = _build_palace(_PALACE_CENTERS[1])
+_palaces[RED] = _build_palace(_PALACE_CENTERS[0])
+PALACE_SQUARES = tuple(palace[0] for palace in _palaces)
+PALACE_CORNERS = tuple(palace[1] for palace in _palaces)
+PALACE_CENTER = tuple(palace[2] for palace in _palaces)
+PALACE_MASKS = tuple(sum(1 << square for square in squares) for squares in PALACE_SQUARES)
+del _palaces
+
+ORTHOGONAL_RAYS = _build_orthogonal_rays()
+PALACE_RAYS = _build_palace_rays()
+# every ray a Chariot or Cannon can slide along: orthogonal rays first, then palace diagonals
+SLIDING_RAYS = tuple(ORTHOGONAL_RAYS[square] + PALACE_RAYS[square] for square in range(NUM_SQUARES))
+HORSE_MOVES = _build_horse_moves()
+ELEPHANT_MOVES = _build_elephant_moves()
+PALACE_STEPS = _build_palace_steps()
+# blue soldiers move up the board (towards row 0), red soldiers move down
+SOLDIER_STEPS = [None, None]
+SOLDIER_STEPS[BLUE] = _build_soldier_steps(-1)
+SOLDIER_STEPS[RED] = _build_soldier_steps(1)
+SOLDIER_STEPS = tuple(SOLDIER_STEPS)
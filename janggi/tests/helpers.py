@@ -0,0 +1,20 @@
+# Description:  Helpers shared by the unit tests.
+
+import io
+
+from janggi.record import RecordWriter, read_records
+from janggi.utils import algebraic_to_square
+
+
+def square_move(start, end):
+    """helper function returns an algebraic move (ie 'c7', 'c6') as (start, end) square indexes"""
+    return algebraic_to_square(start), algebraic_to_square(end)
+
+
+def make_records(games):
+    """helper function writes (moves, result) games to an in-memory record file and reads them back"""
+    out = io.BytesIO()
+    writer = RecordWriter(out)
+    for moves, result in games:
+        writer.write(moves, result)
+    return list(read_records(io.BytesIO(out.getvalue())))
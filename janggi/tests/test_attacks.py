@@ -0,0 +1,66 @@
+import unittest
+
+from janggi.attacks import AttackMap, is_attacked
+from janggi.game import Game
+from janggi.position import Position, BLUE, RED, code_from_name
+
+
+def square(row, col):
+    return row * 9 + col
+
+
+class TestIsAttacked(unittest.TestCase):
+    def setUp(self):
+        self.position = Position()
+        self.position.put(square(1, 4), code_from_name("rGn"))
+        self.position.put(square(8, 4), code_from_name("bGn"))
+
+    def test_chariot_blocked(self):
+        self.position.put(square(5, 4), code_from_name("bCh"))
+        self.assertTrue(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+        self.position.put(square(3, 4), code_from_name("rSd"))
+        self.assertFalse(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+
+    def test_cannon_needs_non_cannon_screen(self):
+        self.position.put(square(5, 4), code_from_name("bCn"))
+        self.assertFalse(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+        self.position.put(square(3, 4), code_from_name("rSd"))
+        self.assertTrue(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+        self.position.put(square(3, 4), code_from_name("rCn"))
+        self.assertFalse(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+
+    def test_horse_leg(self):
+        self.position.put(square(3, 5), code_from_name("bHs"))     # leg at (2, 5)
+        self.assertTrue(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+        self.position.put(square(2, 5), code_from_name("rGd"))
+        self.assertFalse(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+
+    def test_soldier_palace_diagonal(self):
+        self.position.put(square(2, 3), code_from_name("bSd"))
+        self.assertTrue(is_attacked(self.position.get_squares(), square(1, 4), BLUE))
+        # red soldiers move down the board, so the same square doesn't attack upwards
+        self.assertFalse(is_attacked(self.position.get_squares(), square(8, 4), RED))
+
+
+class TestAttackMap(unittest.TestCase):
+    def test_incremental_update_matches_rebuild(self):
+        position = Position.starting()
+        attack_map = AttackMap(position)
+        for start, end in ((square(9, 0), square(7, 0)), (square(2, 1), square(2, 4)), (square(7, 0), square(3, 0))):
+            position.move(start, end)
+            attack_map.update((start, end))
+            fresh = AttackMap(position)
+            self.assertEqual(fresh.attacked(BLUE), attack_map.attacked(BLUE))
+            self.assertEqual(fresh.attacked(RED), attack_map.attacked(RED))
+
+    def test_board_check_with_attack_map(self):
+        game = Game()
+        game.get_board().enable_attack_map()
+        game.make_move("e9", "e9")
+        game.make_move("e4", "e5")
+        game.make_move("e9", "e9")
+        game.make_move("e5", "e6")
+        game.make_move("e9", "e9")
+        game.make_move("e6", "e7")
+        self.assertFalse(game.make_move("e9", "e8"))
+        self.assertFalse(game.is_in_check("b"))
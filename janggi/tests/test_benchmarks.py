@@ -0,0 +1,56 @@
+import sys
+import unittest
+
+from janggi.benchmarks.harness import Benchmark, collect, compare
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_call_repeats_fast_functions(self):
+        calls = []
+        benchmark = Benchmark('fast', rounds=3, min_round_time=0.001)
+        self.assertEqual(2, benchmark(lambda x: calls.append(x) or x + 1, 1))
+        stats = benchmark.stats()
+        self.assertEqual(3, stats['rounds'])
+        self.assertGreater(stats['loops'], 1)
+        self.assertGreaterEqual(len(calls), stats['loops'] * 3)
+        self.assertLessEqual(stats['min'], stats['mean'])
+
+    def test_pedantic_runs_setup_untimed(self):
+        benchmark = Benchmark('slow', rounds=4)
+        received = []
+        benchmark.pedantic(received.append, setup=lambda: (len(received),))
+        self.assertEqual([0, 1, 2, 3], received)
+        self.assertEqual(1, benchmark.stats()['loops'])
+        self.assertEqual(2, len(benchmark.pedantic(lambda: 'ab', rounds=2)))
+        self.assertEqual(2, benchmark.stats()['rounds'])
+
+    def test_collect(self):
+        names = [name for name, func in collect('bench_board.')]
+        self.assertIn('bench_board.bench_board_construction', names)
+        self.assertTrue(all(name.startswith('bench_board.') for name in names))
+
+    def test_collect_only_imports_selected_modules(self):
+        sys.modules.pop('janggi.benchmarks.bench_gui', None)
+        names = [name for name, func in collect('search_depth')]
+        self.assertEqual(['bench_game.bench_search_depth_2', 'bench_game.bench_search_depth_3',
+                          'bench_game.bench_search_depth_4'], names)
+        self.assertNotIn('janggi.benchmarks.bench_gui', sys.modules)
+
+    def test_collect_search_pool_scaling(self):
+        names = [name for name, func in collect('bench_parallel.')]
+        self.assertEqual(['bench_parallel.bench_search_pool_workers_{}'.format(workers) for workers in (1, 2, 4, 8)],
+                         names)
+
+    def test_compare(self):
+        baseline = {'benchmarks': [{'name': 'a', 'min': 1.0}, {'name': 'b', 'min': 2.0}]}
+        document = {'benchmarks': [{'name': 'a', 'min': 1.2}, {'name': 'b', 'min': 3.0}, {'name': 'c', 'min': 1.0}]}
+        rows = compare(document, baseline, threshold=0.25)
+        self.assertEqual(('a', 1.2, 1.0), rows[0][:3])
+        self.assertAlmostEqual(0.2, rows[0][3])
+        self.assertFalse(rows[0][4])
+        self.assertTrue(rows[1][4])
+        self.assertEqual(('c', 1.0, None, None, False), rows[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@
 # Date:         2021-03-01
 # Description:  Unit tests for Game, namely all the potential moves and methods.
 
+import subprocess
+import sys
 import unittest
 
 from janggi.board import Board
@@ -13,7 +15,7 @@ from janggi.piece import Soldier
 class TestBoard(unittest.TestCase):
     def test_get_square_contents(self):
         board = Board()
-        self.assertEqual(board._grid[0][0], board.get_contents_algebraic("a1"))
+        self.assertEqual(board._pieces[0], board.get_contents_algebraic("a1"))
 
     def test_set_square_contents(self):
         board = Board()
@@ -21,3 +23,43 @@ class TestBoard(unittest.TestCase):
         new_sold = Soldier(board, "r")
         board.set_square_contents("d9", new_sold)
         self.assertEqual(new_sold, board.get_contents_algebraic("d9"))
+
+    def test_make_unmake_restores_board(self):
+        board = Board()
+        key = board.get_position().key()
+        chariot = board.get_contents_algebraic("a10")
+        soldier = board.get_contents_algebraic("a4")
+        # a10 -> a4 is not a legal move, but make() doesn't validate
+        captured = board.make((9 * 9, 3 * 9))
+        self.assertIs(soldier, captured)
+        self.assertIs(chariot, board.get_contents_algebraic("a4"))
+        self.assertEqual("a4", chariot.get_position())
+        self.assertEqual("r", board.get_turn())
+        self.assertEqual((9 * 9, 3 * 9), board.unmake())
+        self.assertEqual(key, board.get_position().key())
+        self.assertIs(soldier, board.get_contents_algebraic("a4"))
+        self.assertEqual("a10", chariot.get_position())
+        self.assertEqual("b", board.get_turn())
+
+    def test_make_pass_updates_turn(self):
+        board = Board()
+        board.make((8 * 9 + 4, 8 * 9 + 4))
+        self.assertEqual("r", board.get_turn())
+        board.unmake()
+        self.assertEqual("b", board.get_turn())
+
+    def test_legal_moves_exclude_check(self):
+        board = Board()
+        board.set_square_contents("e8", Soldier(board, "r"))
+        moves = list(board.legal_moves("b"))
+        # the blue general can't stay put (pass) or move into the soldier's reach
+        self.assertNotIn((8 * 9 + 4, 8 * 9 + 4), moves)
+        self.assertNotIn((8 * 9 + 4, 7 * 9 + 3), moves)
+        self.assertIn((8 * 9 + 4, 7 * 9 + 4), moves)
+        self.assertTrue(board.is_legal((8 * 9 + 4, 7 * 9 + 4)))
+
+    def test_engine_imports_without_pygame(self):
+        # the rules engine must stay usable headless, only the GUI and janggi.sprites need pygame
+        code = "import sys, janggi.game; print('pygame' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual("False", output.strip())
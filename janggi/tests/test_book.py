@@ -0,0 +1,86 @@
+import os
+import random
+import tempfile
+import unittest
+
+from janggi.book import OpeningBook, build
+from janggi.game import Game
+from janggi.position import Position
+from janggi.tests.helpers import make_records, square_move
+
+
+GAMES = [
+    ([('c7', 'c6'), ('c4', 'c5'), ('a7', 'a6')], "BLUE_WON"),
+    ([('c7', 'c6'), ('c4', 'c5')], "BLUE_WON"),
+    ([('c7', 'c6'), ('g4', 'g5')], "REPETITION"),
+    ([('g7', 'g6'), ('g4', 'g5')], "UNFINISHED"),
+    ([('g7', 'g6')], "RED_WON"),
+    ([('a7', 'b7')], "RED_WON"),
+]
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'book.jbk')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_weights(self):
+        # c7-c6: 2 wins + 1 draw, g7-g6: 1 unfinished + 1 loss, c4-c5: 2 losses (left out),
+        # a7-b7 and the moves after c7-c6 / g4-g5 were played only once (left out)
+        self.assertEqual(2, build(self.path, make_records(GAMES)))
+        with OpeningBook(self.path) as book:
+            self.assertEqual(2, len(book))
+            self.assertEqual([(square_move('c7', 'c6'), 5), (square_move('g7', 'g6'), 1)],
+                             book.probe(Position.starting()))
+            position = Position.starting()
+            position.make(*square_move('a7', 'b7'))
+            self.assertEqual([], book.probe(position))
+            self.assertIsNone(book.choose(position))
+
+    def test_min_games_and_max_plies(self):
+        # moves that only lost (a7-b7, c4-c5) are never stored
+        self.assertEqual(5, build(self.path, make_records(GAMES), min_games=1))
+        self.assertEqual(2, build(self.path, make_records(GAMES), max_plies=1, min_games=1))
+
+    def test_binary_search_finds_every_position(self):
+        build(self.path, make_records(GAMES), min_games=1)
+        with OpeningBook(self.path) as book:
+            for line, expected in (([], [('c7', 'c6'), ('g7', 'g6')]),
+                                   ([('c7', 'c6')], [('g4', 'g5')]),
+                                   ([('c7', 'c6'), ('c4', 'c5')], [('a7', 'a6')]),
+                                   ([('g7', 'g6')], [('g4', 'g5')])):
+                position = Position.starting()
+                for move in line:
+                    position.make(*square_move(*move))
+                self.assertEqual([square_move(*move) for move in expected],
+                                 [book_move.move for book_move in book.probe(position)])
+
+    def test_choose_is_weighted_and_legal(self):
+        build(self.path, make_records(GAMES))
+        with OpeningBook(self.path) as book:
+            rng = random.Random(1)
+            picks = [book.choose(Position.starting(), rng=rng) for _ in range(200)]
+            self.assertGreater(picks.count(square_move('c7', 'c6')), picks.count(square_move('g7', 'g6')))
+            self.assertEqual(square_move('g7', 'g6'), book.choose(Position.starting(), [square_move('g7', 'g6')]))
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'JBK1')
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_game_plays_book_move(self):
+        build(self.path, make_records(GAMES))
+        with OpeningBook(self.path) as book:
+            game = Game()
+            game.set_opening_book(book)
+            self.assertIn(game.choose_ai_move(99), [('c7', 'c6'), ('g7', 'g6')])
+            self.assertIsNone(game.get_last_search())       # played without searching
+            self.assertIs(book, game.snapshot().get_opening_book())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import unittest
+
+import pygame
+
+from janggi.gui import AIWorker, AI_MOVE_EVENT
+
+
+class StubGame:
+    """game whose AI fails at the levels in failing, and plays a pass otherwise"""
+    def __init__(self, failing):
+        self.failing = failing
+
+    def snapshot(self, workers=1):
+        return self
+
+    def choose_ai_move(self, level, workers=1, stop=None):
+        if level in self.failing:
+            raise RuntimeError('search failed')
+        return 'e9', 'e9'
+
+
+class TestAIWorker(unittest.TestCase):
+    def setUp(self):
+        # events can only be posted once the display is initialized
+        self.video_driver = os.environ.get('SDL_VIDEODRIVER')
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.display.init()
+        pygame.event.clear()
+
+    def tearDown(self):
+        pygame.display.quit()
+        if self.video_driver is None:
+            del os.environ['SDL_VIDEODRIVER']
+
+    def run_worker(self, game, level):
+        """helper function starts the worker, waits for its thread and returns the AI_MOVE_EVENT it posted"""
+        worker = AIWorker()
+        worker.start(game, level)
+        worker._thread.join()
+        events = pygame.event.get(AI_MOVE_EVENT)
+        self.assertEqual(1, len(events))
+        self.assertTrue(worker.is_busy())
+        self.assertTrue(worker.accept(events[0]))
+        self.assertFalse(worker.is_busy())
+        return events[0]
+
+    def test_move(self):
+        event = self.run_worker(StubGame(failing=()), 50)
+        self.assertEqual(('e9', 'e9'), (event.start, event.end))
+
+    def test_failed_search_plays_random_move(self):
+        with self.assertLogs(level='ERROR'):
+            event = self.run_worker(StubGame(failing=(50,)), 50)
+        self.assertEqual(('e9', 'e9'), (event.start, event.end))
+
+    def test_failure_posts_no_move(self):
+        with self.assertLogs(level='ERROR'):
+            event = self.run_worker(StubGame(failing=(0, 50)), 50)
+        self.assertIsNone(event.start)
+        self.assertIsNone(event.end)
+
+
+if __name__ == '__main__':
+    unittest.main()
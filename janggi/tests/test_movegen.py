@@ -0,0 +1,89 @@
+import unittest
+
+from janggi.movegen import piece_targets, pseudo_moves, legal_moves, is_legal, has_legal_move
+from janggi.position import Position, BLUE, RED, EMPTY, code_from_name
+from janggi.tables import HORSE_MOVES, ELEPHANT_MOVES, PALACE_STEPS, SOLDIER_STEPS, SLIDING_RAYS
+
+
+def square(row, col):
+    return row * 9 + col
+
+
+class TestTables(unittest.TestCase):
+    def test_horse_corner(self):
+        # a horse in the corner has two legs, each with one target on the board
+        self.assertCountEqual([(square(1, 0), square(2, 1)), (square(0, 1), square(1, 2))], HORSE_MOVES[0])
+
+    def test_elephant_center(self):
+        self.assertEqual(8, len(ELEPHANT_MOVES[square(4, 4)]))
+
+    def test_palace_steps(self):
+        self.assertEqual(8, len(PALACE_STEPS[square(8, 4)]))     # center: 4 orthogonal + 4 diagonal
+        self.assertEqual(3, len(PALACE_STEPS[square(9, 3)]))     # corner: 2 orthogonal + center
+        self.assertEqual(3, len(PALACE_STEPS[square(8, 3)]))     # edge: no diagonals
+        self.assertEqual((), PALACE_STEPS[square(4, 4)])         # outside of a palace
+
+    def test_soldier_steps_per_color(self):
+        self.assertEqual((square(5, 4), square(6, 3), square(6, 5)), SOLDIER_STEPS[BLUE][square(6, 4)])
+        self.assertEqual((square(4, 4), square(3, 3), square(3, 5)), SOLDIER_STEPS[RED][square(3, 4)])
+        # blue soldier on a red palace corner can move diagonally to the center
+        self.assertIn(square(1, 4), SOLDIER_STEPS[BLUE][square(2, 3)])
+
+    def test_palace_diagonal_rays(self):
+        # a corner has one diagonal ray through the center to the opposite corner
+        self.assertIn((square(8, 4), square(7, 5)), SLIDING_RAYS[square(9, 3)])
+
+
+class TestMoveGeneration(unittest.TestCase):
+    def test_starting_move_count(self):
+        position = Position.starting()
+        self.assertEqual(31, len(list(pseudo_moves(position, BLUE))))
+        self.assertEqual(31, len(list(pseudo_moves(position, RED))))
+
+    def test_cannon_cannot_jump_cannon(self):
+        position = Position()
+        position.put(square(4, 0), code_from_name("bCn"))
+        position.put(square(4, 3), code_from_name("rCn"))
+        position.put(square(4, 6), code_from_name("rSd"))
+        targets = piece_targets(position.get_squares(), square(4, 0))
+        self.assertNotIn(square(4, 4), targets)
+        self.assertNotIn(square(4, 3), targets)
+
+    def test_chariot_palace_diagonal_blocked_by_center(self):
+        position = Position()
+        position.put(square(0, 3), code_from_name("bCh"))
+        self.assertIn(square(2, 5), piece_targets(position.get_squares(), square(0, 3)))
+        position.put(square(1, 4), code_from_name("bSd"))
+        self.assertNotIn(square(2, 5), piece_targets(position.get_squares(), square(0, 3)))
+        position.put(square(1, 4), EMPTY)
+
+
+class TestLegalMoves(unittest.TestCase):
+    def setUp(self):
+        self.position = Position()
+        self.position.put(square(1, 4), code_from_name("rGn"))
+        self.position.put(square(8, 4), code_from_name("bGn"))
+
+    def test_pinned_piece_stays_on_line(self):
+        self.position.put(square(6, 4), code_from_name("bHs"))
+        self.position.put(square(3, 4), code_from_name("rCh"))
+        moves = list(legal_moves(self.position, BLUE, square(6, 4)))
+        self.assertEqual([], moves)
+
+    def test_moving_into_line_creates_cannon_screen(self):
+        self.position.put(square(3, 4), code_from_name("rCn"))
+        self.position.put(square(6, 3), code_from_name("bSd"))
+        self.assertNotIn((square(6, 3), square(6, 4)), list(legal_moves(self.position, BLUE)))
+        self.assertFalse(is_legal(self.position, (square(6, 3), square(6, 4))))
+
+    def test_in_check_no_pass(self):
+        self.position.put(square(5, 4), code_from_name("rCh"))
+        moves = list(legal_moves(self.position, BLUE))
+        self.assertNotIn((square(8, 4), square(8, 4)), moves)
+        for start, end in moves:
+            self.assertNotEqual(square(8, 4), end)
+        self.assertTrue(has_legal_move(self.position, BLUE))
+
+    def test_starting_legal_moves(self):
+        # 31 piece moves and one pass move
+        self.assertEqual(32, len(list(legal_moves(Position.starting(), BLUE))))
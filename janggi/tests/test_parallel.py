@@ -0,0 +1,74 @@
+import queue
+import threading
+import unittest
+from multiprocessing import shared_memory
+
+from janggi.board import Board
+from janggi.game import Game
+from janggi.parallel import SearchPool, _helper_main
+from janggi.ttable import TranspositionTable, EXACT, table_bytes
+
+
+class TestParallelSearch(unittest.TestCase):
+    def test_shared_buffer(self):
+        buffer = bytearray(table_bytes(1))
+        writer = TranspositionTable(1, buffer=buffer)
+        reader = TranspositionTable(1, buffer=buffer)
+        writer.store(99, 5, 2, EXACT, (3, 4))
+        self.assertEqual((5, 2, EXACT, (3, 4)), reader.probe(99))
+        reader.clear()
+        self.assertIsNone(writer.probe(99))
+        writer.release()
+        reader.release()
+
+    def test_pool_search(self):
+        with SearchPool(2, size_mb=1) as pool:
+            self.assertEqual(2, pool.get_workers())
+            board = Board()
+            first = pool.search(board.get_position(), max_depth=2)
+            self.assertTrue(board.is_legal(first.move))
+            self.assertEqual(2, first.depth)
+            # the second search is answered from the shared table
+            second = pool.search(board.get_position(), max_depth=2)
+            self.assertEqual(first.score, second.score)
+            self.assertLess(second.nodes, first.nodes)
+
+    def test_dead_helper_is_restarted(self):
+        with SearchPool(2, size_mb=1) as pool:
+            board = Board()
+            dead = pool._processes[0]
+            dead.kill()
+            dead.join()
+            # the main process's result is returned instead of waiting forever
+            result = pool.search(board.get_position(), max_depth=2)
+            self.assertTrue(board.is_legal(result.move))
+            self.assertEqual(1, len(pool._processes))
+            self.assertIsNot(dead, pool._processes[0])
+            self.assertTrue(pool._processes[0].is_alive())
+            self.assertEqual(2, pool.search(board.get_position(), max_depth=2).depth)
+
+    def test_failed_helper_search_reports_back(self):
+        memory = shared_memory.SharedMemory(create=True, size=table_bytes(1))
+        try:
+            tasks = queue.Queue()
+            done = queue.Queue()
+            # a task with a malformed position key, then a valid one, then the end
+            tasks.put(((1, 2), 2, 1))
+            tasks.put((Board().get_position().key(), 1, 1))
+            tasks.put(None)
+            with self.assertLogs(level='ERROR'):
+                _helper_main(memory.name, 1, 0, tasks, threading.Event(), done)
+            self.assertEqual(0, done.get_nowait())
+            self.assertGreater(done.get_nowait(), 0)
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def test_ai_workers(self):
+        game = Game()
+        try:
+            game.make_ai_move(20, workers=2)
+            self.assertEqual(2, game.get_search_pool(2).get_workers())
+            self.assertEqual("r", game.get_turn())
+        finally:
+            game.close()
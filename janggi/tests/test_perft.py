@@ -0,0 +1,95 @@
+import contextlib
+import io
+import unittest
+
+from janggi.attacks import is_attacked
+from janggi.bench import REFERENCE_POSITIONS, main
+from janggi.board import Board
+from janggi.movegen import perft, divide, pseudo_moves
+from janggi.position import Position, STARTING_FEN, RED
+
+
+def brute_force_perft(position, depth):
+    """plain perft: every pseudo-legal move is played and kept if its General isn't attacked afterwards"""
+    if depth == 0:
+        return 1
+    color = position.get_turn()
+    nodes = 0
+    for start, end in list(pseudo_moves(position, color)):
+        position.make(start, end)
+        if not is_attacked(position.get_squares(), position.general_square(color), color ^ 1):
+            nodes += brute_force_perft(position, depth - 1)
+        position.unmake()
+    general_square = position.general_square(color)
+    if not is_attacked(position.get_squares(), general_square, color ^ 1):
+        position.make(general_square, general_square)
+        nodes += brute_force_perft(position, depth - 1)
+        position.unmake()
+    return nodes
+
+
+class TestFen(unittest.TestCase):
+    def test_starting_position(self):
+        self.assertEqual(STARTING_FEN, Position.starting().to_fen())
+        self.assertEqual(Position.starting(), Position.from_fen(STARTING_FEN))
+
+    def test_round_trip(self):
+        for name, fen, counts in REFERENCE_POSITIONS:
+            self.assertEqual(fen, Position.from_fen(fen).to_fen())
+
+    def test_side_to_move(self):
+        self.assertEqual(RED, Position.from_fen("4k4/9/9/9/9/9/9/9/9/4K4 r").get_turn())
+        position = Position.from_fen("4k4/9/9/9/9/9/9/9/9/4K4 r")
+        self.assertEqual(Position.from_fen("4k4/9/9/9/9/9/9/9/9/4K4 r").hash(), position.hash())
+        self.assertNotEqual(Position.from_fen("4k4/9/9/9/9/9/9/9/9/4K4 b").hash(), position.hash())
+
+    def test_invalid(self):
+        for fen in ("", "4k4/9/9/9/9/9/9/9/4K4 b", "4k4/9/9/9/9/9/9/9/9/4K5 b",
+                    "4k4/9/9/9/9/9/9/9/9/4X4 b", "4k4/9/9/9/9/9/9/9/9/4K4 x"):
+            with self.assertRaises(ValueError):
+                Position.from_fen(fen)
+
+    def test_board_from_fen(self):
+        board = Board.from_fen("4k4/4a4/9/9/9/9/9/9/3RA4/4K4 r")
+        self.assertEqual('r', board.get_turn())
+        self.assertEqual('bCh', board.get_contents_algebraic('d9').get_name())
+        self.assertEqual("4k4/4a4/9/9/9/9/9/9/3RA4/4K4 r", board.to_fen())
+
+
+class TestPerft(unittest.TestCase):
+    def test_reference_positions(self):
+        for name, fen, counts in REFERENCE_POSITIONS:
+            position = Position.from_fen(fen)
+            for depth in range(1, 4):
+                with self.subTest(name=name, depth=depth):
+                    self.assertEqual(counts[depth - 1], perft(position, depth))
+            self.assertEqual(fen, position.to_fen())
+
+    def test_matches_brute_force(self):
+        for name, fen, counts in REFERENCE_POSITIONS:
+            with self.subTest(name=name):
+                self.assertEqual(brute_force_perft(Position.from_fen(fen), 2), perft(Position.from_fen(fen), 2))
+
+    def test_divide(self):
+        counts = divide(Position.starting(), 2)
+        self.assertEqual(32, len(counts))
+        self.assertEqual(1024, sum(counts.values()))
+
+    def test_board_perft(self):
+        board = Board()
+        self.assertEqual(1024, board.perft(2))
+        counts = board.perft(2, divide_moves=True)
+        self.assertEqual(32, counts[('a7', 'a6')])
+        self.assertEqual(1024, sum(counts.values()))
+        self.assertEqual(STARTING_FEN, board.to_fen())
+
+    def test_bench_command(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(0, main(['perft', '--depth', '2']))
+        self.assertIn('nps', out.getvalue())
+        self.assertNotIn('MISMATCH', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
+import random
 import unittest
 
-from janggi.game import Game
-from janggi.piece import Soldier, Chariot, Horse, Elephant
+from janggi.game import Game, ai_search_budget, AI_MAX_LEVEL, AI_SEARCH_LEVEL
+from janggi.piece import Soldier, Chariot, Horse, Elephant, General, Guard
 
 
 class TestSoldier(unittest.TestCase):
@@ -48,6 +49,18 @@ class TestSoldier(unittest.TestCase):
         self.assertIn(outer_corners[0], b_sold.get_valid_moves())
         self.assertIn(outer_corners[1], b_sold.get_valid_moves())
 
+    def test_red_soldier_diagonal_fortress_center(self):
+        # regression: the baseline rejected this step, because a fortress set shared between
+        # pieces was mutated; red soldiers step diagonally inside the blue fortress too
+        game = Game()
+        self.assertTrue(game.make_move("e9", "e10"))   # bGn out of the fortress center
+        r_sold = Soldier(game.get_board(), "r")
+        game.get_board().set_square_contents("d8", r_sold)
+        r_sold.set_position("d8")
+        self.assertIn((8, 4), r_sold.get_valid_moves())
+        self.assertTrue(game.make_move("d8", "e9"))
+        self.assertIs(r_sold, game.get_board().get_contents_algebraic("e9"))
+
     def test_soldier_capture(self):
         game = Game()
         game.make_move("a7", "a6")     # bSd to A6
@@ -149,6 +162,18 @@ class TestChariot(unittest.TestCase):
 
         self.assertTrue(game.make_move("d3", "f1"))
 
+    def test_fortress_moves_leave_board_untouched(self):
+        game = Game()
+        board = game.get_board()
+        b_char = Chariot(board, "b")
+        board.set_square_contents("d3", b_char)                 # red fortress corner
+        fortress = board.get_blue_fortress()
+        # red fortress moves used to flip the board's shared blue fortress lists in place
+        self.assertIn((1, 4), b_char.fortress_moves())
+        self.assertIs(fortress, board.get_blue_fortress())
+        self.assertIn((8, 4), board.get_blue_fortress())
+        self.assertEqual(frozenset({(8, 4)}), board.get_blue_fortress_center())
+
 
 class TestHorse(unittest.TestCase):
     def test_horse_capture_move(self):
@@ -188,3 +213,59 @@ class TestCannon(unittest.TestCase):
         game.make_move("b7", "a7")
         self.assertTrue(game.make_move("b3", "e3"))    # make sure cannon can jump over same color
         game.get_board().display_board()
+
+
+class TestGameState(unittest.TestCase):
+    def setup_endgame(self, blue_defender):
+        """clears the board, then sets up a blue general on e10 with two defenders and a red chariot on a5"""
+        game = Game()
+        board = game.get_board()
+        for piece_obj in list(board.all_pieces()):
+            board.set_square_contents(piece_obj.get_position(), None)
+        board.set_square_contents("e2", General(board, "r"))
+        board.set_square_contents("a5", Chariot(board, "r"))
+        board.set_square_contents("e10", General(board, "b"))
+        board.set_square_contents("d10", blue_defender(board, "b"))
+        board.set_square_contents("f10", blue_defender(board, "b"))
+        game.set_turn("r")
+        return game
+
+    def test_check_blocked_by_other_piece_is_not_checkmate(self):
+        # the blue general can't move, but a guard can block on e9
+        game = self.setup_endgame(Guard)
+        self.assertTrue(game.make_move("a5", "e5"))
+        self.assertEqual("UNFINISHED", game.get_game_state())
+        self.assertTrue(game.make_move("d10", "e9"))
+
+    def test_checkmate(self):
+        # elephants can't reach the e file
+        game = self.setup_endgame(Elephant)
+        self.assertTrue(game.make_move("a5", "e5"))
+        self.assertEqual("RED_WON", game.get_game_state())
+
+    def test_repetition(self):
+        game = Game()
+        for _ in range(2):
+            self.assertTrue(game.make_move("a10", "a9"))
+            self.assertTrue(game.make_move("a1", "a2"))
+            self.assertTrue(game.make_move("a9", "a10"))
+            self.assertTrue(game.make_move("a2", "a1"))
+        self.assertEqual("REPETITION", game.get_game_state())
+        self.assertFalse(game.make_move("a10", "a9"))
+
+    def test_ai_game_terminates(self):
+        # seeded, so the level 10 AI's random choices replay the same game (a repetition after 189 plies)
+        random.seed(0)
+        game = Game()
+        for _ in range(400):
+            if game.get_game_state() != "UNFINISHED":
+                break
+            start, end = game.make_ai_move(10)
+            self.assertIsNotNone(start)
+        self.assertIn(game.get_game_state(), ("BLUE_WON", "RED_WON", "STALEMATE", "REPETITION"))
+
+    def test_ai_search_budget(self):
+        self.assertEqual((200, 2), ai_search_budget(AI_SEARCH_LEVEL))
+        self.assertEqual((990, 9), ai_search_budget(AI_MAX_LEVEL))
+        # the GUI's 'duel' level searches like the 'impossible' level
+        self.assertEqual(ai_search_budget(AI_MAX_LEVEL), ai_search_budget(1337))
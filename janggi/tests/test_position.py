@@ -0,0 +1,102 @@
+import unittest
+
+from janggi.board import Board
+from janggi.game import Game
+from janggi.position import Position, BLUE, RED, EMPTY, CHARIOT, SOLDIER, code_from_name, code_name
+
+
+class TestPosition(unittest.TestCase):
+    def test_starting_position(self):
+        position = Position.starting()
+        self.assertEqual(16, len(position.pieces(BLUE)))
+        self.assertEqual(16, len(position.pieces(RED)))
+        self.assertEqual("rCh", code_name(position.get(0)))
+        self.assertEqual("bGn", code_name(position.get(8 * 9 + 4)))
+
+    def test_copy_is_independent(self):
+        position = Position.starting()
+        other = position.copy()
+        other.move(6 * 9, 5 * 9)        # a7 -> a6
+        self.assertNotEqual(position, other)
+        self.assertEqual(code_from_name("bSd"), position.get(6 * 9))
+        self.assertEqual(EMPTY, other.get(6 * 9))
+        self.assertIn(5 * 9, other.pieces(BLUE))
+        self.assertNotIn(5 * 9, position.pieces(BLUE))
+
+    def test_move_capture_updates_piece_lists(self):
+        position = Position.starting()
+        captured = position.move(0, 6 * 9)  # red chariot a1 captures blue soldier a7
+        self.assertEqual(code_from_name("bSd"), captured)
+        self.assertEqual(15, len(position.pieces(BLUE)))
+        self.assertIn(6 * 9, position.pieces(RED))
+
+    def test_piece_kind_index(self):
+        position = Position.starting()
+        self.assertEqual(8 * 9 + 4, position.general_square(BLUE))
+        self.assertEqual(1 * 9 + 4, position.general_square(RED))
+        self.assertEqual([0, 8], sorted(position.pieces_of(RED, CHARIOT)))
+        position.make(0, 6 * 9)             # red chariot a1 captures blue soldier a7
+        position.make(8 * 9 + 4, 7 * 9 + 4)  # blue general e9 -> e8
+        self.assertEqual([8, 6 * 9], sorted(position.pieces_of(RED, CHARIOT)))
+        self.assertNotIn(6 * 9, position.pieces_of(BLUE, SOLDIER))
+        self.assertEqual(7 * 9 + 4, position.general_square(BLUE))
+        position.unmake()
+        position.unmake()
+        self.assertEqual(8 * 9 + 4, position.general_square(BLUE))
+        self.assertIn(6 * 9, position.pieces_of(BLUE, SOLDIER))
+        self.assertEqual(5, len(position.pieces_of(BLUE, SOLDIER)))
+        position.put(8 * 9 + 4, EMPTY)
+        self.assertIsNone(position.general_square(BLUE))
+
+    def test_board_piece_indexes(self):
+        board = Board()
+        self.assertEqual("rGn", board.get_general("r").get_name())
+        self.assertEqual("e9", board.get_general("b").get_position())
+        chariots = list(board.pieces_by_type("b", "Ch"))
+        self.assertEqual(["a10", "i10"], sorted(p.get_position() for p in chariots))
+        board.make((8 * 9 + 4, 7 * 9 + 4))
+        self.assertEqual("e8", board.get_general("b").get_position())
+
+    def test_key_and_hash(self):
+        self.assertEqual(91, len(Position.starting().key()))
+        self.assertEqual(hash(Position.starting()), hash(Position.starting()))
+
+    def test_board_mirrors_position(self):
+        game = Game()
+        game.make_move("a7", "a6")
+        position = game.get_board().get_position()
+        self.assertEqual(code_from_name("bSd"), position.get(5 * 9))
+        self.assertEqual(EMPTY, position.get(6 * 9))
+        self.assertEqual(Position.starting().copy().pieces(RED), Board().get_position().pieces(RED))
+
+    def test_zobrist_incremental(self):
+        position = Position.starting()
+        start_hash = position.hash()
+        self.assertEqual(position.compute_hash(), start_hash)
+        position.make(0, 6 * 9)             # capture
+        position.make(8 * 9 + 4, 8 * 9 + 4)  # pass
+        self.assertEqual(position.compute_hash(), position.hash())
+        self.assertNotEqual(start_hash, position.hash())
+        position.unmake()
+        position.unmake()
+        self.assertEqual(start_hash, position.hash())
+
+    def test_zobrist_side_to_move(self):
+        position = Position.starting()
+        blue_hash = position.hash()
+        position.set_turn(RED)
+        self.assertNotEqual(blue_hash, position.hash())
+        self.assertEqual(position.compute_hash(), position.hash())
+
+    def test_board_hash_transposition(self):
+        # the same position reached by two move orders has the same key
+        first = Game()
+        first.make_move("a7", "a6")
+        first.make_move("a4", "a5")
+        first.make_move("c7", "c6")
+        second = Game()
+        second.make_move("c7", "c6")
+        second.make_move("a4", "a5")
+        second.make_move("a7", "a6")
+        self.assertEqual(first.get_board().hash(), second.get_board().hash())
+        self.assertEqual(first.get_board().get_position(), second.get_board().get_position())
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from janggi.game import Game, POSITION_DB_MIN_VISITS, POSITION_DB_SEARCH_MIN_VISITS
+from janggi.position import Position
+from janggi.positiondb import PositionDB, build, pack_position
+from janggi.tests.helpers import make_records, square_move
+
+
+GAMES = [
+    ([('c7', 'c6'), ('c4', 'c5')], "BLUE_WON"),
+    ([('c7', 'c6'), ('c4', 'c5')], "BLUE_WON"),
+    ([('c7', 'c6'), ('g4', 'g5')], "REPETITION"),
+    ([('a7', 'b7')], "RED_WON"),
+]
+
+
+class TestPositionDB(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'positions.jpdb')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_pack_position(self):
+        position = Position.starting()
+        packed = pack_position(position)
+        self.assertEqual(46, len(packed))
+        squares = position.get_squares()
+        self.assertEqual(squares[0] << 4 | squares[1], packed[0])
+        position.set_turn(1)
+        self.assertNotEqual(packed, pack_position(position))
+
+    def test_build_and_lookup(self):
+        self.assertEqual(5, build(self.path, make_records(GAMES)))
+        with PositionDB(self.path) as database:
+            self.assertEqual(5, len(database))
+            start = database.get(Position.starting())
+            self.assertEqual((4, 2, 1, 1), start[:4])          # blue to move: 2 wins, 1 draw, 1 loss
+            self.assertEqual(square_move('c7', 'c6'), start.move)
+            position = Position.starting()
+            position.make(*square_move('c7', 'c6'))
+            after = database.get(position)
+            self.assertEqual((3, 0, 1, 2), after[:4])          # red to move
+            # c4-c5 lost both its games for red, g4-g5 drew its only game
+            self.assertEqual(square_move('g4', 'g5'), after.move)
+            position.make(*square_move('c4', 'c5'))
+            self.assertEqual((2, 2, 0, 0, None), database.get(position))   # blue to move, blue won
+            position.make(*square_move('a7', 'b7'))
+            self.assertIsNone(database.get(position))
+
+    def test_max_plies_and_min_visits(self):
+        self.assertEqual(3, build(self.path, make_records(GAMES), max_plies=1))
+        self.assertEqual(3, build(self.path, make_records(GAMES), min_visits=2))
+
+    def test_unfinished_games_count_visits_only(self):
+        build(self.path, make_records([([('c7', 'c6')], "UNFINISHED")]))
+        with PositionDB(self.path) as database:
+            self.assertEqual((1, 0, 0, 0), database.get(Position.starting())[:4])
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a database file')
+        with self.assertRaises(ValueError):
+            PositionDB(self.path)
+
+    def test_game_consults_database(self):
+        build(self.path, make_records(GAMES))
+        with PositionDB(self.path) as database:
+            game = Game()
+            self.assertIsNone(game.lookup_position())
+            game.set_position_db(database)
+            self.assertEqual(4, game.lookup_position().visits)
+            self.assertGreaterEqual(4, POSITION_DB_MIN_VISITS)
+            self.assertEqual(('c7', 'c6'), game.choose_ai_move(10))
+            self.assertIs(database, game.snapshot().get_position_db())
+            # too few games to replace a search
+            snapshot = game.snapshot()
+            self.assertTrue(game.get_board().is_legal(square_move(*snapshot.choose_ai_move(20))))
+            self.assertIsNotNone(snapshot.get_last_search())
+
+    def test_search_levels_need_more_visits(self):
+        build(self.path, make_records(GAMES[:1] * POSITION_DB_SEARCH_MIN_VISITS))
+        with PositionDB(self.path) as database:
+            game = Game()
+            game.set_position_db(database)
+            self.assertEqual(('c7', 'c6'), game.choose_ai_move(20))
+            self.assertIsNone(game.get_last_search())
+
+
+if __name__ == '__main__':
+    unittest.main()
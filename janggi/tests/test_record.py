@@ -0,0 +1,88 @@
+import io
+import os
+import tempfile
+import unittest
+
+from janggi.game import Game
+from janggi.position import Position
+from janggi.record import (RecordWriter, read_records, record_moves, replay_game, replay_positions, pack_moves,
+                           FILE_MAGIC)
+from janggi.utils import algebraic_to_square
+
+MOVES = [('c7', 'c6'), ('c4', 'c5'), ('c10', 'd8'), ('e2', 'e2')]
+
+
+class TestRecord(unittest.TestCase):
+    def test_two_bytes_per_move(self):
+        self.assertEqual(bytes([algebraic_to_square('c7'), algebraic_to_square('c6')]), pack_moves(MOVES[:1]))
+        out = io.BytesIO()
+        with RecordWriter(out) as writer:
+            writer.write(MOVES)
+        self.assertEqual(len(FILE_MAGIC) + 9 + 2 * len(MOVES), len(out.getvalue()))
+
+    def test_round_trip(self):
+        out = io.BytesIO()
+        writer = RecordWriter(out)
+        writer.write(MOVES, "UNFINISHED", 10, 99, {'seed': 3})
+        writer.write([], "STALEMATE")
+        self.assertEqual(2, writer.get_games())
+        records = list(read_records(io.BytesIO(out.getvalue())))
+        self.assertEqual(2, len(records))
+        first, second = records
+        self.assertEqual([(algebraic_to_square(s), algebraic_to_square(e)) for s, e in MOVES], list(record_moves(first)))
+        self.assertEqual(("UNFINISHED", 10, 99, {'seed': 3}),
+                         (first.result, first.blue_level, first.red_level, first.metadata))
+        self.assertEqual(("STALEMATE", b'', {}), (second.result, second.moves, second.metadata))
+
+    def test_write_game_and_replay(self):
+        game = Game()
+        for start, end in MOVES:
+            self.assertTrue(game.make_move(start, end))
+        out = io.BytesIO()
+        RecordWriter(out).write_game(game)
+        record = next(read_records(io.BytesIO(out.getvalue())))
+        replayed = replay_game(record)
+        self.assertEqual(game.get_board().hash(), replayed.get_board().hash())
+        positions = [position.copy() for position in replay_positions(record)]
+        self.assertEqual(len(MOVES) + 1, len(positions))
+        self.assertEqual(Position.starting(), positions[0])
+        self.assertEqual(game.get_board().get_position(), positions[-1])
+
+    def test_illegal_move_rejected(self):
+        out = io.BytesIO()
+        RecordWriter(out).write([('c7', 'c5')])
+        with self.assertRaises(ValueError):
+            replay_game(next(read_records(io.BytesIO(out.getvalue()))))
+
+    def test_append_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.jgr')
+            with RecordWriter(path) as writer:
+                writer.write(MOVES)
+            with RecordWriter(path, append=True) as writer:
+                writer.write(MOVES[:2], "REPETITION")
+            self.assertEqual([4, 2], [len(record.moves) // 2 for record in read_records(path)])
+            # an existing file in another format is never appended to
+            with open(path, 'wb') as file:
+                file.write(b'JGR0')
+            with self.assertRaises(ValueError):
+                RecordWriter(path, append=True)
+            with open(path, 'rb') as file:
+                self.assertEqual(b'JGR0', file.read())
+
+    def test_invalid_files(self):
+        with self.assertRaises(ValueError):
+            list(read_records(io.BytesIO(b'nope')))
+        out = io.BytesIO()
+        RecordWriter(out).write(MOVES)
+        with self.assertRaises(ValueError):
+            list(read_records(io.BytesIO(out.getvalue()[:-1])))
+        # result codes past RESULTS
+        data = bytearray(out.getvalue())
+        data[len(FILE_MAGIC)] = 0xFF
+        with self.assertRaisesRegex(ValueError, 'bad result code'):
+            list(read_records(io.BytesIO(bytes(data))))
+
+
+if __name__ == '__main__':
+    unittest.main()
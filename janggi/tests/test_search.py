@@ -0,0 +1,103 @@
+import threading
+import unittest
+
+from janggi.board import Board
+from janggi.game import Game
+from janggi.piece import Chariot, Elephant, General, Horse, Soldier
+from janggi.search import search, evaluate, MATE_SCORE
+
+
+def cleared_board(board=None):
+    board = Board() if board is None else board
+    for piece_obj in list(board.all_pieces()):
+        board.set_square_contents(piece_obj.get_position(), None)
+    board.set_square_contents("e2", General(board, "r"))
+    board.set_square_contents("e10", General(board, "b"))
+    return board
+
+
+def boxed_in_board(board=None):
+    # blue's soldier is lost wherever it goes and its General can't move, so passing is best
+    board = cleared_board(board)
+    board.set_square_contents("a5", Soldier(board, "b"))
+    for square in ("b1", "d4", "f1", "i9"):
+        board.set_square_contents(square, Chariot(board, "r"))
+    return board
+
+
+class TestSearch(unittest.TestCase):
+    def test_starting_position_is_even(self):
+        self.assertEqual(0, evaluate(Board().get_position()))
+        result = search(Board(), max_depth=2)
+        self.assertEqual(2, result.depth)
+        self.assertEqual(result.move, result.pv[0])
+        self.assertTrue(Board().is_legal(result.move))
+
+    def test_finds_free_capture(self):
+        board = cleared_board()
+        board.set_square_contents("a10", Chariot(board, "b"))
+        board.set_square_contents("a3", Horse(board, "r"))
+        result = search(board, max_depth=2)
+        self.assertEqual((9 * 9, 2 * 9), result.move)
+
+    def test_finds_mate_in_one(self):
+        board = cleared_board()
+        board.set_square_contents("d10", Elephant(board, "b"))
+        board.set_square_contents("f10", Elephant(board, "b"))
+        board.set_square_contents("a5", Chariot(board, "r"))
+        board.set_turn("r")
+        result = search(board, max_depth=3)
+        self.assertEqual((4 * 9, 4 * 9 + 4), result.move)
+        self.assertEqual(MATE_SCORE - 1, result.score)
+
+    def test_root_moves(self):
+        board = boxed_in_board()
+        self.assertEqual((85, 85), search(board, max_depth=2).move)
+        self.assertIn(search(board, max_depth=2, root_moves=[(36, 27), (36, 37)]).move, [(36, 27), (36, 37)])
+        # unless passing is the only move left
+        self.assertEqual((85, 85), search(board, max_depth=2, root_moves=[(0, 1)]).move)
+        # equal moves are kept in the given order
+        board = cleared_board()
+        self.assertEqual((85, 86), search(board, max_depth=2, root_moves=[(85, 86), (85, 76)]).move)
+        self.assertEqual((85, 76), search(board, max_depth=2, root_moves=[(85, 76), (85, 86)]).move)
+
+        game = Game()
+        boxed_in_board(game.get_board())
+        # search levels don't pass either
+        start, end = game.choose_ai_move(20)
+        self.assertEqual("a5", start)
+        self.assertNotEqual(start, end)
+
+    def test_search_leaves_board_untouched(self):
+        board = Board()
+        key = board.hash()
+        search(board, max_depth=2)
+        self.assertEqual(key, board.hash())
+
+    def test_time_budget(self):
+        result = search(Board(), max_time_ms=50)
+        self.assertIsNotNone(result.move)
+        self.assertGreaterEqual(result.depth, 1)
+
+    def test_ai_search_level(self):
+        game = Game()
+        start, end = game.make_ai_move(20)
+        self.assertEqual("r", game.get_turn())
+        self.assertIsNotNone(game.get_last_search())
+
+    def test_choose_ai_move_on_snapshot(self):
+        game = Game()
+        snapshot = game.snapshot()
+        start, end = snapshot.choose_ai_move(20)
+        # choosing doesn't play the move, and the snapshot is independent of the game
+        self.assertEqual("b", snapshot.get_turn())
+        self.assertTrue(snapshot.make_move(start, end))
+        self.assertEqual("b", game.get_turn())
+        self.assertIsNotNone(game.get_board().get_contents_algebraic(start))
+
+    def test_stop_cuts_search_short(self):
+        stop = threading.Event()
+        stop.set()
+        result = search(Board(), max_time_ms=60000, stop=stop)
+        self.assertIsNotNone(result.move)
+        self.assertLessEqual(result.depth, 1)
@@ -0,0 +1,55 @@
+import io
+import json
+import unittest
+
+from janggi.game import Game
+from janggi.record import RecordWriter, read_records, replay_game
+from janggi.selfplay import play_game, run, MAX_PLIES_OUTCOME
+
+
+class TestSelfPlay(unittest.TestCase):
+    def test_play_game(self):
+        record = play_game(0, 0, 10, max_plies=12, seed=5)
+        self.assertLessEqual(record['plies'], 12)
+        self.assertEqual(record['plies'], len(record['moves']))
+        self.assertEqual(record['plies'], len(record['move_times_ms']))
+        if record['plies'] == 12:
+            self.assertEqual(MAX_PLIES_OUTCOME, record['outcome'])
+
+    def test_moves_replay(self):
+        record = play_game(3, 10, 10, max_plies=30)
+        game = Game()
+        for start, end in record['moves']:
+            self.assertTrue(game.make_move(start, end))
+
+    def test_seed_repeats_game(self):
+        self.assertEqual(play_game(0, 0, 0, max_plies=20, seed=9)['moves'],
+                         play_game(1, 0, 0, max_plies=20, seed=9)['moves'])
+
+    def test_run_writes_jsonl(self):
+        out = io.StringIO()
+        summary = run(3, 10, 10, out, workers=1, max_plies=10)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([0, 1, 2], [record['game'] for record in records])
+        self.assertEqual(3, summary['games'])
+        self.assertEqual(sum(record['plies'] for record in records), summary['plies'])
+        self.assertGreater(summary['games_per_s'], 0)
+
+    def test_run_records_games(self):
+        records = io.BytesIO()
+        run(2, 10, 0, io.StringIO(), workers=1, max_plies=8, recorder=RecordWriter(records))
+        games = list(read_records(io.BytesIO(records.getvalue())))
+        self.assertEqual([{'game': 0, 'seed': 0}, {'game': 1, 'seed': 1}], [game.metadata for game in games])
+        self.assertEqual((10, 0), (games[0].blue_level, games[0].red_level))
+        for game in games:
+            replay_game(game)
+
+    def test_run_in_processes(self):
+        out = io.StringIO()
+        summary = run(2, 10, 10, out, workers=2, max_plies=6)
+        self.assertEqual({0, 1}, {json.loads(line)['game'] for line in out.getvalue().splitlines()})
+        self.assertEqual(2, summary['workers'])
+
+
+if __name__ == '__main__':
+    unittest.main()
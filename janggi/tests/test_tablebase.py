@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+
+from janggi.game import Game
+from janggi.movegen import legal_moves
+from janggi.position import Position, BLUE, RED, CHARIOT, GUARD
+from janggi.tablebase import (Material, Table, Tablebases, generate, material_of, mirror_position, WIN_SCORE,
+                              INVALID)
+from janggi.tests.helpers import square_move
+
+
+# blue mates in one: the chariot drops to the back rank, red's own guard blocks its General
+MATE_IN_ONE = "R8/9/3ka4/9/9/9/9/3K5/9/9 b"
+
+
+class StubTablebase:
+    """tablebase covering every position, always answering with the same move"""
+    def __init__(self, move):
+        self.move = move
+
+    def get_max_pieces(self):
+        return 32
+
+    def best_move(self, position):
+        return self.move, WIN_SCORE - 1
+
+
+class TestMaterial(unittest.TestCase):
+    def test_names(self):
+        self.assertEqual('KRvKA', Material('RKvAK').get_name())
+        self.assertEqual('KAvKR', Material('KRvKA').mirrored().get_name())
+        self.assertEqual('KvKA', Material('KRvKA').without(1).get_name())
+        self.assertEqual([(BLUE, 1), (BLUE, CHARIOT), (RED, 1), (RED, GUARD)], Material('KRvKA').get_pieces())
+        for name in ('KR', 'KRvA', 'KKvK', 'KXvK'):
+            with self.assertRaises(ValueError):
+                Material(name)
+
+    def test_index(self):
+        material = Material('KRvKA')
+        self.assertEqual(9 * 90 * 9 * 9 * 2, len(material))
+        for index in (0, 1, 12345, len(material) - 1):
+            squares, turn = material.decode(index)
+            self.assertEqual(index, material.index(squares, turn))
+        # the red General can't stand in blue's palace
+        self.assertEqual(-1, material.index([76, 0, 76, 4], BLUE))
+
+    def test_material_of(self):
+        position = Position.from_fen(MATE_IN_ONE)
+        material, squares = material_of(position)
+        self.assertEqual('KRvKA', material.get_name())
+        self.assertEqual([66, 0, 21, 22], squares)
+        mirrored = mirror_position(position)
+        self.assertEqual('KAvKR', material_of(mirrored)[0].get_name())
+        self.assertEqual(RED, mirrored.get_turn())
+        self.assertEqual(position, mirror_position(mirrored))
+
+
+class TestTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        generate('KRvKA', cls.directory.name, workers=1)
+        cls.tablebases = Tablebases(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebases.close()
+        cls.directory.cleanup()
+
+    def test_files(self):
+        self.assertEqual(['KRvK', 'KRvKA', 'KvK', 'KvKA'], self.tablebases.get_materials())
+        self.assertEqual(4, self.tablebases.get_max_pieces())
+        table = Table(os.path.join(self.directory.name, 'KRvKA.dtm'))
+        try:
+            self.assertEqual('KRvKA', table.get_name())
+            values = table.read_all()
+            self.assertEqual(len(Material('KRvKA')), len(values))
+            self.assertEqual([values[index] for index in range(0, len(values), 997)],
+                             [table.get(index) for index in range(0, len(values), 997)])
+            # overlapping pieces are invalid
+            self.assertEqual(INVALID, table.get(0))
+        finally:
+            table.close()
+
+    def test_too_many_pieces(self):
+        with self.assertRaises(ValueError):
+            generate('KRRvKA', self.directory.name, workers=1)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, 'KRRvKA.dtm')))
+
+    def test_invalid_file(self):
+        path = os.path.join(self.directory.name, 'bad.dtm')
+        for data in (b'', b'JTB0' + bytes(40)):
+            with open(path, 'wb') as file:
+                file.write(data)
+            with self.assertRaises(ValueError):
+                Table(path)
+        os.remove(path)
+
+    def test_mate(self):
+        position = Position.from_fen(MATE_IN_ONE)
+        self.assertEqual(1, self.tablebases.probe_dtm(position))
+        self.assertEqual(1, self.tablebases.probe_wdl(position))
+        move, score = self.tablebases.best_move(position)
+        self.assertEqual(square_move('a1', 'd1'), move)
+        self.assertEqual(WIN_SCORE - 1, score)
+        position.make(*move)
+        self.assertEqual([], list(legal_moves(position, RED)))
+        self.assertEqual(-1, self.tablebases.probe_wdl(position))
+        self.assertEqual(-WIN_SCORE, self.tablebases.probe_score(position))
+
+    def test_draw(self):
+        # with red to move the chariot is lost
+        position = Position.from_fen("R8/9/3ka4/9/9/9/9/3K5/9/9 r")
+        self.assertEqual(0, self.tablebases.probe_wdl(position))
+        # the smaller tables are generated too
+        position = Position.from_fen("9/9/3k5/9/9/9/9/3K5/9/9 b")
+        self.assertEqual(0, self.tablebases.probe_dtm(position))
+
+    def test_mirror(self):
+        # KAvKR is only stored as KRvKA
+        position = mirror_position(Position.from_fen(MATE_IN_ONE))
+        self.assertEqual(1, self.tablebases.probe_dtm(position))
+        move, score = self.tablebases.best_move(position)
+        self.assertEqual(square_move('a10', 'd10'), move)
+
+    def test_not_covered(self):
+        self.assertIsNone(self.tablebases.probe_dtm(Position.starting()))
+        self.assertEqual((None, None), self.tablebases.best_move(Position.starting()))
+        # no KCvK table
+        self.assertIsNone(self.tablebases.probe_wdl(Position.from_fen("4k4/9/9/9/9/9/9/9/4C4/4K4 b")))
+
+    def test_empty_directory(self):
+        with Tablebases(os.path.join(self.directory.name, 'missing')) as tablebases:
+            self.assertEqual(0, tablebases.get_max_pieces())
+            self.assertIsNone(tablebases.probe_dtm(Position.from_fen(MATE_IN_ONE)))
+
+
+class TestGameTablebase(unittest.TestCase):
+    def test_ai_plays_tablebase_move(self):
+        game = Game()
+        game.set_tablebase(StubTablebase(square_move('e9', 'e9')))
+        self.assertEqual(('e9', 'e9'), game.choose_ai_move(50))
+        self.assertIs(game.get_tablebase(), game.snapshot().get_tablebase())
+        # illegal or missing moves are ignored
+        game.set_tablebase(StubTablebase(square_move('e9', 'e7')))
+        self.assertNotEqual(('e9', 'e7'), game.choose_ai_move(10))
+        game.set_tablebase(StubTablebase(None))
+        self.assertNotEqual(('e9', 'e9'), game.choose_ai_move(10))
+
+
+if __name__ == '__main__':
+    unittest.main()
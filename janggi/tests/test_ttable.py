@@ -0,0 +1,61 @@
+import unittest
+
+from janggi.board import Board
+from janggi.search import search, score_from_table, score_to_table, MATE_SCORE
+from janggi.ttable import TranspositionTable, EXACT, LOWER, UPPER, pack, unpack
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_pack_unpack(self):
+        for entry in ((0, 0, EXACT, None), (-MATE_SCORE, 64, LOWER, (0, 89)), (1234, 7, UPPER, (45, 45))):
+            score, depth, bound, move = entry
+            self.assertEqual(entry, unpack(pack(score, depth, bound, move, 255)))
+
+    def test_store_and_probe(self):
+        table = TranspositionTable(1)
+        self.assertEqual(1024 * 1024, table.get_size_bytes())
+        self.assertIsNone(table.probe(12345))
+        table.store(12345, -50, 3, UPPER, (1, 2))
+        self.assertEqual((-50, 3, UPPER, (1, 2)), table.probe(12345))
+        # same bucket, different key
+        self.assertIsNone(table.probe(12345 + (1 << 40)))
+        self.assertEqual(1, table.get_hits())
+        self.assertEqual(3, table.get_probes())
+
+    def test_two_tier_replacement(self):
+        table = TranspositionTable(1)
+        deep, shallow, newer = 7, 7 + (1 << 40), 7 + (2 << 40)
+        table.store(deep, 10, 8, EXACT, (1, 2))
+        table.store(shallow, 20, 2, EXACT, (3, 4))
+        table.store(newer, 30, 1, EXACT, (5, 6))
+        # the deep entry stays, the always-replace slot holds the newest entry
+        self.assertEqual(8, table.probe(deep)[1])
+        self.assertIsNone(table.probe(shallow))
+        self.assertEqual(1, table.probe(newer)[1])
+        # entries of an older search give way to the new search
+        table.new_search()
+        table.store(shallow, 20, 2, EXACT, (3, 4))
+        self.assertIsNone(table.probe(deep))
+        self.assertEqual(2, table.probe(shallow)[1])
+
+    def test_memory_stays_flat(self):
+        table = TranspositionTable(1)
+        size = table.get_size_bytes()
+        for key in range(100000):
+            table.store(key * 0x9E3779B97F4A7C15 & ((1 << 64) - 1), key % 1000, key % 10, EXACT, None)
+        self.assertEqual(size, table.get_size_bytes())
+        self.assertEqual(1.0, table.usage())
+
+    def test_mate_scores_relative_to_position(self):
+        self.assertEqual(MATE_SCORE - 5, score_from_table(score_to_table(MATE_SCORE - 5, 3), 3))
+        self.assertEqual(MATE_SCORE - 2, score_to_table(MATE_SCORE - 5, 3))
+        self.assertEqual(-MATE_SCORE + 2, score_to_table(-MATE_SCORE + 5, 3))
+        self.assertEqual(42, score_to_table(42, 3))
+
+    def test_search_with_table(self):
+        table = TranspositionTable(1)
+        plain = search(Board(), max_depth=3)
+        cached = search(Board(), max_depth=3, ttable=table)
+        self.assertEqual(plain.score, cached.score)
+        self.assertLessEqual(cached.nodes, plain.nodes)
+        self.assertGreater(table.get_hits(), 0)
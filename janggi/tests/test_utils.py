@@ -1,6 +1,7 @@
 import unittest
 
-from janggi.utils import algebraic_to_numeric, numeric_to_algebraic
+from janggi.utils import (SQUARE_NAMES, algebraic_to_numeric, numeric_to_algebraic, algebraic_to_square,
+                          square_to_algebraic, numeric_to_square, square_to_numeric)
 
 
 class TestBoard(unittest.TestCase):
@@ -19,3 +20,24 @@ class TestBoard(unittest.TestCase):
         self.assertEqual("a1", numeric_to_algebraic(num1))
         self.assertEqual("e5", numeric_to_algebraic(num2))
         self.assertEqual("d10", numeric_to_algebraic(num3))
+
+    def test_square_lookup_tables(self):
+        self.assertEqual(90, len(SQUARE_NAMES))
+        self.assertEqual(0, algebraic_to_square("a1"))
+        self.assertEqual(9 * 9 + 3, algebraic_to_square("d10"))
+        for square, name in enumerate(SQUARE_NAMES):
+            self.assertEqual(square, algebraic_to_square(square_to_algebraic(square)))
+            self.assertEqual(name, numeric_to_algebraic(square_to_numeric(square)))
+            self.assertEqual(square, numeric_to_square(algebraic_to_numeric(name)))
+
+    def test_invalid_coordinates(self):
+        with self.assertRaises(KeyError):
+            algebraic_to_numeric("j1")
+        with self.assertRaises(KeyError):
+            numeric_to_algebraic((10, 0))
+        for num_coord in ((10, 0), (0, 9), (-1, 0), (0, -1)):
+            with self.assertRaises(KeyError):
+                numeric_to_square(num_coord)
+        for square in (-1, 90):
+            with self.assertRaises(KeyError):
+                square_to_numeric(square)
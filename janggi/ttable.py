@@ -0,0 +1,206 @@
+# Description:  Fixed-size transposition table for the search engine.
+#                   The table is one preallocated array of unsigned 64-bit words, sized in MB when
+#               it is created and never grown, so memory stays flat no matter how many positions
+#               are searched. Entries live in buckets of two slots: the first slot keeps the
+#               deepest result (depth-preferred), the second is always replaced, so recent
+#               shallow results are kept without evicting expensive deep ones.
+#                   Each slot is two words, the Zobrist key XORed with the packed data, and the
+#               packed data itself (score, depth, bound, best move, search generation). A slot
+#               only matches when key ^ data recovers the probed key, so a torn or stale write
+#               reads as a miss instead of a wrong entry, and no locking is needed: several search
+#               processes can share one table placed in shared memory (see janggi.parallel).
+
+from array import array
+
+# bound types: the stored score is exact, a lower bound (fail high) or an upper bound (fail low)
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+DEFAULT_SIZE_MB = 16
+
+_WORD_BYTES = 8
+_WORDS_PER_SLOT = 2
+_SLOTS_PER_BUCKET = 2
+_BUCKET_BYTES = _WORD_BYTES * _WORDS_PER_SLOT * _SLOTS_PER_BUCKET
+
+# packed data layout, low bits first:
+#   score + SCORE_OFFSET: 18 bits, depth: 7 bits, bound: 2 bits,
+#   move start + 1: 7 bits, move end + 1: 7 bits (0 means no move), generation: 8 bits
+_SCORE_OFFSET = 1 << 17
+_SCORE_MASK = (1 << 18) - 1
+_DEPTH_SHIFT = 18
+_DEPTH_MASK = (1 << 7) - 1
+_BOUND_SHIFT = 25
+_BOUND_MASK = 3
+_START_SHIFT = 27
+_END_SHIFT = 34
+_SQUARE_MASK = (1 << 7) - 1
+_GENERATION_SHIFT = 41
+_GENERATION_MASK = (1 << 8) - 1
+
+_KEY_MASK = (1 << 64) - 1
+
+
+def pack(score, depth, bound, move, generation):
+    """helper function packs an entry's fields into a single 64-bit data word"""
+    start, end = (move[0] + 1, move[1] + 1) if move is not None else (0, 0)
+    return ((score + _SCORE_OFFSET) & _SCORE_MASK
+            | (depth & _DEPTH_MASK) << _DEPTH_SHIFT
+            | bound << _BOUND_SHIFT
+            | start << _START_SHIFT
+            | end << _END_SHIFT
+            | (generation & _GENERATION_MASK) << _GENERATION_SHIFT)
+
+
+def unpack(data):
+    """helper function unpacks a data word into (score, depth, bound, move)"""
+    start = (data >> _START_SHIFT) & _SQUARE_MASK
+    end = (data >> _END_SHIFT) & _SQUARE_MASK
+    move = (start - 1, end - 1) if start else None
+    return ((data & _SCORE_MASK) - _SCORE_OFFSET,
+            (data >> _DEPTH_SHIFT) & _DEPTH_MASK,
+            (data >> _BOUND_SHIFT) & _BOUND_MASK,
+            move)
+
+
+def table_bytes(size_mb):
+    """returns the bytes used by a table with a memory budget of size_mb (a power of two number of buckets)"""
+    buckets = 1
+    while buckets * 2 * _BUCKET_BYTES <= size_mb * 1024 * 1024:
+        buckets *= 2
+    return buckets * _BUCKET_BYTES
+
+
+class TranspositionTable:
+    """Represents a fixed-size, two-tier transposition table keyed by Zobrist hash"""
+    def __init__(self, size_mb=DEFAULT_SIZE_MB, buffer=None):
+        """
+        Initializes private data members for:
+            table words, bucket index mask, search generation, probe / hit / store counters
+        :param size_mb: memory budget in MB, rounded down to a power of two number of buckets
+        :param buffer: optional zero-filled writable buffer of at least table_bytes(size_mb) bytes
+                       (ie a multiprocessing.shared_memory.SharedMemory's buf) to hold the entries
+                       instead of a private array
+        """
+        size_bytes = table_bytes(size_mb)
+        self._mask = size_bytes // _BUCKET_BYTES - 1
+        if buffer is None:
+            self._table = array('Q', bytes(size_bytes))
+        else:
+            self._table = memoryview(buffer)[:size_bytes].cast('Q')
+        self._generation = 0
+        self._probes = 0
+        self._hits = 0
+        self._stores = 0
+
+    def get_size_bytes(self):
+        """getter for the memory used by the table's entries"""
+        return len(self._table) * _WORD_BYTES
+
+    def get_capacity(self):
+        """getter for the number of entries (slots) the table holds"""
+        return (self._mask + 1) * _SLOTS_PER_BUCKET
+
+    def new_search(self, generation=None):
+        """
+        starts a new search generation, so entries from older searches are replaced first
+        :param generation: optional generation number to use, so processes sharing the table agree on it
+        """
+        if generation is None:
+            generation = self._generation + 1
+        self._generation = generation & _GENERATION_MASK
+
+    def get_generation(self):
+        """getter for the current search generation"""
+        return self._generation
+
+    def release(self):
+        """releases the view on a shared buffer, which must be done before the buffer is closed"""
+        if isinstance(self._table, memoryview):
+            self._table.release()
+
+    def clear(self):
+        """empties the table and resets its statistics"""
+        # cleared in place, so a table in shared memory stays shared
+        self._table[:] = array('Q', bytes(len(self._table) * _WORD_BYTES))
+        self._generation = 0
+        self.reset_stats()
+
+    def probe(self, key):
+        """
+        Looks up a position's Zobrist key.
+        :return: (score, depth, bound, move) of the stored entry, or None on a miss
+        """
+        self._probes += 1
+        table = self._table
+        index = (key & self._mask) * (_WORDS_PER_SLOT * _SLOTS_PER_BUCKET)
+        for slot in (index, index + _WORDS_PER_SLOT):
+            data = table[slot + 1]
+            if data and table[slot] ^ data == key:
+                self._hits += 1
+                return unpack(data)
+        return None
+
+    def store(self, key, score, depth, bound, move):
+        """
+        Stores a search result for a position's Zobrist key. The depth-preferred slot takes it if
+        it holds the same position, an entry from an older search, or a shallower result;
+        otherwise the always-replace slot takes it.
+        :param move: best (start, end) move found, or None
+        """
+        self._stores += 1
+        table = self._table
+        index = (key & self._mask) * (_WORDS_PER_SLOT * _SLOTS_PER_BUCKET)
+        deep = index
+        recent = index + _WORDS_PER_SLOT
+        data = table[deep + 1]
+        if data and table[deep] ^ data != key:
+            generation = (data >> _GENERATION_SHIFT) & _GENERATION_MASK
+            if generation == self._generation and ((data >> _DEPTH_SHIFT) & _DEPTH_MASK) > depth:
+                deep = recent
+        elif move is None and data:
+            # keep the best move of an earlier search of the same position
+            move = unpack(data)[3]
+        data = pack(score, depth, bound, move, self._generation)
+        table[deep] = (key ^ data) & _KEY_MASK
+        table[deep + 1] = data
+
+    # STATISTICS
+
+    def get_probes(self):
+        """getter for the number of probes since the last reset"""
+        return self._probes
+
+    def get_hits(self):
+        """getter for the number of probes that found their position"""
+        return self._hits
+
+    def get_stores(self):
+        """getter for the number of entries stored since the last reset"""
+        return self._stores
+
+    def hit_rate(self):
+        """returns the fraction of probes that were hits (0.0 before the first probe)"""
+        return self._hits / self._probes if self._probes else 0.0
+
+    def usage(self, sample=1000):
+        """returns the fraction of the first sample slots that hold an entry from the current search"""
+        table = self._table
+        sample = min(sample, self.get_capacity())
+        used = 0
+        for slot in range(sample):
+            data = table[slot * _WORDS_PER_SLOT + 1]
+            if data and (data >> _GENERATION_SHIFT) & _GENERATION_MASK == self._generation:
+                used += 1
+        return used / sample
+
+    def reset_stats(self):
+        """resets the probe, hit and store counters"""
+        self._probes = 0
+        self._hits = 0
+        self._stores = 0
+
+    def __repr__(self):
+        return 'TranspositionTable({:.1f} MB, {} probes, {:.1%} hits, {} stores)'.format(
+            self.get_size_bytes() / (1024 * 1024), self._probes, self.hit_rate(), self._stores)
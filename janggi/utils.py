@@ -1,19 +1,27 @@
+from typing import NewType
+
+from janggi.position import NUM_ROWS, NUM_COLS, NUM_SQUARES
+
+# flat square index, row * 9 + col (0-89): the coordinate the engine uses internally.
+# Algebraic strings ('b1') only appear at the API boundary (make_move, the GUI, logging).
+Square = NewType('Square', int)
+
+COLUMNS = "abcdefghi"
+
+# lookup tables for all 90 squares, built once at import
+SQUARE_NAMES = tuple(COLUMNS[col] + str(row + 1) for row in range(NUM_ROWS) for col in range(NUM_COLS))
+SQUARE_BY_NAME = {name: Square(square) for square, name in enumerate(SQUARE_NAMES)}
+NUMERIC_BY_NAME = {name: divmod(square, NUM_COLS) for square, name in enumerate(SQUARE_NAMES)}
+NAME_BY_NUMERIC = {divmod(square, NUM_COLS): name for square, name in enumerate(SQUARE_NAMES)}
+
+
 def algebraic_to_numeric(alg_coord: str) -> (int, int):
     """
     helper function converts an algebraic coordinate to a numeric coordinate
     :param alg_coord: in string format ie 'b1'
     :return: the tuple with integer (x, y) coordinates
     """
-    columns = ["a", "b", "c", "d", "e", "f", "g", "h", "i"]
-    columns_dict = dict()
-    # make dictionary where key = "letter" val = number (index)
-    for index, letter in enumerate(columns):
-        columns_dict[letter] = index
-    column = alg_coord[0]
-    row = alg_coord[1:]
-    row_index = int(row) - 1
-    col_index = columns_dict[column]
-    return row_index, col_index
+    return NUMERIC_BY_NAME[alg_coord]
 
 
 def numeric_to_algebraic(num_coord: (int, int)) -> str:
@@ -22,34 +30,51 @@ def numeric_to_algebraic(num_coord: (int, int)) -> str:
     :param num_coord: in tuple format ie (1, 2)
     :return: the string with algebraic ie 'b1' coordinates
     """
-    columns = ["a", "b", "c", "d", "e", "f", "g", "h", "i"]
-    columns_dict = dict()
-    # make dictionary where key = number (index) val = "letter"
-    for index, letter in enumerate(columns):
-        columns_dict[index] = letter
-    alg_str = ""
-    row_index = num_coord[0]
-    col_index = num_coord[1]
-    row_index += 1
-    alg_str += columns_dict[col_index]
-    alg_str += str(row_index)
-    return alg_str
+    return NAME_BY_NUMERIC[tuple(num_coord)]
 
 
-def invert_coordinates(tup_list: list[(int, int)]) -> None:
+def algebraic_to_square(alg_coord: str) -> Square:
     """
-    helper function inverts a list of coordinates (tuples) across the Janggi board.
-    Returns: None
+    helper function converts an algebraic coordinate to a flat square index
+    :param alg_coord: in string format ie 'b1'
+    :return: the square index, row * 9 + col
     """
-    inverted_list = list()
-    for coord in tup_list:
-        row = coord[0]
-        col = coord[1]
-        inverted_coord = (9 - row, col)
-        inverted_list.append(inverted_coord)  # add inverted coord
-    tup_list.clear()
-    tup_list.extend(inverted_list)
+    return SQUARE_BY_NAME[alg_coord]
+
+
+def square_to_algebraic(square: Square) -> str:
+    """
+    helper function converts a flat square index to an algebraic coordinate
+    :param square: the square index, row * 9 + col
+    :return: the string with algebraic ie 'b1' coordinates
+    """
+    return SQUARE_NAMES[square]
 
 
 def swap_color(color: str) -> str:
     return 'b' == color and 'r' or 'b'
+
+
+def numeric_to_square(num_coord: (int, int)) -> Square:
+    """
+    helper function converts a numeric coordinate to a flat square index (0-89)
+    :param num_coord: in tuple format ie (1, 2)
+    :return: the square index, row * 9 + col
+    :raises KeyError: if the coordinate is off the board
+    """
+    row_index, col_index = num_coord
+    if not (0 <= row_index < NUM_ROWS and 0 <= col_index < NUM_COLS):
+        raise KeyError(num_coord)
+    return Square(row_index * NUM_COLS + col_index)
+
+
+def square_to_numeric(square: Square) -> (int, int):
+    """
+    helper function converts a flat square index (0-89) to a numeric coordinate
+    :param square: the square index, row * 9 + col
+    :return: the tuple with integer (row, col) coordinates
+    :raises KeyError: if the square index is off the board
+    """
+    if not 0 <= square < NUM_SQUARES:
+        raise KeyError(square)
+    return divmod(square, NUM_COLS)